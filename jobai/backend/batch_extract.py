@@ -0,0 +1,118 @@
+"""
+Bulk resume extraction CLI
+Walks a directory of PDFs, extracts them in parallel across cores and streams
+one NDJSON line per file as soon as it finishes
+
+Run with: python batch_extract.py resumes/ --workers 8 > results.ndjson
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List
+
+from resumeextraction import init_worker, process_resume, validate_pdf
+
+logger = logging.getLogger(__name__)
+
+MAX_FILE_SIZE = 20 * 1024 * 1024  # 20MB, same limit as the API
+
+
+def find_pdfs(directory: str, recursive: bool = True) -> Iterator[str]:
+    """Yield PDF paths under directory in a stable order"""
+    if not recursive:
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if os.path.isfile(path) and name.lower().endswith('.pdf'):
+                yield path
+        return
+
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith('.pdf'):
+                yield os.path.join(root, name)
+
+
+def process_resume_file(path: str) -> Dict:
+    """Extract one PDF from disk; errors are returned, never raised"""
+    started = time.perf_counter()
+    record = {'filename': path}
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+        record['size_bytes'] = len(content)
+
+        is_valid, msg = validate_pdf(content, path, MAX_FILE_SIZE)
+        if not is_valid:
+            raise ValueError(msg)
+
+        record['status'] = 'ok'
+        record['data'] = process_resume(content)
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return record
+
+
+def summarize(records: List[Dict], elapsed: float) -> Dict:
+    """Batch totals and throughput figures"""
+    succeeded = sum(1 for r in records if r['status'] == 'ok')
+    total_bytes = sum(r.get('size_bytes', 0) for r in records)
+    return {
+        'files': len(records),
+        'succeeded': succeeded,
+        'failed': len(records) - succeeded,
+        'elapsed_seconds': round(elapsed, 3),
+        'files_per_second': round(len(records) / elapsed, 2) if elapsed > 0 else 0.0,
+        'mb_per_second': round(total_bytes / (1024 * 1024) / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+def run_batch(paths: List[str], workers: int, out) -> Dict:
+    """Extract all paths in a process pool, writing NDJSON lines to out as they finish"""
+    started = time.perf_counter()
+    records = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        futures = [executor.submit(process_resume_file, path) for path in paths]
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+    return summarize(records, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract resume data from a directory of PDFs")
+    parser.add_argument('directory', help="Directory containing PDF resumes")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument('--output', '-o', help="NDJSON output file (default: stdout)")
+    parser.add_argument('--no-recursive', action='store_true', help="Only scan the top-level directory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    paths = list(find_pdfs(args.directory, recursive=not args.no_recursive))
+    if not paths:
+        print(f"No PDF files found in {args.directory}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Processing {len(paths)} PDFs with {args.workers} workers...", file=sys.stderr)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        summary = run_batch(paths, args.workers, out)
+    finally:
+        if args.output:
+            out.close()
+
+    print(json.dumps({'summary': summary}), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Benchmark harness for the extraction pipeline
+Times each stage (PDF open, text extraction, segmentation, every extractor,
+keyword generation) over a corpus built from resume.pdf, the saved
+resume_data_*.json samples and synthetic resumes of growing size
+
+Run with:
+    python bench_extraction.py --iterations 20 --save-baseline bench_baseline.json
+    python bench_extraction.py --compare bench_baseline.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import fitz
+
+from patterns import REGISTRY
+from resume_document import ResumeDocument
+from resumeextraction import (
+    EXTRACTORS,
+    TEXT_REQUIREMENTS,
+    generate_search_keywords,
+    get_taxonomy,
+    join_pages,
+    read_pdf_pages,
+    MAX_TEXT_CHARS,
+)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "bench_baseline.json")
+
+# ============================================================
+# CORPUS
+# ============================================================
+
+def render_pdf(text: str) -> bytes:
+    """Lay text out on as many A4 pages as it needs"""
+    doc = fitz.open()
+    lines = text.split('\n')
+    lines_per_page = 60
+    for start in range(0, max(len(lines), 1), lines_per_page):
+        page = doc.new_page()
+        page.insert_text((40, 40), '\n'.join(lines[start:start + lines_per_page]), fontsize=9)
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+def text_from_sample(data: Dict) -> str:
+    """Rebuild resume-like text from a saved resume_data_*.json record"""
+    lines = [data.get('raw_text_preview', '')]
+    skills = data.get('skills', {}).get('all_skills', [])
+    if skills:
+        lines += ['', 'Technical Skills', ', '.join(skills)]
+    positions = data.get('experience', {}).get('positions', [])
+    if positions:
+        lines += ['', 'Experience', f"{data['experience'].get('total_years', 0)} years of experience"]
+        lines += [f"• {position}" for position in positions]
+    education = data.get('education', [])
+    if education:
+        lines += ['', 'Education']
+        lines += [f"{e.get('degree')} {e.get('year') or ''} {e.get('cgpa') or ''} CGPA" for e in education]
+    projects = data.get('projects', [])
+    if projects:
+        lines += ['', 'Projects'] + [f"• {project}" for project in projects]
+    return '\n'.join(lines)
+
+
+def synthetic_resume_text(pages: int, seed: int = 0) -> str:
+    """Plausible resume text of roughly the given page count"""
+    rng = random.Random(seed)
+    skills = list(get_taxonomy().matcher.skill_categories)
+    cities = ['Pune', 'Mumbai', 'Bangalore', 'Hyderabad', 'Delhi', 'Chennai']
+    titles = ['Software Engineer', 'Backend Developer', 'Data Analyst', 'Mobile Developer', 'DevOps Engineer']
+    months = ['Jan', 'Mar', 'May', 'Jul', 'Sep', 'Nov']
+
+    lines = [
+        f"Candidate {seed}",
+        f"candidate{seed}@example.com | +91 98765{seed % 100000:05d} | {rng.choice(cities)}, India",
+        f"linkedin.com/in/candidate{seed} | github.com/candidate{seed}",
+        "Summary",
+        f"{rng.randint(1, 12)} years of experience building products. Open to full-time and remote roles, "
+        f"expected {rng.randint(6, 40)} LPA.",
+        "Technical Skills",
+        ', '.join(rng.sample(skills, min(len(skills), 25))),
+    ]
+    target_lines = pages * 60
+    lines.append("Experience")
+    while len(lines) < target_lines * 0.6:
+        year = rng.randint(2005, 2022)
+        lines.append(f"{rng.choice(titles)} at Company {rng.randint(1, 999)} Pvt Ltd")
+        lines.append(f"{rng.choice(months)} {year} – {rng.choice(months)} {year + rng.randint(1, 3)}")
+        for _ in range(4):
+            lines.append(f"• Built {rng.choice(skills)} services with {rng.choice(skills)}, "
+                         f"cutting latency by {rng.randint(5, 60)}%.")
+    lines.append("Projects")
+    while len(lines) < target_lines * 0.9:
+        lines.append(f"• Project {rng.randint(1, 999)} – {rng.choice(skills)} and {rng.choice(skills)} "
+                     f"platform serving {rng.randint(1, 500)}K users")
+    lines += ["Education", f"B.Tech in Computer Science {rng.randint(2000, 2022)} {rng.randint(6, 9)}.5 CGPA"]
+    while len(lines) < target_lines:
+        lines.append(f"• Certification in {rng.choice(skills)}")
+    return '\n'.join(lines)
+
+
+def build_corpus(synthetic_pages=(1, 2, 5, 10, 20), include_samples: bool = True) -> List[Tuple[str, bytes]]:
+    """(name, pdf bytes) for every benchmark document"""
+    corpus = []
+    resume_pdf = os.path.join(BACKEND_DIR, "resume.pdf")
+    if os.path.exists(resume_pdf):
+        with open(resume_pdf, 'rb') as f:
+            corpus.append(("resume.pdf", f.read()))
+
+    if include_samples:
+        seen = set()
+        for path in sorted(glob.glob(os.path.join(BACKEND_DIR, "resume_data_*.json"))):
+            with open(path, encoding='utf-8') as f:
+                record = json.load(f)
+            if record.get('filename') in seen:
+                continue
+            seen.add(record.get('filename'))
+            corpus.append((f"sample:{record.get('filename')}", render_pdf(text_from_sample(record['data']))))
+
+    for pages in synthetic_pages:
+        corpus.append((f"synthetic:{pages}p", render_pdf(synthetic_resume_text(pages, seed=pages))))
+    return corpus
+
+# ============================================================
+# STAGE TIMING
+# ============================================================
+
+def run_pipeline_timed(pdf_content: bytes) -> Dict[str, float]:
+    """Run the extraction pipeline once, returning seconds per stage"""
+    timings = {}
+
+    started = time.perf_counter()
+    doc = fitz.open(stream=pdf_content, filetype="pdf")
+    doc.close()
+    timings['pdf_open'] = time.perf_counter() - started
+
+    fields = list(EXTRACTORS)
+    started = time.perf_counter()
+    pages = read_pdf_pages(pdf_content, [TEXT_REQUIREMENTS[field] for field in fields])
+    text = join_pages(pages)[:MAX_TEXT_CHARS]
+    timings['text_extraction'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    document = ResumeDocument(text)
+    document.sections
+    document.lower
+    timings['segmentation'] = time.perf_counter() - started
+
+    resume_data = {}
+    for field in fields:
+        max_pages, _ = TEXT_REQUIREMENTS[field]
+        source = document if max_pages is None else ResumeDocument(join_pages(pages[:max_pages]))
+        started = time.perf_counter()
+        resume_data[field] = EXTRACTORS[field](source)
+        timings[f"extract.{field}"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    generate_search_keywords(resume_data)
+    timings['keywords'] = time.perf_counter() - started
+
+    timings['total'] = sum(timings.values())
+    return timings
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize_stage(samples: List[float]) -> Dict[str, float]:
+    return {
+        'p50_ms': round(percentile(samples, 50) * 1000, 4),
+        'p95_ms': round(percentile(samples, 95) * 1000, 4),
+        'p99_ms': round(percentile(samples, 99) * 1000, 4),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 4),
+    }
+
+
+def peak_memory_mb(pdf_content: bytes) -> float:
+    """Peak Python heap during one pipeline run (separate pass: tracing skews timings)"""
+    tracemalloc.start()
+    try:
+        run_pipeline_timed(pdf_content)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / (1024 * 1024), 3)
+
+
+def run_benchmark(corpus: List[Tuple[str, bytes]], iterations: int, warmup: int = 2) -> Dict:
+    REGISTRY.reset()
+    documents = {}
+    overall = []
+    started = time.perf_counter()
+
+    for name, pdf_content in corpus:
+        for _ in range(warmup):
+            run_pipeline_timed(pdf_content)
+
+        stage_samples: Dict[str, List[float]] = {}
+        for _ in range(iterations):
+            for stage, seconds in run_pipeline_timed(pdf_content).items():
+                stage_samples.setdefault(stage, []).append(seconds)
+        overall.extend(stage_samples['total'])
+
+        total_mean = sum(stage_samples['total']) / iterations
+        documents[name] = {
+            'size_bytes': len(pdf_content),
+            'stages': {stage: summarize_stage(samples) for stage, samples in stage_samples.items()},
+            'docs_per_second': round(1 / total_mean, 2) if total_mean else 0.0,
+            'mb_per_second': round(len(pdf_content) / (1024 * 1024) / total_mean, 2) if total_mean else 0.0,
+            'peak_memory_mb': peak_memory_mb(pdf_content),
+        }
+
+    wall = time.perf_counter() - started
+    return {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'iterations': iterations,
+        'documents': documents,
+        'overall': {
+            **summarize_stage(overall),
+            'docs_per_second': round(len(overall) / sum(overall), 2) if overall else 0.0,
+            'wall_seconds': round(wall, 3),
+        },
+        'top_patterns': REGISTRY.stats()[:10],
+    }
+
+# ============================================================
+# BASELINES
+# ============================================================
+
+def compare_to_baseline(result: Dict, baseline: Dict, tolerance: float,
+                        min_delta_ms: float = 0.5, metrics=('p50_ms',)) -> List[Dict]:
+    """
+    Stages whose metrics got slower than baseline by more than tolerance
+    (a fraction, 0.2 = 20%). Deltas under min_delta_ms are ignored as noise.
+    Tail percentiles are noisy on shared machines, so only p50 gates by default.
+    """
+    regressions = []
+    for name, document in result['documents'].items():
+        base_document = baseline.get('documents', {}).get(name)
+        if not base_document:
+            continue
+        for stage, stats in document['stages'].items():
+            base_stats = base_document['stages'].get(stage)
+            if not base_stats:
+                continue
+            for metric in metrics:
+                old, new = base_stats[metric], stats[metric]
+                if new - old > min_delta_ms and new > old * (1 + tolerance):
+                    regressions.append({
+                        'document': name,
+                        'stage': stage,
+                        'metric': metric,
+                        'baseline_ms': old,
+                        'current_ms': new,
+                        'change': f"+{(new / old - 1) * 100:.0f}%" if old else "new",
+                    })
+    return regressions
+
+
+def print_report(result: Dict, out=sys.stdout):
+    for name, document in result['documents'].items():
+        print(f"\n{name}  ({document['size_bytes'] / 1024:.0f} KB, "
+              f"{document['docs_per_second']} docs/s, peak {document['peak_memory_mb']} MB)", file=out)
+        print(f"  {'stage':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}", file=out)
+        for stage, stats in document['stages'].items():
+            print(f"  {stage:<28}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}",
+                  file=out)
+
+    overall = result['overall']
+    print(f"\nOverall: p50 {overall['p50_ms']} ms, p95 {overall['p95_ms']} ms, p99 {overall['p99_ms']} ms, "
+          f"{overall['docs_per_second']} docs/s", file=out)
+    print("\nSlowest patterns:", file=out)
+    for row in result['top_patterns'][:5]:
+        print(f"  {row['name']:<32}{row['total_ms']:>10.2f} ms  ({row['calls']} calls)", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resume extraction pipeline")
+    parser.add_argument('--iterations', type=int, default=20, help="Timed runs per document")
+    parser.add_argument('--pages', default="1,2,5,10,20", help="Synthetic resume page counts")
+    parser.add_argument('--no-samples', action='store_true', help="Skip resume_data_*.json samples")
+    parser.add_argument('--json', help="Write the full result to this file")
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE,
+                        help="Store this run as the baseline")
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE,
+                        help="Compare against a stored baseline; exit 1 on regression")
+    parser.add_argument('--tolerance', type=float, default=0.3, help="Allowed slowdown (0.3 = 30%%)")
+    parser.add_argument('--min-delta-ms', type=float, default=0.5,
+                        help="Ignore slowdowns smaller than this (timer noise)")
+    parser.add_argument('--gate', default="p50_ms", help="Comma-separated metrics that fail the compare")
+    args = parser.parse_args()
+
+    pages = tuple(int(p) for p in args.pages.split(',') if p)
+    corpus = build_corpus(pages, include_samples=not args.no_samples)
+    print(f"Benchmarking {len(corpus)} documents x {args.iterations} iterations...", file=sys.stderr)
+
+    result = run_benchmark(corpus, args.iterations)
+    print_report(result)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(result, baseline, args.tolerance, args.min_delta_ms,
+                                          metrics=tuple(args.gate.split(',')))
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressions vs {args.compare}:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\n✅ No regressions vs {args.compare}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
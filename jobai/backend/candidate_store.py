@@ -0,0 +1,285 @@
+"""
+Indexed candidate store
+Keeps a compact summary of every extracted profile in memory with inverted
+indexes on skills, job titles, locations, experience level and years of
+experience, so filtered searches and facet counts take milliseconds over
+hundreds of thousands of profiles
+"""
+import heapq
+import logging
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FACET_FIELDS = ('skills', 'locations', 'experience_level', 'job_titles')
+INDEXED_FIELDS = FACET_FIELDS + ('total_years',)
+
+# Filtered facet counts are computed exactly for the queried values plus each
+# field's largest buckets (facet_size times this); smaller values rarely make
+# the top list
+FACET_CANDIDATES = 50
+
+# Bitmaps for buckets holding at least this share of profiles are built up
+# front after a bulk load; smaller ones are cheap to build on first use
+DENSE_BUCKET_SHARE = 0.01
+
+_LOCATION_SPLIT = re.compile(r'\s*[,/|]\s*')
+
+
+@lru_cache(maxsize=65536)
+def _key(value):
+    return value if isinstance(value, float) else ' '.join(value.lower().split())
+
+
+def ids_to_mask(ids: Iterable[int]) -> int:
+    """Ids -> int bitmap, built in one pass"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def mask_to_ids(mask: int, limit: Optional[int] = None) -> List[int]:
+    """Set bits of a bitmap, highest first"""
+    ids = []
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+    for byte_index in range(len(data) - 1, -1, -1):
+        byte = data[byte_index]
+        if not byte:
+            continue
+        for bit in range(7, -1, -1):
+            if byte >> bit & 1:
+                ids.append(byte_index * 8 + bit)
+                if limit is not None and len(ids) >= limit:
+                    return ids
+    return ids
+
+
+def profile_summary(data: Dict) -> Dict:
+    """The searchable fields of an extraction result"""
+    contact = data.get('contact_info') or {}
+    keywords = data.get('search_keywords') or {}
+    preferences = data.get('job_preferences') or {}
+
+    locations = []
+    for location in ([contact.get('location')] + list(preferences.get('preferred_locations') or [])
+                     + list(keywords.get('locations') or [])):
+        # "Pune, Maharashtra" is findable as either part
+        for part in _LOCATION_SPLIT.split(location or ''):
+            if part and part not in locations:
+                locations.append(part)
+
+    return {
+        'name': contact.get('name'),
+        'email': contact.get('email'),
+        'total_years': float((data.get('experience') or {}).get('total_years') or 0),
+        'experience_level': keywords.get('experience_level'),
+        'skills': list((data.get('skills') or {}).get('all_skills') or []),
+        'job_titles': list(keywords.get('job_titles') or []),
+        'locations': locations,
+    }
+
+
+class CandidateIndex:
+    """
+    In-memory inverted indexes: field -> normalized value -> set of internal ids.
+
+    Queries run on int bitmaps, so an intersection or facet count costs a few
+    microseconds per bucket however many profiles match. Bitmaps are built
+    lazily for the buckets queries touch and then kept up to date as
+    profiles are added and removed.
+
+    Profiles are identified by upload content hash; adding the same hash again
+    replaces the earlier profile, unless its summary is unchanged (a repeat
+    upload served from the cache), which keeps the entry and its id. Newer
+    profiles get larger ids, which is the result order.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._next_id = 0
+        self._ids: Dict[str, int] = {}           # content hash -> id
+        self._hashes: Dict[int, str] = {}        # id -> content hash
+        self._profiles: Dict[int, Dict] = {}     # id -> summary
+        self._index: Dict[str, Dict] = {field: defaultdict(set) for field in INDEXED_FIELDS}
+        self._display: Dict[str, Dict] = {field: {} for field in INDEXED_FIELDS}
+        self._masks: Dict[Tuple[str, object], int] = {}
+        self._all_mask = 0
+        self._years: List[float] = []            # sorted distinct total_years values
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def _field_values(self, profile: Dict, field: str) -> list:
+        value = profile[field]
+        if value is None:
+            return []
+        return value if isinstance(value, list) else [value]
+
+    def add(self, content_hash: str, data: Dict):
+        """Index (or re-index) one extraction result"""
+        with self._lock:
+            self._add(content_hash, data)
+
+    def add_many(self, records: Iterable[Dict]) -> int:
+        """Index result-store records ({'content_hash', 'data'}), oldest first"""
+        count = 0
+        with self._lock:
+            # Drop cached bitmaps once instead of updating them per profile
+            self._masks.clear()
+            for record in records:
+                self._add(record['content_hash'], record['data'], bulk=True)
+                count += 1
+            self._all_mask = ids_to_mask(self._profiles)
+            dense = len(self._profiles) * DENSE_BUCKET_SHARE
+            for field, index in self._index.items():
+                for key, bucket in index.items():
+                    if len(bucket) >= dense:
+                        self._mask(field, key)
+        return count
+
+    def _add(self, content_hash: str, data: Dict, bulk: bool = False):
+        profile = profile_summary(data)
+        indexed = self._ids.get(content_hash)
+        if indexed is not None and self._profiles[indexed] == profile:
+            # Ids are never reused, so re-adding would only grow every bitmap
+            return
+        self.remove(content_hash)
+        candidate_id = self._next_id
+        self._next_id += 1
+        self._ids[content_hash] = candidate_id
+        self._hashes[candidate_id] = content_hash
+        self._profiles[candidate_id] = profile
+        if not bulk:  # add_many builds the bitmap once at the end
+            self._all_mask |= 1 << candidate_id
+        for field, index in self._index.items():
+            for value in self._field_values(profile, field):
+                key = _key(value)
+                if key not in index:
+                    self._display[field].setdefault(key, value)
+                    if field == 'total_years':
+                        insort(self._years, key)
+                index[key].add(candidate_id)
+                if (field, key) in self._masks:
+                    self._masks[field, key] |= 1 << candidate_id
+
+    def remove(self, content_hash: str) -> bool:
+        with self._lock:
+            candidate_id = self._ids.pop(content_hash, None)
+            if candidate_id is None:
+                return False
+            del self._hashes[candidate_id]
+            profile = self._profiles.pop(candidate_id)
+            self._all_mask &= ~(1 << candidate_id)
+            for field, index in self._index.items():
+                for value in self._field_values(profile, field):
+                    key = _key(value)
+                    bucket = index.get(key)
+                    if not bucket or candidate_id not in bucket:
+                        continue
+                    bucket.discard(candidate_id)
+                    if (field, key) in self._masks:
+                        self._masks[field, key] &= ~(1 << candidate_id)
+                    if not bucket:
+                        del index[key]
+                        self._masks.pop((field, key), None)
+                        if field == 'total_years':
+                            del self._years[bisect_left(self._years, key)]
+            return True
+
+    def get(self, content_hash: str) -> Optional[Dict]:
+        with self._lock:
+            candidate_id = self._ids.get(content_hash)
+            return self._result(candidate_id) if candidate_id is not None else None
+
+    def _result(self, candidate_id: int) -> Dict:
+        return {'content_hash': self._hashes[candidate_id], **self._profiles[candidate_id]}
+
+    def _mask(self, field: str, key) -> int:
+        mask = self._masks.get((field, key))
+        if mask is None:
+            bucket = self._index[field].get(key)
+            if not bucket:
+                return 0
+            mask = self._masks[field, key] = ids_to_mask(bucket)
+        return mask
+
+    def _matching(self, skills: List[str], titles: List[str], locations: List[str],
+                  levels: List[str], min_years: Optional[float], max_years: Optional[float]) -> int:
+        # Skills are ANDed; several titles/locations/levels are ORed within the field
+        masks = [self._mask('skills', _key(skill)) for skill in skills]
+        for field, values in (('job_titles', titles), ('locations', locations), ('experience_level', levels)):
+            if values:
+                union = 0
+                for value in values:
+                    union |= self._mask(field, _key(value))
+                masks.append(union)
+
+        if min_years is not None or max_years is not None:
+            start = bisect_left(self._years, min_years) if min_years is not None else 0
+            end = bisect_right(self._years, max_years) if max_years is not None else len(self._years)
+            union = 0
+            for years in self._years[start:end]:
+                union |= self._mask('total_years', years)
+            masks.append(union)
+
+        result = self._all_mask
+        for mask in sorted(masks, key=int.bit_count):
+            result &= mask
+            if not result:
+                break
+        return result
+
+    def _facets(self, result: int, total: int, top: int,
+                queried: Dict[str, List[str]]) -> Dict[str, Dict[str, int]]:
+        everything = total == len(self._profiles)
+        facets = {}
+        for field in FACET_FIELDS:
+            index = self._index[field]
+            if everything:
+                counts = {key: len(bucket) for key, bucket in index.items()}
+            else:
+                keys = set(heapq.nlargest(top * FACET_CANDIDATES, index, key=lambda k: len(index[k])))
+                keys.update(key for key in map(_key, queried.get(field, [])) if key in index)
+                counts = {key: (self._mask(field, key) & result).bit_count() for key in keys}
+            facets[field] = {
+                self._display[field][key]: count
+                for key, count in heapq.nlargest(top, counts.items(), key=lambda item: item[1]) if count
+            }
+        return facets
+
+    def search(self, skills: Optional[List[str]] = None, titles: Optional[List[str]] = None,
+               locations: Optional[List[str]] = None, levels: Optional[List[str]] = None,
+               min_years: Optional[float] = None, max_years: Optional[float] = None,
+               limit: int = 20, offset: int = 0, facets: bool = False, facet_size: int = 10) -> Dict:
+        """Candidates matching every given filter, newest first"""
+        with self._lock:
+            result = self._matching(skills or [], titles or [], locations or [], levels or [],
+                                    min_years, max_years)
+            total = result.bit_count()
+            page = mask_to_ids(result, offset + limit)[offset:]
+            response = {
+                'total': total,
+                'results': [self._result(i) for i in page],
+            }
+            if facets:
+                queried = {'skills': skills or [], 'job_titles': titles or [],
+                           'locations': locations or [], 'experience_level': levels or []}
+                response['facets'] = self._facets(result, total, facet_size, queried)
+            return response
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'profiles': len(self._profiles),
+                'cached_bitmaps': len(self._masks),
+                **{f"distinct_{field}": len(self._index[field]) for field in FACET_FIELDS},
+            }
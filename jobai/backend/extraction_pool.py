@@ -0,0 +1,227 @@
+"""
+Worker pool for CPU-bound resume extraction
+Keeps PDF parsing and regex extraction off the asyncio event loop
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool already holds max_pending jobs and the caller would not wait"""
+
+
+class ExtractionPool:
+    """
+    Bounded executor wrapper for async endpoints.
+
+    mode: "process" (default) or "thread"
+    workers: number of worker processes/threads
+    max_pending: jobs allowed in flight (running + queued); further callers
+        are rejected, or wait for a slot when they ask to
+    timeout: seconds an endpoint waits for one submitted job (time spent
+        waiting for a slot does not count)
+    initializer: called once per worker process (once in-process for threads)
+    """
+
+    def __init__(self, mode: str = "process", workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, timeout: float = 30.0,
+                 initializer: Optional[Callable] = None,
+                 start_method: Optional[str] = None, name: str = "extraction"):
+        if mode not in ("process", "thread"):
+            raise ValueError(f"Unknown pool mode: {mode}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.timeout = timeout
+        self.initializer = initializer
+        self.start_method = start_method
+        self.name = name
+
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._waiting = 0
+        # One slot per job in flight; waiters are served in arrival order
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._counters = {
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+        }
+
+    @classmethod
+    def from_env(cls, prefix: str = "EXTRACTION", **kwargs) -> 'ExtractionPool':
+        """
+        Build a pool from <PREFIX>_POOL_MODE, _WORKERS, _MAX_PENDING, _TIMEOUT,
+        _START_METHOD; workers, max_pending and timeout in kwargs are defaults
+        """
+        workers = os.getenv(f"{prefix}_WORKERS")
+        max_pending = os.getenv(f"{prefix}_MAX_PENDING")
+        default_workers = kwargs.pop('workers', None)
+        default_max_pending = kwargs.pop('max_pending', None)
+        default_timeout = kwargs.pop('timeout', 30)
+        return cls(
+            mode=os.getenv(f"{prefix}_POOL_MODE", "process"),
+            workers=int(workers) if workers else default_workers,
+            max_pending=int(max_pending) if max_pending else default_max_pending,
+            timeout=float(os.getenv(f"{prefix}_TIMEOUT", default_timeout)),
+            start_method=os.getenv(f"{prefix}_START_METHOD") or None,
+            name=prefix.lower(),
+            **kwargs
+        )
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.mode == "process":
+            context = multiprocessing.get_context(self.start_method) if self.start_method else None
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=self.initializer
+            )
+        else:
+            if self.initializer:
+                self.initializer()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix=f"{self.name}-worker"
+            )
+        logger.info(f"✅ {self.name} pool started: {self.workers} {self.mode} workers, "
+                    f"max {self.max_pending} pending")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        # Jobs still running release the old semaphore (bound to its loop)
+        self._pending = 0
+        self._slots = asyncio.Semaphore(self.max_pending)
+
+    async def run(self, fn: Callable, *args, wait: bool = False):
+        """
+        Run fn(*args) in the pool and await its result.
+
+        With all max_pending slots taken, raises PoolSaturated, or with wait
+        queues for the next free slot (no deadline). Raises
+        asyncio.TimeoutError when the job itself exceeds the timeout.
+        """
+        slots = self._slots
+        if not wait and slots.locked():
+            self._counters['rejected'] += 1
+            raise PoolSaturated(f"{self.name} pool is saturated ({self._pending} jobs pending)")
+
+        self._waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        try:
+            if self._executor is None:
+                self.start()
+            loop = asyncio.get_running_loop()
+            if self.mode == "process":
+                # Worker processes record metrics (and profiler samples) locally
+                # and send the delta back with the result
+                job = (metrics.run_collected, fn, args, metrics.profiler.interval)
+            else:
+                job = (fn, *args)
+            try:
+                future = self._executor.submit(*job)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM on a hostile PDF); replace the pool once
+                logger.error(f"❌ {self.name} pool broken, restarting")
+                self._executor = None
+                self.start()
+                future = self._executor.submit(*job)
+        except BaseException:
+            slots.release()
+            raise
+
+        # The slot is held until the worker actually finishes, so timed-out
+        # jobs still count against max_pending while they keep running.
+        self._pending += 1
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, slots))
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+        except asyncio.TimeoutError:
+            self._counters['timeouts'] += 1
+            future.cancel()  # Only succeeds if the job has not started yet
+            raise
+        except Exception as e:
+            self._counters['failed'] += 1
+            metrics.merge(getattr(e, 'metrics_delta', None))
+            raise
+
+        self._counters['completed'] += 1
+        if self.mode == "process":
+            result, delta = result
+            metrics.merge(delta)
+        return result
+
+    def _release(self, slots: asyncio.Semaphore):
+        if slots is self._slots:
+            self._pending -= 1
+        slots.release()
+
+    def worker_pids(self) -> List[int]:
+        """PIDs of live worker processes (empty in thread mode)"""
+        processes = getattr(self._executor, '_processes', None) or {}
+        return sorted(processes)
+
+    def stats(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'workers': self.workers,
+            'pending': self._pending,
+            'waiting': self._waiting,
+            'max_pending': self.max_pending,
+            'timeout': self.timeout,
+            **self._counters
+        }
+
+
+_END = object()
+
+
+async def map_bounded(fn: Callable[..., Awaitable], items: Iterable, limit: int) -> AsyncIterator:
+    """
+    Await fn(item) for every item with at most limit calls in flight, yielding
+    results as they complete. Items are drawn from the iterable only as calls
+    finish, so callers can read inputs lazily; an exception (or the consumer
+    stopping early) cancels the calls still in flight.
+    """
+    items = iter(items)
+    tasks = set()
+
+    def submit_next() -> bool:
+        item = next(items, _END)
+        if item is _END:
+            return False
+        tasks.add(asyncio.ensure_future(fn(item)))
+        return True
+
+    try:
+        while len(tasks) < limit and submit_next():
+            pass
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                tasks.discard(task)
+                submit_next()
+            for task in done:
+                yield task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,399 @@
+"""
+Job posting ingestion and matching
+Ingests JSearch-style postings (job_title, employer_name, job_description,
+job_highlights), runs the skill matcher over each one once, and keeps compact
+skill vectors plus an inverted index so resumes can be ranked against a
+million postings with top-k scoring
+
+Run with:
+    python job_index.py ingest jobs.json more_jobs.ndjson --output jobs.ndjson.gz --workers 8
+    python job_index.py match resume_data_20251202_125801.json --index jobs.ndjson.gz
+    python job_index.py match resume_data_*.json --method cosine --top 5
+"""
+import argparse
+import gzip
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from similarity import METHODS, SkillMatrix, query_matrix, similarity, smoothed_idf, top_matches
+from skill_taxonomy import get_taxonomy
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION_SNIPPET = 200  # Same preview length the app shows
+# Bump when prepare_job matches skills differently; older postings are reported as stale
+PREPARE_VERSION = "2"  # Exact skill matches only
+
+# ============================================================
+# INGESTION
+# ============================================================
+
+def job_location(raw: Dict) -> str:
+    """Location string as the Flutter Job model builds it"""
+    if raw.get('job_city') and raw.get('job_state'):
+        return f"{raw['job_city']}, {raw['job_state']}"
+    return raw.get('job_country') or ('Remote' if raw.get('job_is_remote') else '')
+
+
+def job_text(raw: Dict) -> str:
+    """Title, description and highlight bullets: everything skills are matched in"""
+    parts = [raw.get('job_title') or '', raw.get('job_description') or '']
+    for bullets in (raw.get('job_highlights') or {}).values():
+        if isinstance(bullets, list):
+            parts.extend(str(bullet) for bullet in bullets)
+    return '\n'.join(parts)
+
+
+def prepare_job(raw: Dict) -> Dict:
+    """
+    Compact posting with its skills, ready for JobIndex.add (runs in worker
+    processes). Only exact skill matches count: a typo guess in a posting
+    would match resumes on a skill the posting never asked for.
+    """
+    taxonomy = get_taxonomy()
+    skills = list(dict.fromkeys(match.skill for match in taxonomy.matcher.find_all(job_text(raw), fuzzy=False)))
+    description = raw.get('job_description') or ''
+    return {
+        'job_id': str(raw.get('job_id') or ''),
+        'title': raw.get('job_title') or '',
+        'company': raw.get('employer_name') or '',
+        'location': job_location(raw),
+        'employment_type': raw.get('job_employment_type') or '',
+        'apply_link': raw.get('job_apply_link') or raw.get('job_google_link'),
+        'posted_at': raw.get('job_posted_at_datetime_utc'),
+        'description': description[:DESCRIPTION_SNIPPET],
+        'skills': skills,
+        'taxonomy_version': taxonomy.version,
+        'prepare_version': PREPARE_VERSION,
+    }
+
+
+def prepare_jobs(raw_jobs: List[Dict]) -> List[Dict]:
+    return [prepare_job(raw) for raw in raw_jobs]
+
+
+def _open_text(path: str):
+    return gzip.open(path, 'rt', encoding='utf-8') if path.endswith('.gz') else open(path, encoding='utf-8')
+
+
+def parse_jobs(content: str) -> List[Dict]:
+    """Postings from a JSON document (a list, or a JSearch response with "data") or NDJSON text"""
+    stripped = content.lstrip()
+    if stripped.startswith('['):
+        return json.loads(stripped)
+    if stripped.startswith('{'):
+        try:
+            document = json.loads(stripped)
+        except json.JSONDecodeError:
+            document = None  # More than one object: NDJSON
+        if isinstance(document, dict):
+            return document.get('data', [document]) if 'data' in document else [document]
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+def iter_job_file(path: str) -> Iterator[Dict]:
+    """Postings from a .json/.ndjson/.jsonl file (optionally gzipped)"""
+    name = path[:-3] if path.endswith('.gz') else path
+    with _open_text(path) as f:
+        if name.endswith(('.ndjson', '.jsonl')):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from parse_jobs(f.read())
+
+# ============================================================
+# INDEX
+# ============================================================
+
+class JobIndex:
+    """
+    Postings stored as a CSR skill matrix (one flat array of skill ids plus
+    per-job offsets) and an inverted index skill id -> ascending job ids.
+
+    Scoring is vectorized with NumPy: one resume is scored against every job
+    by a weighted bincount over the postings of its skills, and a batch of
+    resumes against every job in memory-bounded sparse matrix passes
+    (see similarity.py). Methods: idf-weighted overlap (default), plain
+    overlap, Jaccard and TF-IDF cosine.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.skills: List[str] = []                 # skill id -> name
+        self._skill_ids: Dict[str, int] = {}
+        self._skill_data = array('I')               # CSR column indices
+        self._offsets = array('I', [0])             # CSR row pointers
+        self._postings: Dict[int, array] = {}       # skill id -> job ids (ascending)
+        self._live = array('I')                     # skill id -> postings not deleted (idf)
+        self._jobs: List[tuple] = []                # job metadata, see _META_FIELDS
+        self._by_job_id: Dict[str, int] = {}
+        self._deleted = set()
+        self._arrays = None                         # NumPy views, rebuilt after adds
+
+    _META_FIELDS = ('job_id', 'title', 'company', 'location', 'employment_type',
+                    'apply_link', 'posted_at', 'description')
+
+    def __len__(self) -> int:
+        return len(self._jobs) - len(self._deleted)
+
+    def add(self, job: Dict) -> int:
+        """Add one prepared posting; a repeated job_id replaces the earlier one"""
+        with self._lock:
+            self._arrays = None
+            doc = len(self._jobs)
+            previous = self._by_job_id.get(job['job_id']) if job['job_id'] else None
+            if previous is not None:
+                self._deleted.add(previous)
+                for skill_id in self.job_skill_ids(previous):
+                    self._live[skill_id] -= 1
+            if job['job_id']:
+                self._by_job_id[job['job_id']] = doc
+
+            skill_ids = []
+            for skill in job['skills']:
+                skill_id = self._skill_ids.get(skill)
+                if skill_id is None:
+                    skill_id = self._skill_ids[skill] = len(self.skills)
+                    self.skills.append(skill)
+                    self._postings[skill_id] = array('I')
+                    self._live.append(0)
+                skill_ids.append(skill_id)
+            skill_ids = sorted(set(skill_ids))
+            self._skill_data.extend(skill_ids)
+            self._offsets.append(len(self._skill_data))
+            for skill_id in skill_ids:
+                self._postings[skill_id].append(doc)
+                self._live[skill_id] += 1
+            self._jobs.append(tuple(job.get(field) for field in self._META_FIELDS))
+            return doc
+
+    def add_many(self, jobs: Iterable[Dict]) -> int:
+        count = 0
+        for job in jobs:
+            self.add(job)
+            count += 1
+        return count
+
+    def job_skill_ids(self, doc: int) -> array:
+        return self._skill_data[self._offsets[doc]:self._offsets[doc + 1]]
+
+    def idf(self, skill_id: int) -> float:
+        """Over live postings only: replaced ones no longer make a skill look common"""
+        return math.log((len(self) + 1) / (self._live[skill_id] + 1)) + 1
+
+    def job(self, doc: int) -> Dict:
+        return dict(zip(self._META_FIELDS, self._jobs[doc]))
+
+    def _accepts(self, doc: int, location: Optional[str], employment_type: Optional[str]) -> bool:
+        if doc in self._deleted:
+            return False
+        meta = self._jobs[doc]
+        if location and location.lower() not in (meta[3] or '').lower():
+            return False
+        if employment_type and employment_type.upper() != (meta[4] or '').upper():
+            return False
+        return True
+
+    def _numpy(self) -> Dict:
+        """
+        The skill matrix (CSR rows plus the postings as CSC columns), idf and
+        deletions as NumPy arrays. They are copies, so later adds can still
+        grow the underlying arrays; rebuilt on first use after an add.
+        """
+        if self._arrays is None:
+            postings = [self._postings[skill_id] for skill_id in range(len(self.skills))]
+            col_indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+            col_indptr[1:] = np.cumsum([len(p) for p in postings])
+            col_rows = np.empty(int(col_indptr[-1]), dtype=np.int64)
+            for skill_id, docs in enumerate(postings):
+                col_rows[col_indptr[skill_id]:col_indptr[skill_id + 1]] = docs
+            matrix = SkillMatrix(np.array(self._offsets, dtype=np.int64), np.array(self._skill_data, dtype=np.int64),
+                                 len(self.skills), col_indptr, col_rows)
+            deleted = np.zeros(matrix.n_rows, dtype=bool)
+            deleted[list(self._deleted)] = True
+            self._arrays = {
+                'matrix': matrix,
+                'idf': smoothed_idf(len(self), np.array(self._live, dtype=np.int64)),
+                'lengths': matrix.row_lengths(),
+                'deleted': deleted,
+            }
+        return self._arrays
+
+    def _rank(self, scores: np.ndarray, top_k: int, location: Optional[str],
+              employment_type: Optional[str]) -> List[tuple]:
+        """Best (score, doc) pairs; ties go to the posting asking for fewer skills, then the newer one"""
+        lengths = self._numpy()['lengths']
+        filtered = bool(location or employment_type or self._deleted)
+        rounded = np.round(scores, 9)
+        positive = np.flatnonzero(rounded > 0)
+        wanted = top_k
+        while True:
+            if wanted >= len(positive):
+                candidates = positive
+            else:
+                # Keep everything tied with the wanted-th best score so tie-breaks stay exact
+                kth = np.partition(rounded[positive], len(positive) - wanted)[len(positive) - wanted]
+                candidates = positive[rounded[positive] >= kth]
+            ordered = candidates[np.lexsort((-candidates, lengths[candidates], -rounded[candidates]))]
+            top = []
+            for doc in ordered.tolist():
+                if not filtered or self._accepts(doc, location, employment_type):
+                    top.append((float(scores[doc]), doc))
+                    if len(top) == top_k:
+                        return top
+            if len(candidates) == len(positive):
+                return top
+            wanted *= 4  # Filters rejected too many: widen the candidate set
+
+    def _result(self, doc: int, score: float, query: set) -> Dict:
+        job_skills = [self.skills[s] for s in self.job_skill_ids(doc)]
+        matched = [s for s in job_skills if self._skill_ids[s] in query]
+        return {
+            **self.job(doc),
+            'score': round(score, 4),
+            'coverage': round(len(matched) / len(job_skills), 3) if job_skills else 0.0,
+            'matched_skills': matched,
+            'missing_skills': [s for s in job_skills if self._skill_ids[s] not in query],
+        }
+
+    def match(self, skills: Iterable[str], top_k: int = 20, location: Optional[str] = None,
+              employment_type: Optional[str] = None, method: str = 'weighted') -> List[Dict]:
+        """Top-k postings for a set of resume skills, best first"""
+        if method not in METHODS:
+            raise ValueError(f"Unknown similarity method: {method}")
+        with self._lock:
+            arrays = self._numpy()
+            queries = query_matrix([skills], self._skill_ids)
+            query = set(queries.indices.tolist())
+            scores = similarity(queries, arrays['matrix'], method, arrays['idf'])[0]
+            return [self._result(doc, score, query)
+                    for score, doc in self._rank(scores, top_k, location, employment_type)]
+
+    def match_many(self, skill_lists: List[Iterable[str]], top_k: int = 20,
+                   method: str = 'weighted') -> List[List[Dict]]:
+        """Top-k postings for each of many resumes, scored in batched matrix passes"""
+        if method not in METHODS:
+            raise ValueError(f"Unknown similarity method: {method}")
+        with self._lock:
+            arrays = self._numpy()
+            queries = query_matrix(skill_lists, self._skill_ids)
+            docs, scores = top_matches(queries, arrays['matrix'], top_k, method, arrays['idf'],
+                                       exclude=arrays['deleted'] if self._deleted else None,
+                                       tiebreak=arrays['lengths'])
+            results = []
+            for row in range(queries.n_rows):
+                query = set(queries.indices[queries.indptr[row]:queries.indptr[row + 1]].tolist())
+                results.append([self._result(doc, score, query)
+                                for doc, score in zip(docs[row].tolist(), scores[row].tolist()) if doc >= 0])
+            return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'jobs': len(self),
+                'skills': len(self.skills),
+                'postings': len(self._skill_data),
+                'deleted': len(self._deleted),
+            }
+
+# ============================================================
+# PERSISTENCE
+# ============================================================
+
+def save_prepared(jobs: Iterable[Dict], path: str, append: bool = True) -> int:
+    """Append prepared postings to a gzip NDJSON file (one gzip member per call)"""
+    lines = [json.dumps(job, ensure_ascii=False) for job in jobs]
+    if lines:
+        with open(path, 'ab' if append else 'wb') as f:
+            f.write(gzip.compress(('\n'.join(lines) + '\n').encode('utf-8')))
+    return len(lines)
+
+
+def load_index(path: str, index: Optional[JobIndex] = None) -> JobIndex:
+    """Build (or extend) an index from a prepared-postings file"""
+    index = index or JobIndex()
+    version = get_taxonomy().version
+    stale = 0
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            job = json.loads(line)
+            stale += job.get('taxonomy_version') != version or job.get('prepare_version') != PREPARE_VERSION
+            index.add(job)
+    if stale:
+        logger.warning(f"{stale} postings in {path} were matched with an older skill taxonomy or matcher; "
+                       f"re-run ingest to refresh them")
+    return index
+
+
+def ingest_files(paths: List[str], output: str, workers: int, chunk_size: int = 500) -> int:
+    """Prepare postings from dump files in parallel and append them to output"""
+    def chunks() -> Iterator[List[Dict]]:
+        chunk = []
+        for path in paths:
+            for raw in iter_job_file(path):
+                chunk.append(raw)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    total = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for prepared in executor.map(prepare_jobs, chunks()):
+            total += save_prepared(prepared, output)
+            print(f"\r{total} postings ingested", end='', file=sys.stderr)
+    print(file=sys.stderr)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job posting ingestion and matching")
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help="Match skills in JSON/NDJSON job dumps")
+    ingest.add_argument('files', nargs='+')
+    ingest.add_argument('--output', '-o', default="jobs.ndjson.gz")
+    ingest.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    match = commands.add_parser('match', help="Rank ingested jobs against saved resume results")
+    match.add_argument('resumes', nargs='+', help="resume_data_*.json or JSON extraction results")
+    match.add_argument('--index', default="jobs.ndjson.gz")
+    match.add_argument('--top', type=int, default=10)
+    match.add_argument('--method', choices=METHODS, default='weighted')
+    args = parser.parse_args()
+
+    if args.command == 'ingest':
+        started = time.perf_counter()
+        total = ingest_files(args.files, args.output, args.workers)
+        elapsed = time.perf_counter() - started
+        print(json.dumps({'ingested': total, 'seconds': round(elapsed, 2),
+                          'jobs_per_second': round(total / elapsed, 1) if elapsed else 0.0}), file=sys.stderr)
+    else:
+        skill_lists = []
+        for path in args.resumes:
+            with open(path, encoding='utf-8') as f:
+                resume = json.load(f)
+            resume = resume.get('data', resume)
+            skill_lists.append(resume['skills']['all_skills'])
+        index = load_index(args.index)
+        started = time.perf_counter()
+        matches = index.match_many(skill_lists, args.top, args.method)
+        print(f"Matched {len(skill_lists)} resumes in {(time.perf_counter() - started) * 1000:.1f} ms "
+              f"over {len(index)} jobs", file=sys.stderr)
+        for path, results in zip(args.resumes, matches):
+            for result in results:
+                print(json.dumps({'resume': path, **result}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
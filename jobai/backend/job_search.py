@@ -0,0 +1,259 @@
+"""
+Live job search through JSearch
+Turns a resume's search keywords (job_titles x locations) into provider
+queries and runs them concurrently over one pooled HTTP client. Calls are
+rate limited, identical queries in flight are coalesced (many users with the
+same top title share one upstream call), and results are kept in a TTL cache.
+The merged response is deduplicated by job_id.
+
+Settings: JSEARCH_API_KEY, JSEARCH_BASE_URL (point it at mock_jsearch.py to
+develop without a key), JOB_SEARCH_RATE / JOB_SEARCH_BURST (calls per second),
+JOB_SEARCH_MAX_CONNECTIONS, JOB_SEARCH_TIMEOUT, JOB_SEARCH_CACHE_SIZE,
+JOB_SEARCH_CACHE_TTL.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from metrics import Counter, Histogram
+from result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+JSEARCH_BASE_URL = "https://jsearch.p.rapidapi.com"
+JSEARCH_HOST = "jsearch.p.rapidapi.com"
+
+# Reciprocal rank fusion constant: a posting's score is the sum of
+# 1 / (RRF_K + rank) over the queries that returned it
+RRF_K = 60
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+SEARCH_REQUESTS = Counter('job_search_queries_total', "Job search queries, by cache result", ['result'])
+UPSTREAM_SECONDS = Histogram('job_search_upstream_seconds', "Job search provider call latency", ['status'])
+
+
+class JobSearchError(Exception):
+    """The provider failed or refused a query"""
+
+
+class RateLimiter:
+    """Token bucket: rate calls per second on average, bursts of up to burst"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()  # Waiters are served in arrival order
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+# ============================================================
+# QUERIES AND MERGING
+# ============================================================
+
+def normalize(text: str) -> str:
+    return ' '.join(text.lower().split())
+
+
+def build_queries(job_titles: Sequence[str], locations: Sequence[str], max_queries: int) -> List[str]:
+    """
+    Provider queries, best first: every location for the top title, then the
+    next title, until max_queries. "Remote" and empty locations search the
+    title alone.
+    """
+    places = list(dict.fromkeys(
+        '' if normalize(location) in ('', 'remote') else location.strip() for location in locations
+    )) or ['']
+    queries = []
+    for title in dict.fromkeys(title.strip() for title in job_titles if title.strip()):
+        for place in places:
+            queries.append(f"{title} in {place}" if place else title)
+    return list(dict.fromkeys(queries))[:max_queries]
+
+
+def dedupe_key(job: Dict) -> str:
+    """job_id, or title + employer + city for postings without one"""
+    if job.get('job_id'):
+        return str(job['job_id'])
+    return '|'.join(normalize(str(job.get(field) or '')) for field in ('job_title', 'employer_name', 'job_city'))
+
+
+def merge_results(results: Sequence[Tuple[str, List[Dict]]]) -> List[Dict]:
+    """
+    One list from several queries' results, duplicates merged, ranked by
+    reciprocal rank fusion (ties keep first-seen order). Each posting lists the
+    queries that returned it under matched_queries.
+    """
+    merged: Dict[str, Dict] = {}
+    for query, jobs in results:
+        for rank, job in enumerate(jobs):
+            key = dedupe_key(job)
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = {'job': job, 'score': 0.0, 'queries': [], 'order': len(merged)}
+            if query not in entry['queries']:
+                entry['queries'].append(query)
+                entry['score'] += 1.0 / (RRF_K + rank + 1)
+    ranked = sorted(merged.values(), key=lambda entry: (-entry['score'], entry['order']))
+    # Copies: the cached provider dicts are shared between requests
+    return [dict(entry['job'], matched_queries=entry['queries']) for entry in ranked]
+
+# ============================================================
+# CLIENT
+# ============================================================
+
+class JobSearchClient:
+    """Pooled, rate-limited, coalescing and caching JSearch client"""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = JSEARCH_BASE_URL,
+                 rate: float = 5.0, burst: int = 10, max_connections: int = 20,
+                 timeout: float = 15.0, cache_size: int = 2048, cache_ttl: float = 1800,
+                 retries: int = 2, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.retries = retries
+        self.limiter = RateLimiter(rate, burst)
+        self.cache = ResultCache(max_entries=cache_size, ttl_seconds=cache_ttl)
+        self._limits = httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_connections)
+        self._timeout = timeout
+        self._transport = transport  # httpx.ASGITransport(app=mock_jsearch.app) for tests
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._counters = {'upstream_calls': 0, 'coalesced': 0, 'errors': 0}
+
+    @classmethod
+    def from_env(cls) -> "JobSearchClient":
+        return cls(
+            api_key=os.getenv("JSEARCH_API_KEY") or None,
+            base_url=os.getenv("JSEARCH_BASE_URL", JSEARCH_BASE_URL),
+            rate=float(os.getenv("JOB_SEARCH_RATE", "5")),
+            burst=int(os.getenv("JOB_SEARCH_BURST", "10")),
+            max_connections=int(os.getenv("JOB_SEARCH_MAX_CONNECTIONS", "20")),
+            timeout=float(os.getenv("JOB_SEARCH_TIMEOUT", "15")),
+            cache_size=int(os.getenv("JOB_SEARCH_CACHE_SIZE", "2048")),
+            cache_ttl=float(os.getenv("JOB_SEARCH_CACHE_TTL", "1800")),
+        )
+
+    @property
+    def configured(self) -> bool:
+        """An API key, or a provider other than RapidAPI's (a local mock)"""
+        return bool(self.api_key) or self.base_url != JSEARCH_BASE_URL
+
+    async def start(self):
+        if self._client is None:
+            headers = {"X-RapidAPI-Host": JSEARCH_HOST}
+            if self.api_key:
+                headers["X-RapidAPI-Key"] = self.api_key
+            self._client = httpx.AsyncClient(base_url=self.base_url, headers=headers, limits=self._limits,
+                                             timeout=self._timeout, transport=self._transport)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict:
+        return {
+            **self._counters,
+            'in_flight': len(self._inflight),
+            'cache': self.cache.stats(),
+        }
+
+    async def search(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
+        """
+        Postings for one query. Served from the cache, or from a call for the
+        same query already in flight, before going to the provider.
+        """
+        params = {k: v for k, v in (params or {}).items() if v not in (None, '')}
+        key = normalize(query) + '?' + '&'.join(f"{k}={normalize(str(v))}" for k, v in sorted(params.items()))
+        cached = self.cache.get(key)
+        if cached is not None:
+            SEARCH_REQUESTS.inc(result="hit")
+            return cached['jobs']
+
+        future = self._inflight.get(key)
+        if future is None:
+            SEARCH_REQUESTS.inc(result="miss")
+            future = asyncio.ensure_future(self._fetch(key, query, params))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            SEARCH_REQUESTS.inc(result="coalesced")
+            self._counters['coalesced'] += 1
+        # Shielded: one caller giving up must not cancel the call for the others
+        return await asyncio.shield(future)
+
+    async def _fetch(self, key: str, query: str, params: Dict) -> List[Dict]:
+        if self._client is None:
+            await self.start()
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire()
+            self._counters['upstream_calls'] += 1
+            started = time.perf_counter()
+            try:
+                response = await self._client.get("/search", params={'query': query, **params})
+            except httpx.HTTPError as e:
+                UPSTREAM_SECONDS.observe(time.perf_counter() - started, status="error")
+                if attempt == self.retries:
+                    self._counters['errors'] += 1
+                    raise JobSearchError(f"{type(e).__name__}: {e}") from e
+                await asyncio.sleep(0.5 * 2 ** attempt)
+                continue
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, status=str(response.status_code))
+
+            if response.status_code in RETRY_STATUS and attempt < self.retries:
+                try:
+                    delay = float(response.headers.get('retry-after', ''))
+                except ValueError:
+                    delay = 0.5 * 2 ** attempt
+                await asyncio.sleep(min(delay, 10.0))
+                continue
+            if response.status_code != 200:
+                self._counters['errors'] += 1
+                raise JobSearchError(f"Provider returned {response.status_code} for '{query}'")
+
+            try:
+                body = response.json()
+            except ValueError:
+                body = None  # An HTML error page or a truncated body, sent with a 200
+            if not isinstance(body, dict):
+                self._counters['errors'] += 1
+                raise JobSearchError(f"Provider returned an invalid response for '{query}'")
+            jobs = body.get('data') or []
+            self.cache.put(key, {'jobs': jobs})
+            return jobs
+
+    async def search_many(self, queries: Sequence[str], params: Optional[Dict] = None) -> Dict:
+        """
+        All queries concurrently, merged into one deduplicated list. A failed
+        query is reported under errors; the others still count.
+        """
+        outcomes = await asyncio.gather(*(self.search(query, params) for query in queries),
+                                        return_exceptions=True)
+        results, errors = [], []
+        for query, outcome in zip(queries, outcomes):
+            if isinstance(outcome, JobSearchError):
+                errors.append({'query': query, 'error': str(outcome)})
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                results.append((query, outcome))
+        if errors and not results:
+            raise JobSearchError(errors[0]['error'])
+        return {'jobs': merge_results(results), 'errors': errors}
@@ -0,0 +1,338 @@
+"""
+Load test for the resume API
+Drives /api/extract-resume with a mix of synthetic PDF sizes while probing
+/health, and reports throughput, tail latency, error rate and event loop lag
+
+Run with:
+    python loadtest.py --concurrency 16 --duration 30                 # in-process ASGI app
+    python loadtest.py --launch --workers 4 --pool-mode thread        # local uvicorn
+    python loadtest.py --url http://localhost:8000 --profile step
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from bench_extraction import percentile, render_pdf, synthetic_resume_text
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ============================================================
+# PAYLOADS AND PROFILES
+# ============================================================
+
+def parse_mix(mix: str) -> List[Tuple[int, float]]:
+    """'1:6,5:3,20:1' -> [(pages, weight), ...]"""
+    pairs = []
+    for item in mix.split(','):
+        pages, _, weight = item.partition(':')
+        pairs.append((int(pages), float(weight or 1)))
+    return pairs
+
+
+def build_payloads(mix: List[Tuple[int, float]], variants: int = 3) -> List[Dict]:
+    """A few distinct PDFs per page count, each carrying its mix weight"""
+    payloads = []
+    for pages, weight in mix:
+        for seed in range(variants):
+            payloads.append({
+                'name': f"{pages}p",
+                'content': render_pdf(synthetic_resume_text(pages, seed=pages * 100 + seed)),
+                'weight': weight / variants,
+            })
+    return payloads
+
+
+def cache_busted(content: bytes, n: int) -> bytes:
+    """Append a PDF comment so every upload hashes differently (PDF readers ignore it)"""
+    return content + f"\n% loadtest {n}\n".encode()
+
+
+def target_concurrency(profile: str, elapsed: float, duration: float,
+                       concurrency: int, steps: int) -> int:
+    """Active virtual users at a point in the run"""
+    if profile == "constant":
+        return concurrency
+    progress = min(1.0, elapsed / duration) if duration else 1.0
+    if profile == "linear":
+        return max(1, math.ceil(concurrency * progress))
+    if profile == "step":
+        step = min(steps, int(progress * steps) + 1)
+        return max(1, math.ceil(concurrency * step / steps))
+    raise ValueError(f"Unknown profile: {profile}")
+
+# ============================================================
+# RECORDING
+# ============================================================
+
+class LoadStats:
+    """Per-request samples plus loop lag readings"""
+
+    def __init__(self):
+        self.samples: List[Dict] = []
+        self.client_lag: List[float] = []
+        self.server_lag: List[Dict] = []
+
+    def record(self, endpoint: str, status, seconds: float, level: int, size: int = 0):
+        self.samples.append({
+            'endpoint': endpoint,
+            'status': status,
+            'seconds': seconds,
+            'level': level,
+            'size': size,
+        })
+
+    @staticmethod
+    def _latency(samples: List[Dict], elapsed: float) -> Dict:
+        latencies = [s['seconds'] for s in samples]
+        errors = sum(1 for s in samples if not isinstance(s['status'], int) or s['status'] >= 400)
+        ok = len(samples) - errors
+        return {
+            'requests': len(samples),
+            'errors': errors,
+            'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+            'throughput_rps': round(ok / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+            'max_ms': round(max(latencies) * 1000, 1) if latencies else None,
+            'status_codes': dict(Counter(str(s['status']) for s in samples)),
+        }
+
+    def report(self, elapsed: float, level_seconds: Dict[int, float]) -> Dict:
+        by_endpoint = defaultdict(list)
+        for sample in self.samples:
+            by_endpoint[sample['endpoint']].append(sample)
+
+        extract = by_endpoint.get('extract', [])
+        by_level = defaultdict(list)
+        for sample in extract:
+            by_level[sample['level']].append(sample)
+
+        server_p99 = [s['p99_ms'] for s in self.server_lag if s.get('p99_ms') is not None]
+        server_max = [s['max_ms'] for s in self.server_lag if s.get('max_ms') is not None]
+        return {
+            'elapsed_seconds': round(elapsed, 2),
+            'endpoints': {name: self._latency(samples, elapsed) for name, samples in by_endpoint.items()},
+            'by_concurrency': {
+                level: self._latency(samples, level_seconds.get(level, elapsed))
+                for level, samples in sorted(by_level.items())
+            },
+            'mb_per_second': round(sum(s['size'] for s in extract if s['status'] == 200)
+                                   / (1024 * 1024) / elapsed, 2) if elapsed else 0.0,
+            'event_loop_lag': {
+                'client_p99_ms': round(percentile(self.client_lag, 99) * 1000, 2) if self.client_lag else None,
+                'client_max_ms': round(max(self.client_lag) * 1000, 2) if self.client_lag else None,
+                'server_p99_ms': max(server_p99) if server_p99 else None,
+                'server_max_ms': max(server_max) if server_max else None,
+            },
+        }
+
+# ============================================================
+# CLIENTS
+# ============================================================
+
+@asynccontextmanager
+async def in_process_client(env: Dict[str, str]):
+    """httpx client bound to main:app through ASGITransport, with startup/shutdown run"""
+    os.environ.update(env)
+    sys.path.insert(0, BACKEND_DIR)
+    import main  # Reads pool/cache settings from the environment at import
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest",
+                                     timeout=120) as client:
+            yield client
+
+
+@asynccontextmanager
+async def launched_server(env: Dict[str, str], port: int, startup_timeout: float = 60):
+    """Run uvicorn main:app in a subprocess and yield its base URL"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+         "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **env},
+        cwd=os.getcwd(),
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        async with httpx.AsyncClient(timeout=2) as probe:
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+                try:
+                    if (await probe.get(f"{url}/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not become healthy in time")
+                await asyncio.sleep(0.2)
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+# ============================================================
+# RUN
+# ============================================================
+
+async def run_load(client: httpx.AsyncClient, payloads: List[Dict], args) -> Dict:
+    stats = LoadStats()
+    started = time.perf_counter()
+    end = started + args.duration
+    weights = [p['weight'] for p in payloads]
+    counter = iter(range(sys.maxsize))
+    level_seconds: Dict[int, float] = defaultdict(float)
+
+    def current_level() -> int:
+        return target_concurrency(args.profile, time.perf_counter() - started, args.duration,
+                                  args.concurrency, args.steps)
+
+    async def virtual_user(index: int, rng: random.Random):
+        while time.perf_counter() < end:
+            level = current_level()
+            if index >= level:
+                await asyncio.sleep(0.05)
+                continue
+            payload = rng.choices(payloads, weights)[0]
+            content = payload['content'] if args.allow_cache else cache_busted(payload['content'], next(counter))
+            request_started = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/api/extract-resume",
+                    files={'resume': (f"loadtest_{payload['name']}.pdf", content, 'application/pdf')}
+                )
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            stats.record('extract', status, time.perf_counter() - request_started, level, len(content))
+
+    async def health_prober():
+        while time.perf_counter() < end:
+            request_started = time.perf_counter()
+            try:
+                response = await client.get("/health")
+                status = response.status_code
+                if status == 200:
+                    lag = response.json().get('event_loop_lag')
+                    if lag:
+                        stats.server_lag.append(lag)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            stats.record('health', status, time.perf_counter() - request_started, current_level())
+            await asyncio.sleep(args.health_interval)
+
+    async def lag_ticker():
+        # In-process this is the server's loop; against a URL it checks the client itself
+        loop = asyncio.get_running_loop()
+        while time.perf_counter() < end:
+            expected = loop.time() + 0.1
+            await asyncio.sleep(0.1)
+            stats.client_lag.append(max(0.0, loop.time() - expected))
+
+    async def level_clock():
+        last = time.perf_counter()
+        while last < end:
+            await asyncio.sleep(0.1)
+            now = time.perf_counter()
+            level_seconds[current_level()] += now - last
+            last = now
+
+    rng = random.Random(args.seed)
+    await asyncio.gather(
+        *(virtual_user(i, random.Random(rng.random())) for i in range(args.concurrency)),
+        health_prober(), lag_ticker(), level_clock()
+    )
+    return stats.report(time.perf_counter() - started, level_seconds)
+
+
+def print_report(report: Dict, out=sys.stdout):
+    print(f"\nRan {report['elapsed_seconds']}s, {report['mb_per_second']} MB/s extracted", file=out)
+    header = f"{'':<14}{'reqs':>7}{'err%':>7}{'rps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    print(header, file=out)
+    rows = [(name, row) for name, row in report['endpoints'].items()]
+    rows += [(f"  @{level} users", row) for level, row in report['by_concurrency'].items()]
+    for name, row in rows:
+        print(f"{name:<14}{row['requests']:>7}{row['error_rate'] * 100:>7.1f}{row['throughput_rps']:>8}"
+              f"{row['p50_ms'] or 0:>9}{row['p95_ms'] or 0:>9}{row['p99_ms'] or 0:>9}{row['max_ms'] or 0:>9}",
+              file=out)
+    for name, row in report['endpoints'].items():
+        print(f"{name} status codes: {row['status_codes']}", file=out)
+    print(f"Event loop lag: {report['event_loop_lag']}", file=out)
+
+
+async def main_async(args) -> Dict:
+    payloads = build_payloads(parse_mix(args.mix))
+    env = {'EXTRACTION_POOL_MODE': args.pool_mode}
+    if args.workers:
+        env['EXTRACTION_WORKERS'] = str(args.workers)
+    if args.max_pending:
+        env['EXTRACTION_MAX_PENDING'] = str(args.max_pending)
+
+    print(f"Load: {args.concurrency} users, {args.profile} profile, {args.duration}s, mix {args.mix}",
+          file=sys.stderr)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=120) as client:
+            return await run_load(client, payloads, args)
+    if args.launch:
+        async with launched_server(env, args.port) as url:
+            async with httpx.AsyncClient(base_url=url, timeout=120) as client:
+                return await run_load(client, payloads, args)
+    async with in_process_client(env) as client:
+        return await run_load(client, payloads, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the resume extraction API")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', help="Test a running server instead of the in-process app")
+    target.add_argument('--launch', action='store_true', help="Start a local uvicorn for the run")
+    parser.add_argument('--port', type=int, default=8765, help="Port for --launch")
+    parser.add_argument('--concurrency', type=int, default=8, help="Peak concurrent uploads")
+    parser.add_argument('--duration', type=float, default=20, help="Seconds to run")
+    parser.add_argument('--profile', choices=['constant', 'linear', 'step'], default='constant',
+                        help="How concurrency ramps up to its peak")
+    parser.add_argument('--steps', type=int, default=4, help="Levels for the step profile")
+    parser.add_argument('--mix', default="1:6,2:3,5:1", help="pages:weight list of PDF sizes")
+    parser.add_argument('--health-interval', type=float, default=0.5, help="Seconds between /health probes")
+    parser.add_argument('--allow-cache', action='store_true',
+                        help="Reuse identical PDFs (otherwise every upload bypasses the result cache)")
+    parser.add_argument('--workers', type=int, help="EXTRACTION_WORKERS for in-process/--launch runs")
+    parser.add_argument('--pool-mode', choices=['process', 'thread'], default='process',
+                        help="EXTRACTION_POOL_MODE for in-process/--launch runs")
+    parser.add_argument('--max-pending', type=int, help="EXTRACTION_MAX_PENDING for in-process/--launch runs")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Write the report to this file")
+    args = parser.parse_args()
+
+    # The API writes a resume_data_*.json per upload; keep those out of the repo
+    os.chdir(tempfile.mkdtemp(prefix="loadtest_"))
+
+    report = asyncio.run(main_async(args))
+    report['config'] = {k: v for k, v in vars(args).items() if k != 'json'}
+    print_report(report)
+    if args.json:
+        with open(os.path.join(BACKEND_DIR, args.json) if not os.path.isabs(args.json) else args.json,
+                  'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
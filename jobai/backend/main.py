@@ -2,26 +2,67 @@
 FastAPI Server for Resume Extraction
 Run with: uvicorn main:app --reload
 """
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, Header, Request, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, List, Optional
+from collections import deque
+import asyncio
+import gc
+import gzip
+import io
 import logging
 import json
+import os
+import time
+import zipfile
 from datetime import datetime
 
 # Import your resume extraction functions
 from resumeextraction import (
+    init_worker,
     load_nlp_model,
-    extract_resume_data,
-    generate_search_keywords,
-    validate_pdf
+    nlp_required,
+    ocr_resume_staged,
+    process_resume_staged,
+    validate_pdf,
+    extraction_version
 )
+from result_cache import ResultCache, content_hash, make_cache_key
+from result_store import ResultStore, ResultWriter, encode_record, make_record, store_from_env
+from candidate_store import CandidateIndex
+from job_index import JobIndex, load_index, parse_jobs, prepare_jobs, save_prepared
+from job_search import JobSearchClient, JobSearchError, build_queries
+from similarity import METHODS as SIMILARITY_METHODS
+from extraction_pool import ExtractionPool, PoolSaturated, map_bounded
+import metrics
+from metrics import CACHE_REQUESTS, ERRORS, NEAR_DUPLICATES, Gauge, RequestMetricsMiddleware
+from near_duplicates import DuplicateCheck, NearDuplicateIndex, signature_from_json, signature_to_json
+from serialization import dumps, encode_response
+from upload_guard import (
+    MULTIPART_OVERHEAD, UploadLimitMiddleware, UploadRejected, check_pdf, detach_upload, read_upload, size_limit_message
+)
+from batch_extract import summarize
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PROCESS_STARTED = time.perf_counter()
+startup_seconds: Optional[float] = None
+
+def rss_mb(pid="self") -> Optional[float]:
+    """Resident set size of a process in MB (Linux /proc only)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Job Finder Resume Extraction API",
@@ -29,7 +70,108 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# CORS middleware - allow Flutter app to connect
+MAX_UPLOAD_SIZE = 20 * 1024 * 1024  # 20MB per PDF
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "1000"))
+MAX_ZIP_UPLOAD_SIZE = int(os.getenv("MAX_ZIP_UPLOAD_SIZE", str(200 * 1024 * 1024)))
+MAX_BATCH_UPLOAD_SIZE = int(os.getenv("MAX_BATCH_UPLOAD_SIZE", str(500 * 1024 * 1024)))
+MAX_JSON_BODY_SIZE = 10 * 1024 * 1024
+# When set, toggling the profiler requires it in the X-Profiler-Token header
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN")
+
+# Extraction result cache, keyed by upload content hash + extractor version
+result_cache = ResultCache(
+    max_entries=int(os.getenv("RESULT_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.getenv("RESULT_CACHE_TTL", "3600")),
+    db_path=os.getenv("RESULT_CACHE_DB") or None
+)
+
+# Append-only store of every extraction (RESULT_STORE=sqlite|ndjson|none,
+# RESULT_STORE_PATH, RESULT_STORE_RETENTION_DAYS), written in the background.
+# Opened on startup, so importing this module creates no files.
+result_store: Optional[ResultStore] = None
+result_writer: Optional[ResultWriter] = None
+
+# Searchable index of every extracted profile, rebuilt from the result store
+# on startup (CANDIDATE_INDEX=0 disables it)
+candidate_index = CandidateIndex() if os.getenv("CANDIDATE_INDEX", "1") != "0" else None
+
+# MinHash/LSH index of every stored resume's text (NEAR_DUPLICATES=0 disables
+# it). An upload at least NEAR_DUPLICATE_THRESHOLD similar to a stored resume
+# is reported as its near-duplicate; at NEAR_DUPLICATE_REUSE or more, that
+# resume's extraction is returned instead of running the stages again.
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.85"))
+NEAR_DUPLICATE_REUSE = float(os.getenv("NEAR_DUPLICATE_REUSE", "0.95"))
+near_duplicate_index = NearDuplicateIndex() if os.getenv("NEAR_DUPLICATES", "1") != "0" else None
+
+# Ingested job postings for server-side matching, persisted as prepared
+# (skill-matched) postings in JOB_INDEX_PATH
+JOB_INDEX_PATH = os.getenv("JOB_INDEX_PATH", "jobs.ndjson.gz")
+JOB_INGEST_CHUNK = 500
+MAX_JOB_UPLOAD_SIZE = 200 * 1024 * 1024
+MAX_MATCH_BATCH = 1000
+job_index = JobIndex()
+
+# Live search through JSearch (JSEARCH_API_KEY / JSEARCH_BASE_URL, JOB_SEARCH_*):
+# one pooled client, rate limited, coalesced and cached across users
+MAX_SEARCH_QUERIES = 12
+job_search = JobSearchClient.from_env()
+
+# Worker pool for PDF parsing + extraction (EXTRACTION_POOL_MODE, EXTRACTION_WORKERS,
+# EXTRACTION_MAX_PENDING, EXTRACTION_TIMEOUT)
+extraction_pool = ExtractionPool.from_env("EXTRACTION", initializer=init_worker)
+
+# Files of one batch in flight at once: enough to keep every worker busy,
+# leaving the rest of the pool's slots to single uploads
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY") or min(extraction_pool.workers * 2,
+                                                                extraction_pool.max_pending))
+
+# Separate, smaller pool for scanned pages (OCR_POOL_MODE, OCR_WORKERS,
+# OCR_MAX_PENDING, OCR_TIMEOUT): seconds per page must not starve the text path.
+# Started on first use.
+ocr_pool = ExtractionPool.from_env(
+    "OCR", initializer=init_worker,
+    workers=max(1, (os.cpu_count() or 2) // 2), timeout=120
+)
+
+# Event loop lag: a ticker sleeps LOOP_LAG_INTERVAL and records how late it
+# wakes up. Anything blocking the loop (sync work in a handler) shows up here.
+LOOP_LAG_INTERVAL = 0.1
+loop_lag_samples = deque(maxlen=100)  # ~10s window
+
+async def monitor_loop_lag():
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + LOOP_LAG_INTERVAL
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        loop_lag_samples.append(max(0.0, loop.time() - expected))
+
+def loop_lag_stats() -> Dict:
+    samples = sorted(loop_lag_samples)
+    if not samples:
+        return {'last_ms': None, 'p99_ms': None, 'max_ms': None}
+    return {
+        'last_ms': round(loop_lag_samples[-1] * 1000, 2),
+        'p99_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 2),
+        'max_ms': round(samples[-1] * 1000, 2)
+    }
+
+# Refuse oversized bodies before multipart parsing spools them
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        "/api/extract-resume": MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD,
+        "/api/extract-resumes/batch": MAX_BATCH_UPLOAD_SIZE,
+        "/api/jobs/ingest": MAX_JOB_UPLOAD_SIZE + MULTIPART_OVERHEAD,
+    },
+    default=MAX_JSON_BODY_SIZE
+)
+
+# Around the upload guard, so rejected and failed requests are timed too
+app.add_middleware(RequestMetricsMiddleware)
+
+# CORS middleware - allow Flutter app to connect. Added last, so it is the
+# outermost layer and its headers reach the browser on every response,
+# including 413s from the upload guard.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, specify your Flutter app domain
@@ -38,13 +180,79 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load NLP model on startup
+# Live state read at scrape time
+Gauge('extraction_pool_pending', "Extraction jobs running or queued", lambda: extraction_pool.stats()['pending'])
+Gauge('extraction_pool_workers', "Extraction pool size", lambda: extraction_pool.workers)
+Gauge('ocr_pool_pending', "OCR jobs running or queued", lambda: ocr_pool.stats()['pending'])
+Gauge('result_store_queued', "Results waiting for the background writer",
+      lambda: result_writer.stats()['queued'] if result_writer else None)
+Gauge('result_cache_entries', "Entries in the extraction result cache", lambda: result_cache.stats()['memory_entries'])
+Gauge('candidate_index_profiles', "Profiles in the candidate index",
+      lambda: len(candidate_index) if candidate_index is not None else None)
+Gauge('near_duplicate_index_resumes', "Resumes in the near-duplicate index",
+      lambda: len(near_duplicate_index) if near_duplicate_index is not None else None)
+Gauge('job_index_postings', "Job postings in the match index", lambda: len(job_index))
+Gauge('job_search_in_flight', "Job search provider calls in flight", lambda: job_search.stats()['in_flight'])
+Gauge('event_loop_lag_seconds', "Latest event loop lag sample",
+      lambda: loop_lag_samples[-1] if loop_lag_samples else None)
+Gauge('process_resident_memory_megabytes', "API process RSS", lambda: rss_mb())
+Gauge('sampling_profiler_running', "1 while the sampling profiler is on", lambda: int(metrics.profiler.running))
+
+# Start extraction workers on startup
 @app.on_event("startup")
 async def startup_event():
-    """Load spaCy model when server starts"""
-    logger.info("Loading NLP model...")
-    load_nlp_model()
-    logger.info("✅ Server ready!")
+    """Start the extraction pool when server starts"""
+    global startup_seconds, result_store, result_writer
+    if nlp_required() and (extraction_pool.mode == "process" and
+                           (extraction_pool.start_method or "fork") == "fork"):
+        # Load once here so forked workers share the model copy-on-write;
+        # freezing keeps the GC from touching (and copying) those pages
+        load_nlp_model()
+        gc.freeze()
+    logger.info("Starting extraction workers...")
+    extraction_pool.start()
+    app.state.loop_lag_task = asyncio.create_task(monitor_loop_lag())
+    result_store = store_from_env()
+    if result_store:
+        result_writer = ResultWriter(
+            result_store,
+            batch_size=int(os.getenv("RESULT_STORE_BATCH_SIZE", "50")),
+            flush_interval=float(os.getenv("RESULT_STORE_FLUSH_INTERVAL", "1.0"))
+        )
+    if candidate_index is not None and result_store:
+        loaded = await asyncio.to_thread(candidate_index.add_many, result_store.iter_all())
+        logger.info(f"✅ Candidate index loaded: {loaded} results, {len(candidate_index)} profiles")
+    if near_duplicate_index is not None and result_store:
+        loaded = await asyncio.to_thread(near_duplicate_index.add_many, result_store.iter_latest())
+        if extraction_pool.mode == "process":
+            # Worker processes start their copy of the index from this file
+            await asyncio.to_thread(near_duplicate_index.save_segment)
+        logger.info(f"✅ Near-duplicate index loaded: {loaded} resumes")
+    if os.path.exists(JOB_INDEX_PATH):
+        await asyncio.to_thread(load_index, JOB_INDEX_PATH, job_index)
+        logger.info(f"✅ Job index loaded: {len(job_index)} postings")
+    if result_writer:
+        result_writer.start()
+    await job_search.start()
+    startup_seconds = round(time.perf_counter() - PROCESS_STARTED, 3)
+    logger.info(f"✅ Server ready in {startup_seconds}s!")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop extraction workers"""
+    global result_store, result_writer
+    task = getattr(app.state, 'loop_lag_task', None)
+    if task:
+        task.cancel()
+    if result_writer:
+        await result_writer.stop()
+        result_store.close()
+        result_store = result_writer = None
+    await job_search.close()
+    extraction_pool.shutdown()
+    ocr_pool.shutdown()
+    if near_duplicate_index is not None:
+        near_duplicate_index.close()
 
 # Response Models
 class ContactInfo(BaseModel):
@@ -64,6 +272,8 @@ class Skills(BaseModel):
     data_science_ai: List[str]
     other_tools: List[str]
     all_skills: List[str]
+    skill_confidence: Dict[str, float] = {}
+    possible_skills: Dict[str, float] = {}  # Typo guesses, not in all_skills
 
 class Experience(BaseModel):
     total_years: float
@@ -83,6 +293,7 @@ class JobPreferences(BaseModel):
 class SearchKeywords(BaseModel):
     primary_skills: List[str]
     job_titles: List[str]
+    job_title_scores: Dict[str, float] = {}
     technologies: List[str]
     experience_level: str
     locations: List[str]
@@ -97,6 +308,32 @@ class ResumeDataResponse(BaseModel):
     search_keywords: SearchKeywords
     raw_text_preview: str
 
+class MatchRequest(BaseModel):
+    skills: Optional[List[str]] = None
+    content_hash: Optional[str] = None
+    resume: Optional[Dict] = None
+    top_k: int = 20
+    location: Optional[str] = None
+    employment_type: Optional[str] = None
+    method: str = "weighted"
+
+class MatchBatchRequest(BaseModel):
+    resumes: List[MatchRequest]
+    top_k: int = 20
+    method: str = "weighted"
+
+class JobSearchRequest(BaseModel):
+    job_titles: Optional[List[str]] = None
+    locations: Optional[List[str]] = None
+    search_keywords: Optional[Dict] = None
+    content_hash: Optional[str] = None
+    max_queries: int = 6
+    num_pages: int = 1
+    date_posted: Optional[str] = None  # all, today, 3days, week, month
+    employment_types: Optional[str] = None  # FULLTIME,PARTTIME,CONTRACTOR,INTERN
+    country: Optional[str] = None
+    limit: int = 100
+
 # Endpoints
 @app.get("/")
 async def root():
@@ -107,25 +344,96 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /api/extract-resume": "Extract resume data from PDF",
-            "GET /health": "Health check"
+            "POST /api/extract-resumes/batch": "Extract many PDFs (or zips of PDFs), streamed as NDJSON",
+            "GET /api/results/{content_hash}": "Past extractions of an uploaded file",
+            "GET /api/results?user_id=...": "Past extractions for a user",
+            "GET /api/candidates/search": "Search extracted profiles by skills, years, location, title, level",
+            "POST /api/jobs/ingest": "Ingest JSearch-style job postings (JSON or NDJSON)",
+            "POST /api/match": "Rank ingested jobs against a resume",
+            "POST /api/match/batch": "Rank ingested jobs against many resumes in one pass",
+            "POST /api/jobs/search": "Live JSearch results for a resume's job titles and locations, merged",
+            "GET /health": "Health check",
+            "GET /metrics": "Prometheus metrics",
+            "GET /debug/profiler": "Sampling profiler state, or folded stacks with ?format=folded",
+            "POST /debug/profiler": "Turn the sampling profiler on or off"
         }
     }
 
 @app.get("/health")
 async def health():
     """Simple health check"""
-    return {"status": "ok", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "ok",
+        "timestamp": datetime.now().isoformat(),
+        "startup_seconds": startup_seconds,
+        "nlp_enabled": nlp_required(),
+        "memory": {
+            "rss_mb": rss_mb(),
+            "worker_rss_mb": [rss_mb(pid) for pid in extraction_pool.worker_pids() + ocr_pool.worker_pids()]
+        },
+        "event_loop_lag": loop_lag_stats(),
+        "cache": result_cache.stats(),
+        "result_store": result_writer.stats() if result_writer else None,
+        "candidate_index": candidate_index.stats() if candidate_index is not None else None,
+        "near_duplicate_index": near_duplicate_index.stats() if near_duplicate_index is not None else None,
+        "job_index": job_index.stats(),
+        "job_search": job_search.stats(),
+        "extraction_pool": extraction_pool.stats(),
+        "ocr_pool": ocr_pool.stats()
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Stage timings, request latency, counters and live gauges in the Prometheus text format"""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/debug/profiler")
+async def profiler_report(format: str = "stats", limit: Optional[int] = None):
+    """
+    Sampling profiler state, or with format=folded the sampled stacks
+    ("outer;inner;leaf count" lines for flamegraph.pl / speedscope)
+    """
+    if format == "folded":
+        return PlainTextResponse(metrics.profiler.folded(limit))
+    if format != "stats":
+        raise HTTPException(status_code=400, detail="format must be 'stats' or 'folded'")
+    return metrics.profiler.stats()
+
+@app.post("/debug/profiler")
+async def profiler_toggle(enabled: bool, interval_ms: float = 5.0, reset: bool = False,
+                          x_profiler_token: Optional[str] = Header(None)):
+    """Start or stop the sampling profiler; process pool workers follow with their next job"""
+    if PROFILER_TOKEN and x_profiler_token != PROFILER_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid profiler token")
+    if not 1 <= interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="interval_ms must be between 1 and 1000")
+    if reset:
+        metrics.profiler.reset()
+    if enabled:
+        metrics.profiler.start(interval_ms / 1000)
+        logger.info(f"✅ Sampling profiler on ({interval_ms:g}ms)")
+    else:
+        metrics.profiler.stop()
+        logger.info("✅ Sampling profiler off")
+    return metrics.profiler.stats()
 
 @app.post("/api/extract-resume", response_model=ResumeDataResponse)
-async def extract_resume(resume: UploadFile = File(...)):
+async def extract_resume(request: Request, resume: UploadFile = File(...),
+                         user_id: Optional[str] = Form(None)):
     """
     Extract resume data from uploaded PDF
     
     Args:
         resume: PDF file upload
+        user_id: Optional owner, recorded with the stored result
         
     Returns:
-        Complete resume data with search keywords
+        Complete resume data with search keywords. The pipeline always
+        produces this shape, so it is encoded once (and reused for the cache
+        and the result store) instead of being re-validated per request;
+        JSON or MessagePack by Accept, gzip/br by Accept-Encoding.
+        A near-duplicate of a stored resume is reported in the
+        X-Near-Duplicate-Of and X-Near-Duplicate-Similarity headers.
     """
     try:
         # Validate file type
@@ -135,67 +443,551 @@ async def extract_resume(resume: UploadFile = File(...)):
                 detail="Only PDF files are allowed"
             )
         
-        # Read file content
-        content = await resume.read()
+        # Read file content in chunks, stopping early when too large or not a PDF
+        try:
+            content = await read_upload(resume, MAX_UPLOAD_SIZE, require_pdf=True)
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
         
         # Validate PDF
-        max_size = 20 * 1024 * 1024  # 20MB
-        is_valid, msg = validate_pdf(content, resume.filename, max_size)
+        is_valid, msg = validate_pdf(content, resume.filename, MAX_UPLOAD_SIZE)
         if not is_valid:
             raise HTTPException(status_code=400, detail=msg)
         
+        # Page count, encryption, broken files: refused here, not in a pool job
+        try:
+            await asyncio.to_thread(check_pdf, content)
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        
+        # Same bytes + same extractor version -> reuse the previous result
+        digest = content_hash(content)
+        cache_key = make_cache_key(content, extraction_version(), digest)
+        cached = result_cache.get_encoded(cache_key)
+        CACHE_REQUESTS.inc(result="hit" if cached is not None else "miss")
+        if cached is not None:
+            logger.info(f"✅ Cache hit for resume: {resume.filename}")
+            data, body = cached
+            store_result(digest, data, resume.filename, user_id, data_json=body, cache_hit=True)
+            return await encode_response(request, data, body)
+        
         logger.info(f"Processing resume: {resume.filename}")
         
-        # Extract resume data
-        resume_data = extract_resume_data(content)
-        
-        # Generate search keywords
-        search_keywords = generate_search_keywords(resume_data)
-        
-        # Combine data
-        response_data = {
-            "contact_info": resume_data['contact_info'],
-            "skills": resume_data['skills'],
-            "experience": resume_data['experience'],
-            "education": resume_data['education'],
-            "projects": resume_data['projects'],
-            "job_preferences": resume_data['job_preferences'],
-            "search_keywords": search_keywords,
-            "raw_text_preview": resume_data['raw_text']
-        }
+        # Extract resume data + search keywords in the worker pool
+        try:
+            staged = await extract_staged(content)
+        except PoolSaturated:
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy processing other resumes, please retry",
+                headers={"Retry-After": "5"}
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=504,
+                detail="Resume processing timed out"
+            )
         
         logger.info(f"✅ Resume processed successfully: {resume.filename}")
+        response_data = staged['data']
+        body = staged.get('data_json') or dumps(response_data)
+        result_cache.put(cache_key, response_data, body)
         
-        # Save to JSON file (optional - for record keeping)
-        save_to_json(resume.filename, response_data)
+        store_result(digest, response_data, resume.filename, user_id, staged['artifacts'], body)
         
-        return response_data
+        return await encode_response(request, response_data, body,
+                               headers=near_duplicate_headers(staged.get('near_duplicate')))
         
-    except HTTPException:
+    except HTTPException as e:
+        ERRORS.inc(endpoint="extract_resume", type=error_type(e))
         raise
     except Exception as e:
+        ERRORS.inc(endpoint="extract_resume", type=type(e).__name__)
         logger.error(f"Error processing resume: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to process resume: {str(e)}"
         )
 
-def save_to_json(filename: str, data: dict):
-    """Save extracted data to JSON file"""
+async def extract_staged(content: bytes, wait: bool = False, reuse: bool = True) -> Dict:
+    """
+    Run the pipeline in the extraction pool; documents with scanned pages
+    come back from it unfinished and continue in the OCR pool
+    
+    wait: queue for a free pool slot (batch items) instead of raising PoolSaturated
+    
+    With the near-duplicate index on, the job checks the text against it as
+    soon as it is read; a close enough match returns the stored extraction
+    ({'data', 'data_json', 'artifacts': {'minhash'}}) without running the
+    stages (reuse=False only reports matches). Either way, a match is
+    described under 'near_duplicate'.
+    """
+    staged = await extraction_pool.run(process_resume_staged, content, duplicate_check(extraction_pool, reuse),
+                                       wait=wait)
+    if 'needs_ocr' in staged:
+        logger.info(f"Running OCR on {len(staged['needs_ocr'])} scanned pages")
+        staged = await ocr_pool.run(ocr_resume_staged, content, staged['pages'], staged['needs_ocr'],
+                                    duplicate_check(ocr_pool, reuse), wait=wait)
+    near = staged.get('near_duplicate')
+    if near is None:
+        return staged
+    
+    if 'data' not in staged:
+        prior = await prior_extraction(near['content_hash'])
+        if prior is None:
+            # Dropped from the store, or made by an older extractor version
+            return await extract_staged(content, wait, reuse=False)
+        NEAR_DUPLICATES.inc(result="reused")
+        logger.info(f"✅ Near-duplicate of {near['content_hash'][:12]} ({near['similarity']}), reusing its extraction")
+        return {'data': prior[0], 'data_json': prior[1],
+                'artifacts': {'minhash': signature_to_json(staged['signature'])},
+                'near_duplicate': {**near, 'reused': True}}
+    
+    NEAR_DUPLICATES.inc(result="reported")
+    staged['near_duplicate'] = {**near, 'reused': False}
+    return staged
+
+def duplicate_check(pool: ExtractionPool, reuse: bool = True) -> Optional[DuplicateCheck]:
+    """The near-duplicate lookup to send with a job to pool (None with the index off)"""
+    if near_duplicate_index is None:
+        return None
+    return near_duplicate_index.check(NEAR_DUPLICATE_THRESHOLD, NEAR_DUPLICATE_REUSE if reuse else None,
+                                      shared=pool.mode == "process")
+
+async def prior_extraction(digest: str) -> Optional[tuple]:
+    """(data, JSON body or None) of a stored resume, if made by the current extractor version"""
+    version = extraction_version()
+    cached = result_cache.get_encoded(make_cache_key(b"", version, digest))
+    if cached is not None:
+        return cached
+    if result_store is not None:
+        stored = await asyncio.to_thread(result_store.by_hash, digest, 1)
+        if stored and stored[0]['extractor_version'] == version:
+            return stored[0]['data'], None
+    return None
+
+def near_duplicate_headers(near: Optional[Dict]) -> Optional[Dict]:
+    if not near:
+        return None
+    return {
+        "X-Near-Duplicate-Of": near['content_hash'],
+        "X-Near-Duplicate-Similarity": str(near['similarity']),
+        "X-Near-Duplicate-Reused": "1" if near['reused'] else "0",
+    }
+
+def error_type(e: HTTPException) -> str:
+    """What caused an HTTP error: the exception it was raised from (PoolSaturated, ...) or its status"""
+    cause = e.__cause__ or e.__context__
+    return type(cause).__name__ if cause is not None else f"HTTP{e.status_code}"
+
+def zip_entries(archive: zipfile.ZipFile, archive_name: str) -> List[tuple]:
+    """Return (filename, load, error) for every PDF inside a zip archive; load() reads it"""
+    entries = []
+    for info in archive.infolist():
+        if info.is_dir() or not info.filename.lower().endswith('.pdf'):
+            continue
+        name = f"{archive_name}/{info.filename}"
+        if info.file_size > MAX_UPLOAD_SIZE:
+            entries.append((name, None, size_limit_message(MAX_UPLOAD_SIZE)))
+        else:
+            entries.append((name, lambda info=info: asyncio.to_thread(read_zip_entry, archive, info), None))
+    return entries
+
+def read_zip_entry(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    # Bounded read: declared sizes in a zip can lie
+    with archive.open(info) as f:
+        data = f.read(MAX_UPLOAD_SIZE + 1)
+    if len(data) > MAX_UPLOAD_SIZE:
+        raise UploadRejected(413, size_limit_message(MAX_UPLOAD_SIZE))
+    return data
+
+async def extract_batch_item(filename: str, load, error: Optional[str],
+                             user_id: Optional[str] = None) -> Dict:
+    """
+    Extract one file of a batch, reading it only now (load() returns its bytes);
+    failures are reported in the record, never raised
+    """
+    started = time.perf_counter()
+    record = {'filename': filename, 'size_bytes': 0}
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        json_filename = f"resume_data_{timestamp}.json"
+        if error:
+            raise ValueError(error)
+        try:
+            content = await load()
+            record['size_bytes'] = len(content)
+            is_valid, msg = validate_pdf(content, filename, MAX_UPLOAD_SIZE)
+            if not is_valid:
+                raise ValueError(msg)
+            await asyncio.to_thread(check_pdf, content)
+        except UploadRejected as e:
+            raise ValueError(e.detail)
         
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump({
-                "filename": filename,
-                "processed_at": datetime.now().isoformat(),
-                "data": data
-            }, f, indent=2, ensure_ascii=False)
+        digest = content_hash(content)
+        cache_key = make_cache_key(content, extraction_version(), digest)
+        cached = result_cache.get_encoded(cache_key)
+        CACHE_REQUESTS.inc(result="hit" if cached is not None else "miss")
+        artifacts = None
+        if cached is not None:
+            data, body = cached
+        else:
+            staged = await extract_staged(content, wait=True)
+            data, artifacts = staged['data'], staged['artifacts']
+            body = staged.get('data_json') or dumps(data)
+            result_cache.put(cache_key, data, body)
+            if staged.get('near_duplicate'):
+                record['near_duplicate'] = staged['near_duplicate']
+        store_result(digest, data, filename, user_id, artifacts, body, cache_hit=cached is not None)
         
-        logger.info(f"Data saved to {json_filename}")
+        record['status'] = 'ok'
+        record['data'] = data
+        record['_data_json'] = body  # Spliced into the NDJSON line as is
     except Exception as e:
-        logger.error(f"Failed to save JSON: {str(e)}")
+        ERRORS.inc(endpoint="extract_batch", type=type(e).__name__)
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return record
+
+@app.post("/api/extract-resumes/batch")
+async def extract_resumes_batch(resumes: List[UploadFile] = File(...),
+                                user_id: Optional[str] = Form(None)):
+    """
+    Extract many resumes in one call
+    
+    Args:
+        resumes: PDF files and/or zip archives of PDFs
+        user_id: Optional owner, recorded with each stored result
+        
+    Returns:
+        NDJSON stream: one record per file as soon as it finishes,
+        followed by a {"summary": ...} line with throughput figures
+    """
+    # Only the list of files is built here; each one is read when a slot
+    # frees up for it, from the spooled upload (kept open past this handler)
+    uploads = [detach_upload(upload) for upload in resumes]
+    archives = []
+    files = []
+    try:
+        for upload in uploads:
+            name = upload.filename or 'upload'
+            if name.lower().endswith('.zip'):
+                size = upload.size if upload.size is not None else upload.file.seek(0, io.SEEK_END)
+                if size > MAX_ZIP_UPLOAD_SIZE:
+                    files.append((name, None, size_limit_message(MAX_ZIP_UPLOAD_SIZE)))
+                    continue
+                try:
+                    archive = await asyncio.to_thread(zipfile.ZipFile, upload.file)
+                except zipfile.BadZipFile:
+                    files.append((name, None, "Invalid zip archive"))
+                    continue
+                archives.append(archive)
+                files.extend(zip_entries(archive, name))
+            else:
+                files.append((name, lambda upload=upload: read_upload(upload, MAX_UPLOAD_SIZE, require_pdf=True), None))
+            if len(files) > MAX_BATCH_FILES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Batch exceeds {MAX_BATCH_FILES} files"
+                )
+    except BaseException:
+        close_all(archives, uploads)
+        raise
+    
+    logger.info(f"Processing batch of {len(files)} resumes")
+    
+    async def stream():
+        started = time.perf_counter()
+        records = []
+        try:
+            async for record in map_bounded(lambda item: extract_batch_item(*item, user_id),
+                                            files, BATCH_CONCURRENCY):
+                records.append(record)
+                yield encode_record(record) + b"\n"
+        finally:
+            close_all(archives, uploads)
+        summary = summarize(records, time.perf_counter() - started)
+        logger.info(f"✅ Batch processed: {summary}")
+        yield dumps({'summary': summary}) + b"\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def close_all(archives: List[zipfile.ZipFile], uploads: List[UploadFile]):
+    for archive in archives:
+        archive.close()
+    for upload in uploads:
+        upload.file.close()
+
+def store_result(digest: str, data: Dict, filename: Optional[str], user_id: Optional[str],
+                 artifacts: Optional[Dict] = None, data_json: Optional[bytes] = None,
+                 cache_hit: bool = False):
+    """
+    Queue an extraction for the result store (never blocks the request) and index it.
+    artifacts (page texts, sections) let reindex.py re-run stages without the PDF;
+    data_json is the response body, stored without encoding data again.
+    A cache hit is stored as a reference row to the extraction it repeats.
+    """
+    if candidate_index is not None:
+        candidate_index.add(digest, data)
+    if near_duplicate_index is not None and artifacts:
+        signature = signature_from_json(artifacts.get('minhash'))
+        if signature is not None:
+            near_duplicate_index.add(digest, signature)
+    if result_writer and not result_writer.submit(
+        make_record(digest, data, filename=filename, user_id=user_id, version=extraction_version(),
+                    artifacts=artifacts, data_json=data_json, reference=cache_hit)
+    ):
+        logger.warning(f"Result store queue full, dropped result for {filename}")
+
+@app.get("/api/results/{digest}")
+async def results_by_hash(request: Request, digest: str, limit: int = 10):
+    """Past extractions of the file with this SHA-256, newest first"""
+    if result_store is None:
+        raise HTTPException(status_code=404, detail="Result store is disabled")
+    results = await asyncio.to_thread(result_store.by_hash, digest.lower(), min(limit, 100))
+    if not results:
+        raise HTTPException(status_code=404, detail="No results for this content hash")
+    return await encode_response(request, {"content_hash": digest.lower(), "results": results})
+
+@app.get("/api/results")
+async def results_by_user(request: Request, user_id: str, limit: int = 50):
+    """Past extractions uploaded by a user, newest first"""
+    if result_store is None:
+        raise HTTPException(status_code=404, detail="Result store is disabled")
+    results = await asyncio.to_thread(result_store.by_user, user_id, min(limit, 500))
+    return await encode_response(request, {"user_id": user_id, "results": results})
+
+def split_param(value: Optional[str]) -> List[str]:
+    """'Flutter, Firebase' -> ['Flutter', 'Firebase']"""
+    return [part.strip() for part in value.split(',') if part.strip()] if value else []
+
+@app.get("/api/candidates/search")
+async def search_candidates(
+    request: Request,
+    skills: Optional[str] = None,
+    titles: Optional[str] = None,
+    locations: Optional[str] = None,
+    levels: Optional[str] = None,
+    min_years: Optional[float] = None,
+    max_years: Optional[float] = None,
+    limit: int = 20,
+    offset: int = 0,
+    facets: bool = True
+):
+    """
+    Search extracted profiles
+    
+    Args:
+        skills: Comma-separated, all required (e.g. "Flutter,Firebase")
+        titles, locations, levels: Comma-separated, any one matches
+        min_years, max_years: Inclusive total experience range
+        
+    Returns:
+        Matching profiles newest first, total count and facet counts
+    """
+    if candidate_index is None:
+        raise HTTPException(status_code=404, detail="Candidate index is disabled")
+    started = time.perf_counter()
+    response = candidate_index.search(
+        skills=split_param(skills),
+        titles=split_param(titles),
+        locations=split_param(locations),
+        levels=split_param(levels),
+        min_years=min_years,
+        max_years=max_years,
+        limit=max(0, min(limit, 100)),
+        offset=max(0, offset),
+        facets=facets
+    )
+    response['took_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return await encode_response(request, response)
+
+@app.get("/api/candidates/{digest}")
+async def get_candidate(digest: str):
+    """Indexed profile summary for one upload content hash"""
+    profile = candidate_index.get(digest.lower()) if candidate_index is not None else None
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return profile
+
+@app.post("/api/jobs/ingest")
+async def ingest_jobs(jobs: UploadFile = File(...)):
+    """
+    Ingest job postings in the JSearch schema
+    
+    Args:
+        jobs: JSON (list or JSearch response with "data") or NDJSON file, optionally gzipped
+        
+    Returns:
+        Number of postings ingested and the index size
+    """
+    try:
+        content = await read_upload(jobs, MAX_JOB_UPLOAD_SIZE)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    try:
+        if content[:2] == b'\x1f\x8b':
+            content = await asyncio.to_thread(gzip.decompress, content)
+        raw_jobs = await asyncio.to_thread(parse_jobs, content.decode('utf-8'))
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse job postings: {e}")
+    
+    # Skill matching is CPU-bound: run it in the extraction pool, chunk by
+    # chunk, with as many chunks in flight as a batch upload gets
+    started = time.perf_counter()
+    chunks = ((i, raw_jobs[i:i + JOB_INGEST_CHUNK]) for i in range(0, len(raw_jobs), JOB_INGEST_CHUNK))
+    
+    async def prepare_chunk(chunk):
+        return chunk[0], await extraction_pool.run(prepare_jobs, chunk[1], wait=True)
+    
+    try:
+        prepared_chunks = dict([result async for result in map_bounded(prepare_chunk, chunks, BATCH_CONCURRENCY)])
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Preparing job postings timed out")
+    prepared = [job for _, chunk in sorted(prepared_chunks.items()) for job in chunk]
+    
+    await asyncio.to_thread(job_index.add_many, prepared)
+    await asyncio.to_thread(save_prepared, prepared, JOB_INDEX_PATH)
+    logger.info(f"✅ Ingested {len(prepared)} job postings from {jobs.filename}")
+    return {
+        "ingested": len(prepared),
+        "seconds": round(time.perf_counter() - started, 3),
+        "index": job_index.stats()
+    }
+
+async def resolve_skills(request: MatchRequest) -> List[str]:
+    """Skills of a match request given as a list, an extraction result or a content hash"""
+    if request.skills is not None:
+        return request.skills
+    if request.resume is not None:
+        return (request.resume.get('skills') or {}).get('all_skills', [])
+    if request.content_hash:
+        digest = request.content_hash.lower()
+        profile = candidate_index.get(digest) if candidate_index is not None else None
+        if profile is None and result_store is not None:
+            stored = await asyncio.to_thread(result_store.by_hash, digest, 1)
+            if stored:
+                profile = {'skills': stored[0]['data']['skills']['all_skills']}
+        if profile is None:
+            raise HTTPException(status_code=404, detail=f"No extraction found for content hash {digest}")
+        return profile['skills']
+    raise HTTPException(status_code=400, detail="Provide skills, resume or content_hash")
+
+def check_method(method: str):
+    if method not in SIMILARITY_METHODS:
+        raise HTTPException(status_code=400, detail=f"method must be one of {', '.join(SIMILARITY_METHODS)}")
+
+@app.post("/api/match")
+async def match_jobs(request: MatchRequest, http_request: Request):
+    """
+    Rank ingested jobs against a resume
+    
+    The resume is given as a skills list, a full extraction result, or the
+    content hash of a previously extracted upload. method is weighted
+    (idf-weighted overlap, default), overlap, jaccard or cosine.
+    
+    Returns:
+        Top-k jobs with score, coverage, matched and missing skills
+    """
+    check_method(request.method)
+    skills = await resolve_skills(request)
+    
+    started = time.perf_counter()
+    results = await asyncio.to_thread(
+        job_index.match, skills, max(1, min(request.top_k, 100)),
+        request.location, request.employment_type, request.method
+    )
+    return await encode_response(http_request, {
+        "jobs_indexed": len(job_index),
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": results
+    })
+
+@app.post("/api/match/batch")
+async def match_jobs_batch(request: MatchBatchRequest, http_request: Request):
+    """
+    Rank ingested jobs against many resumes, scored together in batched
+    vectorized passes (recruiter-side bulk matching)
+    
+    Each entry of resumes takes skills, resume or content_hash as in
+    /api/match; top_k and method apply to the whole batch.
+    
+    Returns:
+        One top-k list per resume, in request order
+    """
+    check_method(request.method)
+    if len(request.resumes) > MAX_MATCH_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_MATCH_BATCH} resumes per batch")
+    skill_lists = [await resolve_skills(resume) for resume in request.resumes]
+    
+    started = time.perf_counter()
+    matches = await asyncio.to_thread(
+        job_index.match_many, skill_lists, max(1, min(request.top_k, 100)), request.method
+    )
+    return await encode_response(http_request, {
+        "jobs_indexed": len(job_index),
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": matches
+    })
+
+async def resolve_search_keywords(request: JobSearchRequest) -> Dict:
+    """job_titles and locations given directly, as search_keywords, or by content hash"""
+    if request.job_titles is not None:
+        return {'job_titles': request.job_titles, 'locations': request.locations or []}
+    if request.search_keywords is not None:
+        return request.search_keywords
+    if request.content_hash:
+        digest = request.content_hash.lower()
+        if result_store is not None:
+            stored = await asyncio.to_thread(result_store.by_hash, digest, 1)
+            if stored:
+                return stored[0]['data']['search_keywords']
+        profile = candidate_index.get(digest) if candidate_index is not None else None
+        if profile is not None:
+            return {'job_titles': profile['job_titles'], 'locations': profile['locations']}
+        raise HTTPException(status_code=404, detail=f"No extraction found for content hash {digest}")
+    raise HTTPException(status_code=400, detail="Provide job_titles, search_keywords or content_hash")
+
+@app.post("/api/jobs/search")
+async def search_jobs(request: JobSearchRequest, http_request: Request):
+    """
+    Live job search for a resume in one call
+    
+    Searches the provider for the resume's top job titles in each of its
+    locations (see generate_search_keywords), all queries at once, and
+    merges the results. Identical queries from other users share the same
+    provider call and cache entry.
+    
+    Returns:
+        Deduplicated postings (JSearch fields plus matched_queries), best
+        ranked across queries first, and any queries that failed
+    """
+    if not job_search.configured:
+        raise HTTPException(status_code=503, detail="Job search is not configured (set JSEARCH_API_KEY)")
+    keywords = await resolve_search_keywords(request)
+    queries = build_queries(keywords.get('job_titles') or [], keywords.get('locations') or [],
+                            max(1, min(request.max_queries, MAX_SEARCH_QUERIES)))
+    if not queries:
+        raise HTTPException(status_code=400, detail="No job titles to search for")
+    params = {
+        'num_pages': max(1, min(request.num_pages, 5)),
+        'date_posted': request.date_posted,
+        'employment_types': request.employment_types,
+        'country': request.country,
+    }
+    
+    started = time.perf_counter()
+    try:
+        result = await job_search.search_many(queries, params)
+    except JobSearchError as e:
+        logger.error(f"❌ Job search failed: {e}")
+        raise HTTPException(status_code=502, detail=f"Job search provider error: {e}")
+    return await encode_response(http_request, {
+        "queries": queries,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "total": len(result['jobs']),
+        "jobs": result['jobs'][:max(1, min(request.limit, 500))],
+        "errors": result['errors']
+    })
 
 # Run with: uvicorn main:app --reload --host 0.0.0.0 --port 8000
 if __name__ == "__main__":
@@ -0,0 +1,365 @@
+"""
+Metrics and sampling profiler
+Histograms and counters rendered in the Prometheus text format for /metrics,
+stage timing hooks for the extraction pipeline, and an opt-in sampling
+profiler that can be switched on at runtime to capture hot paths under real
+traffic. Pool worker processes record into their own copy of the registry and
+ship deltas back with each job's result.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import Counter as TallyCounter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_metrics: Dict[str, 'Metric'] = {}
+
+# ============================================================
+# METRIC TYPES
+# ============================================================
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Metric(ABC):
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, object] = {}
+        with _lock:
+            _metrics[name] = self
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def drain(self) -> Dict[Tuple, object]:
+        with _lock:
+            values, self._values = self._values, {}
+        return values
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """Sample lines in the Prometheus text format"""
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def merge(self, values: Dict[Tuple, float]):
+        with _lock:
+            for key, amount in values.items():
+                self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with _lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {value:g}" for key, value in items]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with _lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (not cumulative) counts, then sum and count
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def merge(self, values: Dict[Tuple, list]):
+        with _lock:
+            for key, incoming in values.items():
+                state = self._values.get(key)
+                if state is None:
+                    self._values[key] = list(incoming)
+                else:
+                    for i, amount in enumerate(incoming):
+                        state[i] += amount
+
+    def render(self) -> List[str]:
+        with _lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {state[-2]:g}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+class Gauge(Metric):
+    """Read at scrape time from a callback returning {label values tuple: value}, or a number"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, read: Callable, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.read = read
+
+    def drain(self) -> Dict:
+        return {}  # Live state, never shipped between processes
+
+    def render(self) -> List[str]:
+        try:
+            values = self.read()
+        except Exception:
+            return []
+        if values is None:
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{_labels(self.labelnames, key)} {value:g}"
+                for key, value in sorted(values.items()) if value is not None]
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format"""
+    with _lock:
+        metrics = list(_metrics.values())
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+# ============================================================
+# PIPELINE METRICS
+# ============================================================
+
+STAGE_SECONDS = Histogram('resume_stage_seconds', "Time spent in each extraction stage", ['stage'])
+STAGE_ERRORS = Counter('resume_stage_errors_total', "Exceptions raised by extraction stages", ['stage', 'type'])
+PDF_PAGES = Counter('resume_pdf_pages_total', "PDF pages parsed")
+PDF_DOCUMENTS = Counter('resume_pdf_documents_total', "PDF documents opened")
+TEXT_CHARS = Counter('resume_text_chars_total', "Characters of text extracted from PDFs")
+TEXT_SIZE = Histogram('resume_text_chars', "Characters of text per resume",
+                      buckets=(500, 1000, 2500, 5000, 10000, 25000, 50000, 100000))
+OCR_PAGES = Counter('resume_ocr_pages_total', "Scanned pages sent to OCR, by page image cache result", ['result'])
+NEAR_DUPLICATES = Counter('resume_near_duplicates_total',
+                          "Uploads matching a stored resume, by whether its extraction was reused", ['result'])
+CACHE_REQUESTS = Counter('resume_cache_requests_total', "Extraction result cache lookups", ['result'])
+ERRORS = Counter('resume_errors_total', "Failed requests by endpoint and exception type", ['endpoint', 'type'])
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', "HTTP request latency",
+                            ['method', 'route', 'status'])
+
+
+def timed(stage: str):
+    """Decorator recording a function's duration (and exceptions) under a stage name"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                STAGE_ERRORS.inc(stage=stage, type=type(e).__name__)
+                raise
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+        return wrapper
+    return decorate
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing every HTTP request by route template (not raw path)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            REQUEST_SECONDS.observe(time.perf_counter() - started, method=scope['method'],
+                                    route=getattr(route, 'path', 'unmatched'), status=status[0])
+
+# ============================================================
+# WORKER PROCESSES
+# ============================================================
+
+_worker_pid: Optional[int] = None
+
+
+def drain() -> Dict:
+    """Take (and reset) everything recorded in this process since the last drain"""
+    with _lock:
+        metrics = list(_metrics.values())
+    delta = {metric.name: values for metric in metrics if (values := metric.drain())}
+    samples = profiler.drain()
+    return {'metrics': delta, 'samples': samples}
+
+
+def merge(delta: Optional[Dict]):
+    """Add a worker's drained delta to this process's registry"""
+    if not delta:
+        return
+    for name, values in delta.get('metrics', {}).items():
+        metric = _metrics.get(name)
+        if metric is not None and hasattr(metric, 'merge'):
+            metric.merge(values)
+    profiler.merge(delta.get('samples'))
+
+
+def run_collected(fn: Callable, args: tuple, profile_interval: Optional[float]):
+    """
+    Run fn in a pool worker process; returns (result, metrics delta). The
+    profiler follows the parent's setting, passed with every job.
+    """
+    global _worker_pid
+    if _worker_pid != os.getpid():
+        # Forked workers inherit the parent's counts: start from zero
+        _worker_pid = os.getpid()
+        drain()
+    profiler.follow(profile_interval)
+    try:
+        result = fn(*args)
+    except Exception as e:
+        e.metrics_delta = drain()  # Exception attributes survive pickling
+        raise
+    return result, drain()
+
+# ============================================================
+# SAMPLING PROFILER
+# ============================================================
+
+# Stacks whose innermost frame sits in these files are idle threads (waiting
+# on a lock, queue, socket or selector) and are not recorded
+IDLE_FILES = ('threading.py', 'selectors.py', 'queue.py', 'queues.py', 'connection.py', 'base_events.py')
+
+
+class SamplingProfiler:
+    """
+    Samples every thread's stack each interval and counts folded stacks
+    ("outer;inner;leaf" -> samples), the input format of flamegraph.pl and
+    speedscope. Costs one sys._current_frames() walk per interval while on.
+    """
+
+    def __init__(self):
+        self.interval: Optional[float] = None
+        self._samples: TallyCounter = TallyCounter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._sample_lock = threading.Lock()
+        self.started_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: float = 0.005):
+        self.interval = interval
+        if self._thread is None:
+            self._stop.clear()
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.interval = None
+
+    def follow(self, interval: Optional[float]):
+        """Match the parent process's on/off state (used in pool workers)"""
+        if interval and not self.running:
+            self.start(interval)
+        elif not interval and self.running:
+            self.stop()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or frame.f_code.co_filename.endswith(IDLE_FILES):
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stacks.append(';'.join(reversed(names)))
+            with self._sample_lock:
+                self._samples.update(stacks)
+
+    def drain(self) -> Dict[str, int]:
+        with self._sample_lock:
+            samples, self._samples = self._samples, TallyCounter()
+        return dict(samples)
+
+    def merge(self, samples: Optional[Dict[str, int]]):
+        if samples:
+            with self._sample_lock:
+                self._samples.update(samples)
+
+    def folded(self, limit: Optional[int] = None) -> str:
+        with self._sample_lock:
+            top = self._samples.most_common(limit)
+        return ''.join(f"{stack} {count}\n" for stack, count in top)
+
+    def reset(self):
+        self.drain()
+
+    def stats(self) -> Dict:
+        with self._sample_lock:
+            total = sum(self._samples.values())
+            distinct = len(self._samples)
+        return {
+            'running': self.running,
+            'interval_ms': round(self.interval * 1000, 2) if self.interval else None,
+            'started_at': self.started_at if self.running else None,
+            'samples': total,
+            'distinct_stacks': distinct,
+        }
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,64 @@
+"""
+Local stand-in for JSearch's /search endpoint
+Returns JSearch-shaped postings generated from the query, the same postings
+for the same query every time, with some postings shared between queries so
+merging and deduplication have work to do. MOCK_JSEARCH_LATENCY adds a delay
+per call (seconds); GET /stats reports how many calls it served.
+
+Run with:
+    uvicorn mock_jsearch:app --port 8001
+    JSEARCH_BASE_URL=http://localhost:8001 uvicorn main:app --port 8000
+"""
+import asyncio
+import hashlib
+import os
+from collections import Counter
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI
+
+app = FastAPI(title="Mock JSearch")
+
+LATENCY = float(os.getenv("MOCK_JSEARCH_LATENCY", "0.05"))
+JOBS_PER_PAGE = 10
+SHARED_JOBS = 3  # Postings per query that also come back for other queries of the same title
+
+EMPLOYERS = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+calls = Counter()
+
+
+def _posting(seed: str, title: str, city: str) -> Dict:
+    digest = hashlib.sha256(seed.encode()).hexdigest()
+    return {
+        'job_id': digest[:16],
+        'job_title': title,
+        'employer_name': EMPLOYERS[int(digest[16:18], 16) % len(EMPLOYERS)],
+        'job_city': city or None,
+        'job_state': None,
+        'job_country': 'US',
+        'job_is_remote': not city,
+        'job_employment_type': 'FULLTIME',
+        'job_description': f"{title} role working with the team on production systems.",
+        'job_apply_link': f"https://example.com/jobs/{digest[:16]}",
+        'job_posted_at_datetime_utc': '2025-01-01T00:00:00.000Z',
+    }
+
+
+@app.get("/search")
+async def search(query: str, page: int = 1, num_pages: int = 1, date_posted: Optional[str] = None,
+                 employment_types: Optional[str] = None):
+    calls[query] += 1
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+    title, _, city = query.partition(" in ")
+    title = title.strip().title()
+    jobs: List[Dict] = [_posting(f"{title.lower()}|shared|{i}", title, '') for i in range(SHARED_JOBS)]
+    for p in range(page, page + num_pages):
+        jobs.extend(_posting(f"{query.lower()}|{p}|{i}", title, city.strip())
+                    for i in range(JOBS_PER_PAGE - SHARED_JOBS))
+    return {'status': 'OK', 'request_id': hashlib.md5(query.encode()).hexdigest(), 'data': jobs}
+
+
+@app.get("/stats")
+async def stats():
+    return {'calls': sum(calls.values()), 'queries': dict(calls)}
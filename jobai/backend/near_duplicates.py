@@ -0,0 +1,361 @@
+"""
+Near-duplicate resume detection
+MinHash signatures of a resume's word shingles, indexed with LSH banding, so
+a re-exported resume with trivial edits is found among every stored one in
+roughly constant time: only resumes sharing a whole band of the signature are
+compared. Signatures are stored with each extraction (artifacts['minhash']).
+
+The check runs inside the extraction job, right after the text is read, so
+a duplicate skips the stages without a second trip through the pool. Thread
+workers query the index itself; worker processes keep a copy, replayed
+from segment files the index writes every SEGMENT_SIZE additions plus the
+few newer signatures sent with each job (DuplicateCheck).
+
+Run with:
+    python near_duplicates.py scan
+    python near_duplicates.py scan --threshold 0.8 --json > duplicates.ndjson
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_WORDS = 3
+NUM_PERM = 128
+# 16 bands of 8 rows: resumes at 0.85 similarity share a band 99.4% of the
+# time, at 0.5 only 6%
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SEED = 1
+# Bump when any of the above changes: stored signatures are then recomputed
+MINHASH_VERSION = "1"
+# Signatures sent along with each job before they are written to a segment file
+SEGMENT_SIZE = 64
+
+# One 64-bit seed per permutation: permutation i hashes a shingle as
+# splitmix64(crc32(shingle) ^ seed i)
+_SEEDS = np.random.RandomState(SEED).randint(0, np.iinfo(np.uint64).max, size=NUM_PERM, dtype=np.uint64)
+_EMPTY = np.uint32(0xFFFFFFFF)
+
+_WORD = re.compile(r'[a-z0-9]+(?:[+#]+|\.[a-z0-9]+)?')  # Keeps c++, c#, node.js
+
+# ============================================================
+# SIGNATURES
+# ============================================================
+
+def shingles(text: str) -> List[str]:
+    """Overlapping SHINGLE_WORDS-word runs of the lowercased text, punctuation and layout ignored"""
+    words = _WORD.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return [' '.join(words)] if words else []
+    return [' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+
+
+def _mix(z: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (uint64 arithmetic wraps, as it should here)"""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def text_signature(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint32 values); the same text gives the same signature in every process"""
+    hashes = np.fromiter({zlib.crc32(s.encode('utf-8')) for s in shingles(text)}, dtype=np.uint64)
+    if not len(hashes):
+        return np.full(NUM_PERM, _EMPTY, dtype=np.uint32)
+    permuted = _mix(hashes[:, None] ^ _SEEDS[None, :])
+    return (permuted.min(axis=0) >> np.uint64(32)).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two texts' shingle sets"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def signature_to_json(signature: np.ndarray) -> Dict:
+    return {'version': MINHASH_VERSION, 'values': signature.tolist()}
+
+
+def signature_from_json(stored: Optional[Dict]) -> Optional[np.ndarray]:
+    """A stored signature, or None when missing or made with other parameters"""
+    if not stored or stored.get('version') != MINHASH_VERSION:
+        return None
+    return np.asarray(stored['values'], dtype=np.uint32)
+
+
+def record_signature(record: Dict) -> Optional[np.ndarray]:
+    """
+    Signature of a stored result: the stored one, else computed from its page
+    texts, else from its raw text preview (legacy imports keep nothing more)
+    """
+    artifacts = record.get('artifacts') or {}
+    signature = signature_from_json(artifacts.get('minhash'))
+    if signature is not None:
+        return signature
+    if artifacts.get('pages'):
+        return text_signature('\n'.join(artifacts['pages']))
+    preview = (record.get('data') or {}).get('raw_text_preview')
+    return text_signature(preview) if preview else None
+
+# ============================================================
+# LSH INDEX
+# ============================================================
+
+class NearDuplicateIndex:
+    """
+    Signatures keyed by content hash, with one bucket table per band.
+    A query only compares the resumes that share at least one band with it.
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._signatures: List[np.ndarray] = []
+        self._bands: List[Dict[bytes, List[int]]] = [{} for _ in range(BANDS)]
+        self._lock = threading.Lock()
+        # Copies for worker processes: the first _saved signatures are in
+        # _segments files under _directory
+        self._directory: Optional[str] = None
+        self._segments = 0
+        self._saved = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids
+
+    def add(self, key: str, signature: np.ndarray):
+        with self._lock:
+            if key in self._ids:
+                return
+            doc_id = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            self._signatures.append(signature)
+            for band, buckets in enumerate(self._bands):
+                buckets.setdefault(signature[band * ROWS:(band + 1) * ROWS].tobytes(), []).append(doc_id)
+
+    def add_many(self, records: Iterable[Dict]) -> int:
+        """Index stored results (ResultStore.iter_latest); returns how many were added"""
+        added = 0
+        for record in records:
+            if record['content_hash'] in self._ids:
+                continue
+            signature = record_signature(record)
+            if signature is not None:
+                self.add(record['content_hash'], signature)
+                added += 1
+        return added
+
+    def query(self, signature: np.ndarray, threshold: float, limit: int = 5) -> List[Tuple[str, float]]:
+        """Indexed resumes at threshold similarity or more, as (content hash, similarity), most similar first"""
+        with self._lock:
+            candidates = set()
+            for band, buckets in enumerate(self._bands):
+                candidates.update(buckets.get(signature[band * ROWS:(band + 1) * ROWS].tobytes(), ()))
+            matches = []
+            for doc_id in candidates:
+                key = self._keys[doc_id]
+                score = similarity(signature, self._signatures[doc_id])
+                if score >= threshold:
+                    matches.append((key, round(score, 4)))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            sizes = [len(ids) for buckets in self._bands for ids in buckets.values()]
+            return {
+                'resumes': len(self._keys),
+                'buckets': len(sizes),
+                'largest_bucket': max(sizes, default=0),
+                'segments': self._segments,
+            }
+
+    def check(self, threshold: float, reuse: Optional[float], shared: bool = False) -> 'DuplicateCheck':
+        """
+        What a pool job needs to look for near-duplicates. shared: for a worker
+        process, which cannot see this index but gets the segment files and
+        the signatures added since the last one.
+        """
+        if not shared:
+            return DuplicateCheck(threshold, reuse, index=self)
+        if len(self._keys) - self._saved >= SEGMENT_SIZE:
+            self.save_segment()
+        with self._lock:
+            delta = list(zip(self._keys[self._saved:], self._signatures[self._saved:]))
+            return DuplicateCheck(threshold, reuse, directory=self._directory,
+                                  segments=self._segments, delta=delta)
+
+    def save_segment(self):
+        """Write the signatures not yet in a segment file to the next one"""
+        with self._lock:
+            end = len(self._keys)
+            if end == self._saved:
+                return
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix="near_duplicates_")
+            keys = np.array(self._keys[self._saved:end])
+            signatures = np.stack(self._signatures[self._saved:end])
+            path = segment_path(self._directory, self._segments)
+        with open(path + ".tmp", 'wb') as f:
+            np.savez(f, keys=keys, signatures=signatures)
+        os.replace(path + ".tmp", path)
+        with self._lock:
+            self._saved = end
+            self._segments += 1
+
+    def close(self):
+        """Remove the segment files"""
+        with self._lock:
+            if self._directory is not None:
+                shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+            self._segments = self._saved = 0
+
+
+def segment_path(directory: str, number: int) -> str:
+    return os.path.join(directory, f"segment-{number:06d}.npz")
+
+
+class DuplicateCheck:
+    """
+    Near-duplicate lookup for a pool job: thresholds plus the index itself
+    (thread workers) or what a worker process replays into its own copy
+    """
+
+    def __init__(self, threshold: float, reuse: Optional[float], index: Optional[NearDuplicateIndex] = None,
+                 directory: Optional[str] = None, segments: int = 0,
+                 delta: List[Tuple[str, np.ndarray]] = ()):
+        self.threshold = threshold
+        self.reuse = reuse  # Similarity from which a stored extraction is reused; None: never
+        self.index = index
+        self.directory = directory
+        self.segments = segments
+        self.delta = delta
+
+    def __getstate__(self) -> Dict:
+        return {**self.__dict__, 'index': None}
+
+    def match(self, signature: np.ndarray) -> Optional[Dict]:
+        """The most similar indexed resume, {'content_hash', 'similarity'}, or None"""
+        index = self.index if self.index is not None else _worker_index(self)
+        matches = index.query(signature, self.threshold, limit=1)
+        return {'content_hash': matches[0][0], 'similarity': matches[0][1]} if matches else None
+
+    def reusable(self, near: Optional[Dict]) -> bool:
+        return bool(near) and self.reuse is not None and near['similarity'] >= self.reuse
+
+
+# Worker process copy of the parent's index: (segment directory, segment
+# files loaded, index)
+_worker_copy: Optional[Tuple[Optional[str], int, NearDuplicateIndex]] = None
+
+
+def _worker_index(check: DuplicateCheck) -> NearDuplicateIndex:
+    global _worker_copy
+    if _worker_copy is None or _worker_copy[0] != check.directory:
+        _worker_copy = (check.directory, 0, NearDuplicateIndex())
+    directory, loaded, index = _worker_copy
+    for number in range(loaded, check.segments):
+        with np.load(segment_path(directory, number)) as segment:
+            for key, signature in zip(segment['keys'].tolist(), segment['signatures']):
+                index.add(key, signature)
+    _worker_copy = (directory, max(loaded, check.segments), index)
+    for key, signature in check.delta:
+        index.add(key, signature)
+    return index
+
+# ============================================================
+# BULK DEDUPLICATION
+# ============================================================
+
+def duplicate_groups(records: Iterable[Dict], threshold: float) -> List[Dict]:
+    """
+    Groups of near-duplicate stored results (single-linkage over LSH matches).
+    The newest record of each group is kept; the others are listed as its duplicates.
+    """
+    index = NearDuplicateIndex()
+    info: Dict[str, Dict] = {}
+    signatures: Dict[str, np.ndarray] = {}
+    parent: Dict[str, str] = {}
+
+    def root(key: str) -> str:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for record in records:
+        key = record['content_hash']
+        signature = record_signature(record)
+        if signature is None or key in index:
+            continue
+        info[key] = {'content_hash': key, 'filename': record.get('filename'),
+                     'user_id': record.get('user_id'), 'processed_at': record.get('processed_at')}
+        signatures[key] = signature
+        parent[key] = key
+        for other, _ in index.query(signature, threshold, limit=NUM_PERM):
+            parent[root(other)] = root(key)
+        index.add(key, signature)
+
+    groups: Dict[str, List[str]] = {}
+    for key in info:
+        groups.setdefault(root(key), []).append(key)
+    result = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda key: info[key]['processed_at'] or '')
+        keep = members[-1]
+        result.append({'keep': info[keep], 'duplicates': [
+            {**info[key], 'similarity': round(similarity(signatures[key], signatures[keep]), 4)}
+            for key in members[:-1]
+        ]})
+    result.sort(key=lambda group: -len(group['duplicates']))
+    return result
+
+
+def main():
+    from result_store import store_from_env
+
+    parser = argparse.ArgumentParser(description="Near-duplicate detection over the result store (RESULT_STORE_* env vars)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    scan = commands.add_parser('scan', help="Group stored results that are near-duplicates of each other")
+    scan.add_argument('--threshold', type=float, default=0.85, help="Estimated Jaccard similarity (0-1)")
+    scan.add_argument('--json', action='store_true', help="One JSON group per line instead of a summary")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    store = store_from_env()
+    if store is None:
+        print("RESULT_STORE is 'none'", file=sys.stderr)
+        sys.exit(1)
+
+    groups = duplicate_groups(store.iter_latest(), args.threshold)
+    store.close()
+    for group in groups:
+        if args.json:
+            print(json.dumps(group, ensure_ascii=False))
+        else:
+            keep = group['keep']
+            print(f"{keep['content_hash'][:12]}  {keep['filename'] or '-'}")
+            for duplicate in group['duplicates']:
+                print(f"  ~{duplicate['similarity']}  {duplicate['content_hash'][:12]}  {duplicate['filename'] or '-'}")
+    duplicates = sum(len(group['duplicates']) for group in groups)
+    logger.info(f"✅ {len(groups)} groups, {duplicates} near-duplicate results at similarity >= {args.threshold}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+OCR for pages without a text layer (scanned resumes)
+Pages are rendered once, hashed, and only OCR'd with Tesseract (through
+PyMuPDF's OCR support) when that page image has not been seen before. Runs in
+its own bounded pool (OCR_* settings in main.py), so slow OCR jobs never hold
+up the text-layer path.
+
+Needs Tesseract's language data: set TESSDATA_PREFIX, or install
+tesseract-ocr (plus the OCR_LANGUAGE packs) in a standard location.
+"""
+import glob
+import hashlib
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+import fitz  # PyMuPDF
+
+from metrics import OCR_PAGES, timed
+from result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+OCR_ENABLED = os.getenv("OCR_ENABLED", "1") != "0"
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+
+# A page with fewer characters than this in its text layer, and at least one
+# image, is treated as scanned
+OCR_MIN_CHARS = int(os.getenv("OCR_MIN_CHARS", "16"))
+
+# Standard tessdata locations tried when TESSDATA_PREFIX is not set
+TESSDATA_DIRS = (
+    "/usr/share/tesseract-ocr/*/tessdata",
+    "/usr/share/tessdata",
+    "/usr/local/share/tessdata",
+    "/opt/homebrew/share/tessdata",
+)
+
+
+@lru_cache(maxsize=None)
+def find_tessdata() -> Optional[str]:
+    """Folder holding traineddata for every OCR_LANGUAGE language, or None"""
+    candidates = [os.getenv("TESSDATA_PREFIX")] if os.getenv("TESSDATA_PREFIX") else []
+    for pattern in TESSDATA_DIRS:
+        candidates.extend(sorted(glob.glob(pattern), reverse=True))
+    languages = OCR_LANGUAGE.split('+')
+    for directory in candidates:
+        if all(os.path.exists(os.path.join(directory, f"{lang}.traineddata")) for lang in languages):
+            return directory
+    return None
+
+
+def ocr_available() -> bool:
+    return OCR_ENABLED and find_tessdata() is not None
+
+
+def needs_ocr(page: fitz.Page, text: str) -> bool:
+    """No usable text layer, but something to read on the page"""
+    return len(text.strip()) < OCR_MIN_CHARS and bool(page.get_images())
+
+# ============================================================
+# PAGE IMAGE CACHE
+# ============================================================
+
+_cache: Optional[ResultCache] = None
+
+
+def get_cache() -> ResultCache:
+    """Per-process memory tier; OCR_CACHE_DB adds a SQLite tier shared by all workers"""
+    global _cache
+    if _cache is None:
+        _cache = ResultCache(
+            max_entries=int(os.getenv("OCR_CACHE_SIZE", "1024")),
+            ttl_seconds=float(os.getenv("OCR_CACHE_TTL", str(30 * 86400))),
+            db_path=os.getenv("OCR_CACHE_DB") or None
+        )
+    return _cache
+
+
+def image_hash(pix: fitz.Pixmap) -> str:
+    """SHA-256 of a rendered page's pixels and dimensions"""
+    digest = hashlib.sha256(f"{pix.width}x{pix.height}x{pix.n}:".encode())
+    digest.update(pix.samples_mv)
+    return digest.hexdigest()
+
+# ============================================================
+# OCR
+# ============================================================
+
+@timed('ocr')
+def ocr_pixmap(pix: fitz.Pixmap) -> str:
+    """Tesseract text of a rendered page (what Page.get_textpage_ocr(full=True) does, minus the render)"""
+    ocr_doc = fitz.open("pdf", pix.pdfocr_tobytes(language=OCR_LANGUAGE, tessdata=find_tessdata()))
+    try:
+        return ocr_doc[0].get_text()
+    finally:
+        ocr_doc.close()
+
+
+def ocr_pages(pdf_content: bytes, page_numbers: Iterable[int]) -> Dict[int, str]:
+    """
+    OCR text of the given pages (0-based), served from the cache when the
+    same page image was OCR'd before
+    """
+    if not ocr_available():
+        raise RuntimeError(f"OCR unavailable: no Tesseract data for '{OCR_LANGUAGE}' (set TESSDATA_PREFIX)")
+    cache = get_cache()
+    texts = {}
+    doc = fitz.open(stream=pdf_content, filetype="pdf")
+    try:
+        for number in page_numbers:
+            pix = doc[number].get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY, alpha=False)
+            key = f"{image_hash(pix)}:{OCR_LANGUAGE}"
+            cached = cache.get(key)
+            OCR_PAGES.inc(result="hit" if cached is not None else "miss")
+            if cached is not None:
+                texts[number] = cached['text']
+                continue
+            text = ocr_pixmap(pix)
+            cache.put(key, {'text': text})
+            texts[number] = text
+    finally:
+        doc.close()
+    return texts
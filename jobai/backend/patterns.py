@@ -0,0 +1,203 @@
+"""
+Precompiled regex registry
+Every extractor pattern is compiled once at import and registered by name,
+with per-pattern call/time counters to show which pattern dominates latency
+
+Run a backtracking check with: python patterns.py --fuzz [--max-size 20000000]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+TIMING_ENABLED = os.getenv("REGEX_TIMING", "1") != "0"
+
+
+class TimedPattern:
+    """Compiled pattern that records how often and how long it runs"""
+
+    __slots__ = ('name', 'regex', 'calls', 'total_seconds', 'max_seconds', 'chars')
+
+    def __init__(self, name: str, regex: re.Pattern):
+        self.name = name
+        self.regex = regex
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.chars = 0
+
+    def _timed(self, method: Callable, string: str, *args):
+        if not TIMING_ENABLED:
+            return method(string, *args)
+        started = time.perf_counter()
+        try:
+            return method(string, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.calls += 1
+            self.total_seconds += elapsed
+            self.chars += len(string)
+            if elapsed > self.max_seconds:
+                self.max_seconds = elapsed
+
+    def search(self, string: str, *args):
+        return self._timed(self.regex.search, string, *args)
+
+    def match(self, string: str, *args):
+        return self._timed(self.regex.match, string, *args)
+
+    def findall(self, string: str, *args) -> list:
+        return self._timed(self.regex.findall, string, *args)
+
+    def finditer(self, string: str, *args) -> list:
+        """Materialized so the whole scan is timed"""
+        return self._timed(lambda s, *a: list(self.regex.finditer(s, *a)), string, *args)
+
+    def split(self, string: str, *args) -> list:
+        return self._timed(self.regex.split, string, *args)
+
+    @property
+    def pattern(self) -> str:
+        return self.regex.pattern
+
+
+class PatternRegistry:
+    """Name -> TimedPattern, compiled at registration time"""
+
+    def __init__(self):
+        self._patterns: Dict[str, TimedPattern] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, pattern: str, flags: int = 0) -> TimedPattern:
+        """
+        Compile and register a pattern. Registering an existing name replaces
+        it (used when the skill taxonomy is reloaded).
+        """
+        timed = TimedPattern(name, re.compile(pattern, flags))
+        with self._lock:
+            self._patterns[name] = timed
+        return timed
+
+    def get(self, name: str) -> TimedPattern:
+        return self._patterns[name]
+
+    def __iter__(self):
+        return iter(list(self._patterns.values()))
+
+    def stats(self) -> List[Dict]:
+        """Per-pattern counters, slowest (by total time) first"""
+        rows = [{
+            'name': p.name,
+            'calls': p.calls,
+            'total_ms': round(p.total_seconds * 1000, 3),
+            'mean_us': round(p.total_seconds / p.calls * 1e6, 1) if p.calls else 0.0,
+            'max_ms': round(p.max_seconds * 1000, 3),
+            'chars_scanned': p.chars,
+        } for p in self]
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def reset(self):
+        for pattern in self:
+            pattern.reset()
+
+
+REGISTRY = PatternRegistry()
+
+
+def register(name: str, pattern: str, flags: int = 0) -> TimedPattern:
+    return REGISTRY.register(name, pattern, flags)
+
+
+# ============================================================
+# BACKTRACKING GUARD
+# ============================================================
+
+# Inputs that trigger super-linear behaviour in typical resume patterns:
+# long runs inside a character class with no terminator, repeated prefixes,
+# and whitespace between optional groups.
+ADVERSARIAL_UNITS = [
+    'a', '1', ' ', 'a.', 'a@', '1.', 'jan', 'at A', 'Aa ', 'salary ', 'e', '-',
+    'linkedin.com/in/', 'github.com/', 'experience ', '\n', '• ', 'B.', 'x ',
+]
+
+
+# Largest adversarial input for the default check. Going up to 20MB works
+# (fuzz_sizes(20_000_000)) but takes around 15 minutes for the whole
+# registry, since every pattern scans every unit at every size.
+FUZZ_MAX_SIZE = 200_000
+
+
+def fuzz_sizes(max_size: int = FUZZ_MAX_SIZE):
+    """Three input sizes, 10x apart, ending at max_size"""
+    return (max_size // 100, max_size // 10, max_size)
+
+
+def check_backtracking(sizes=fuzz_sizes(), max_growth: float = 30.0,
+                       max_seconds_per_mb: float = 10.0, registry: Optional[PatternRegistry] = None) -> List[Dict]:
+    """
+    Run every registered pattern against adversarial inputs of growing size.
+
+    Input grows 10x per step, so a linear pattern takes ~10x longer. A pattern
+    is flagged when a step grows by more than max_growth (steps under 1ms are
+    timer noise and ignored), or when one scan on the largest input takes over
+    max_seconds_per_mb per MB of input.
+    """
+    max_seconds = max_seconds_per_mb * sizes[-1] / 1_000_000
+    registry = registry or REGISTRY
+    failures = []
+    for pattern in registry:
+        for unit in ADVERSARIAL_UNITS:
+            timings = []
+            for size in sizes:
+                text = unit * (size // len(unit))
+                started = time.perf_counter()
+                for _ in pattern.regex.finditer(text):
+                    pass
+                timings.append(time.perf_counter() - started)
+
+            growth = max(
+                (later / earlier for earlier, later in zip(timings, timings[1:]) if earlier > 1e-3),
+                default=1.0
+            )
+            if growth > max_growth or timings[-1] > max_seconds:
+                failures.append({
+                    'pattern': pattern.name,
+                    'input': repr(unit),
+                    'seconds': [round(t, 4) for t in timings],
+                    'growth': round(growth, 1),
+                })
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regex registry tools")
+    parser.add_argument('--fuzz', action='store_true', help="Check all patterns for catastrophic backtracking")
+    parser.add_argument('--max-size', type=int, default=FUZZ_MAX_SIZE,
+                        help="Largest adversarial input for --fuzz, in characters")
+    parser.add_argument('--list', action='store_true', help="List registered patterns")
+    args = parser.parse_args()
+
+    # Importing the extractors registers their patterns. Go through the
+    # imported module: when run as a script this file is __main__, a copy.
+    import resumeextraction
+    from patterns import REGISTRY as registry
+    resumeextraction.get_taxonomy()
+
+    if args.list:
+        for pattern in registry:
+            print(f"{pattern.name}: {pattern.pattern[:100]}")
+    if args.fuzz:
+        failures = check_backtracking(sizes=fuzz_sizes(args.max_size), registry=registry)
+        print(json.dumps(failures, indent=2))
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Layout-aware page text (PDF_EXTRACTION_MODE=layout)
+Rebuilds reading order from PyMuPDF's text lines, so two-column resumes are
+read one column at a time instead of line by line across both, and tags
+heading lines by font size and weight in the same pass. Section segmentation
+then only looks at those heading lines.
+"""
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+
+PDF_EXTRACTION_MODE = os.getenv("PDF_EXTRACTION_MODE", "plain").lower()  # plain | layout
+
+# Lines wider than this share of the page span both columns (name, summary)
+FULL_WIDTH = 0.6
+# A column needs this share of the page's characters; a right-aligned run of
+# dates or locations is not a column
+MIN_COLUMN_SHARE = 0.15
+# Narrowest whitespace gap between columns, in points
+MIN_GUTTER = 8.0
+
+# Heading levels: 1 = set in a larger font than body text, 2 = bold or
+# all-caps at body size, 3 = bold lead-in of "Heading: content" lines
+LARGER_FONT = 1.15
+MAX_HEADING_WORDS = 6
+MAX_HEADING_CHARS = 60
+
+BOLD_FLAG = 16  # Span flags bit for bold text
+
+
+class PageText(str):
+    """Page text carrying its heading lines as (line offset, text, level) tuples"""
+
+    def __new__(cls, text: str, headings: Sequence[Tuple[int, str, int]] = ()):
+        page = super().__new__(cls, text)
+        page.headings = tuple(tuple(heading) for heading in headings)
+        return page
+
+
+def layout_mode() -> bool:
+    return PDF_EXTRACTION_MODE == "layout"
+
+# ============================================================
+# READING ORDER
+# ============================================================
+
+def _gutter(lines: List[Dict], width: float) -> Optional[float]:
+    """x position of the gap between two text columns, if the page has two"""
+    intervals = sorted((line['bbox'][0], line['bbox'][2]) for line in lines)
+    if len(intervals) < 2:
+        return None
+    best = None
+    reach = intervals[0][1]
+    for x0, x1 in intervals[1:]:
+        gap = x0 - reach
+        middle = (x0 + reach) / 2
+        if gap >= MIN_GUTTER and 0.2 * width <= middle <= 0.8 * width and (best is None or gap > best[0]):
+            best = (gap, middle)
+        reach = max(reach, x1)
+    if best is None:
+        return None
+
+    chars = Counter()
+    for line in lines:
+        chars[line['bbox'][2] <= best[1]] += len(line['text'])
+    total = sum(chars.values())
+    if not total or min(chars[True], chars[False]) < MIN_COLUMN_SHARE * total:
+        return None
+    return best[1]
+
+
+def _top_down(lines: List[Dict]) -> List[Dict]:
+    return sorted(lines, key=lambda line: (round(line['bbox'][1]), line['bbox'][0]))
+
+
+def reading_order(lines: List[Dict], width: float) -> List[Dict]:
+    """
+    Text lines in reading order: full-width lines split the page into bands;
+    within a band, the left column top to bottom, then the right. Works on
+    lines rather than blocks, since PyMuPDF often groups a row of both
+    columns into one block.
+    """
+    full = [line for line in lines if line['bbox'][2] - line['bbox'][0] > FULL_WIDTH * width]
+    narrow = [line for line in lines if line['bbox'][2] - line['bbox'][0] <= FULL_WIDTH * width]
+    gutter = _gutter(narrow, width)
+    if gutter is None:
+        return _top_down(lines)
+
+    full = _top_down(full)
+    breaks = [line['bbox'][1] for line in full]
+    bands: List[List[Dict]] = [[] for _ in range(len(full) + 1)]
+    for line in narrow:
+        bands[sum(1 for y in breaks if y <= line['bbox'][1])].append(line)
+
+    ordered = []
+    for i, band in enumerate(bands):
+        if i:
+            ordered.append(full[i - 1])
+        ordered.extend(_top_down([line for line in band if line['bbox'][2] <= gutter]))
+        ordered.extend(_top_down([line for line in band if line['bbox'][2] > gutter]))
+    return ordered
+
+# ============================================================
+# PAGE TEXT AND HEADINGS
+# ============================================================
+
+def _bold(span: Dict) -> bool:
+    return bool(span['flags'] & BOLD_FLAG) or 'bold' in span['font'].lower()
+
+
+def _line(line: Dict) -> Dict:
+    """
+    A dict line reduced to its bbox, text, dominant font size, whether it is
+    all bold, and whether a bold lead-in is followed by regular text
+    """
+    spans = [s for s in line['spans'] if s['text'].strip()]
+    sizes = Counter()
+    for s in spans:
+        sizes[round(s['size'], 1)] += len(s['text'])
+    bold = [_bold(s) for s in spans]
+    return {
+        'bbox': line['bbox'],
+        'text': ''.join(s['text'] for s in line['spans']),
+        'size': sizes.most_common(1)[0][0] if spans else 0.0,
+        'bold': bool(bold) and all(bold),
+        'lead_in': bool(bold) and bold[0] and not all(bold),
+    }
+
+
+def _heading_level(text: str, size: float, bold: bool, lead_in: bool, body_size: float) -> int:
+    """Heading level of a line (see LARGER_FONT), 0 for body text"""
+    stripped = text.strip().rstrip(':')
+    if lead_in and ':' in stripped[:MAX_HEADING_CHARS]:
+        return 3
+    if not stripped or len(stripped) > MAX_HEADING_CHARS or len(stripped.split()) > MAX_HEADING_WORDS:
+        return 0
+    if stripped.endswith(('.', ',')) or not any(ch.isalpha() for ch in stripped):
+        return 0
+    if body_size and size >= body_size * LARGER_FONT:
+        return 1
+    if bold or (stripped.isupper() and len(stripped) > 3):
+        return 2
+    return 0
+
+
+def page_layout(page: fitz.Page) -> PageText:
+    """One page's text in reading order, with its heading lines tagged"""
+    lines = [_line(line) for block in page.get_text("dict")['blocks'] if block['type'] == 0
+             for line in block['lines']]
+
+    sizes = Counter()
+    for line in lines:
+        sizes[line['size']] += len(line['text'].strip())
+    body_size = sizes.most_common(1)[0][0] if sizes else 0.0
+
+    parts = []
+    headings = []
+    offset = 0
+    for line in reading_order(lines, page.rect.width):
+        text = line['text']
+        level = _heading_level(text, line['size'], line['bold'], line['lead_in'], body_size)
+        if level:
+            headings.append((offset, text.strip(), level))
+        parts.append(text + "\n")
+        offset += len(text) + 1
+    return PageText(''.join(parts), headings)
+
+
+def page_text(page: fitz.Page) -> str:
+    """Text of one page in the configured PDF_EXTRACTION_MODE"""
+    return page_layout(page) if layout_mode() else page.get_text()
+
+# ============================================================
+# DOCUMENT HEADINGS
+# ============================================================
+
+def document_headings(pages: Sequence[str], limit: int) -> Optional[List[Tuple[int, str, int]]]:
+    """
+    Headings of joined pages (join_pages) with document offsets, up to limit
+    characters; None when the pages carry no layout (plain mode)
+    """
+    if not any(isinstance(page, PageText) for page in pages):
+        return None
+    headings = []
+    base = 0
+    for page in pages:
+        for offset, text, level in getattr(page, 'headings', ()):
+            if base + offset < limit:
+                headings.append((base + offset, text, level))
+        base += len(page) + 1
+    return headings
+
+
+def headings_to_json(pages: Sequence[str]) -> Optional[List[list]]:
+    if not any(isinstance(page, PageText) for page in pages):
+        return None
+    return [[list(h) for h in getattr(page, 'headings', ())] for page in pages]
+
+
+def pages_from_json(pages: Sequence[str], headings: Optional[List[list]]) -> List[str]:
+    """Stored page texts with their stored headings reattached"""
+    if not headings or len(headings) != len(pages):
+        return list(pages)
+    return [PageText(page, page_headings) for page, page_headings in zip(pages, headings)]
@@ -0,0 +1,182 @@
+"""
+Incremental re-extraction of stored results
+After a stage version bump (STAGE_VERSIONS in resumeextraction.py) or a skill
+taxonomy change, re-runs only the stale stages of every stored result from the
+page texts and sections saved with it, in parallel, and appends the refreshed
+results to the result store. A taxonomy bump is a text-only pass; PDFs are
+needed only when the text stage itself changed (or for results stored without
+artifacts). Restart the API afterwards to reload the candidate index.
+
+Run with:
+    python reindex.py --dry-run
+    python reindex.py --workers 8
+    python reindex.py --pdf-dir uploads/ --workers 8
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from resumeextraction import (
+    EXTRACTORS,
+    TEXT_REQUIREMENTS,
+    apply_ocr,
+    extraction_version,
+    init_worker,
+    read_pdf_pages,
+    run_stages,
+    stale_stages,
+)
+from ocr import ocr_available
+from result_cache import content_hash
+from result_store import ResultStore, make_record, store_from_env
+
+logger = logging.getLogger(__name__)
+
+
+def pdf_paths_by_hash(directory: str) -> Dict[str, str]:
+    """Content hash -> path of every PDF under directory"""
+    paths = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith('.pdf'):
+                path = os.path.join(root, name)
+                with open(path, 'rb') as f:
+                    paths[content_hash(f.read())] = path
+    return paths
+
+
+def reindex_record(record: Dict, pdf_path: Optional[str] = None) -> Dict:
+    """
+    Bring one stored result up to the current stage versions
+
+    Returns:
+        {'content_hash', 'status': current | updated | needs_pdf | failed,
+         'recomputed': [stages], 'record': refreshed record or None}
+    """
+    outcome = {'content_hash': record['content_hash'], 'status': 'current', 'recomputed': [], 'record': None}
+    artifacts = record.get('artifacts')
+    stale = stale_stages(artifacts)
+    if not stale:
+        return outcome
+
+    try:
+        if artifacts and 'text' not in stale:
+            pages = artifacts['pages']
+        elif pdf_path:
+            with open(pdf_path, 'rb') as f:
+                content = f.read()
+            scanned = [] if ocr_available() else None
+            pages = read_pdf_pages(content, [TEXT_REQUIREMENTS[field] for field in EXTRACTORS], scanned=scanned)
+            if scanned:
+                pages = apply_ocr(content, pages, scanned)
+            outcome['recomputed'].append('text')
+        else:
+            outcome['status'] = 'needs_pdf'
+            return outcome
+
+        staged = run_stages(pages, {'data': record['data'], 'artifacts': artifacts})
+    except Exception as e:
+        outcome['status'] = 'failed'
+        outcome['error'] = f"{type(e).__name__}: {e}"
+        return outcome
+
+    outcome['status'] = 'updated'
+    outcome['recomputed'] += staged['recomputed']
+    outcome['record'] = make_record(
+        record['content_hash'], staged['data'], filename=record.get('filename'),
+        user_id=record.get('user_id'), version=extraction_version(), artifacts=staged['artifacts']
+    )
+    return outcome
+
+
+def reindex_chunk(items: List[Tuple[Dict, Optional[str]]]) -> List[Dict]:
+    return [reindex_record(record, pdf_path) for record, pdf_path in items]
+
+
+def run_reindex(store: ResultStore, workers: int, pdfs: Optional[Dict[str, str]] = None,
+                chunk_size: int = 200, dry_run: bool = False) -> Dict:
+    """Re-run stale stages of every stored result; returns counts per status and stage"""
+    pdfs = pdfs or {}
+    version = extraction_version()
+    statuses, stages = Counter(), Counter()
+    failures = []
+
+    def chunks() -> Iterator[List[Tuple[Dict, Optional[str]]]]:
+        chunk = []
+        for record in store.iter_latest():
+            # Already current as a whole: skip without shipping it to a worker
+            if record.get('extractor_version') == version and record.get('artifacts'):
+                statuses['current'] += 1
+                continue
+            chunk.append((record, pdfs.get(record['content_hash'])))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def collect(outcomes: List[Dict]):
+        refreshed = []
+        for outcome in outcomes:
+            statuses[outcome['status']] += 1
+            stages.update(outcome['recomputed'])
+            if outcome['record']:
+                refreshed.append(outcome['record'])
+            if outcome['status'] == 'failed':
+                failures.append({'content_hash': outcome['content_hash'], 'error': outcome['error']})
+        if refreshed and not dry_run:
+            store.append(refreshed)
+        print(f"\r{sum(statuses.values())} results checked", end='', file=sys.stderr)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        # A bounded window of chunks in flight, so the store is streamed, not loaded
+        pending = deque()
+        for chunk in chunks():
+            pending.append(executor.submit(reindex_chunk, chunk))
+            if len(pending) >= workers * 2:
+                collect(pending.popleft().result())
+        while pending:
+            collect(pending.popleft().result())
+    print(file=sys.stderr)
+
+    return {
+        'statuses': dict(statuses),
+        'recomputed_stages': dict(stages),
+        'failures': failures[:20],
+        'seconds': round(time.perf_counter() - started, 2),
+        'dry_run': dry_run,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run stale extraction stages over the result store "
+                                                 "(configured via RESULT_STORE_* env vars)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--pdf-dir', help="Original PDFs, used when the text stage is stale")
+    parser.add_argument('--chunk-size', type=int, default=200)
+    parser.add_argument('--dry-run', action='store_true', help="Report what would change, write nothing")
+    args = parser.parse_args()
+
+    store = store_from_env()
+    if store is None:
+        print("RESULT_STORE is 'none'", file=sys.stderr)
+        sys.exit(1)
+
+    pdfs = pdf_paths_by_hash(args.pdf_dir) if args.pdf_dir else None
+    summary = run_reindex(store, args.workers, pdfs, args.chunk_size, args.dry_run)
+    store.close()
+    print(json.dumps(summary, indent=2))
+    if summary['statuses'].get('needs_pdf'):
+        print(f"{summary['statuses']['needs_pdf']} results need their PDF re-parsed: pass --pdf-dir",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
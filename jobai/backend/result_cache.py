@@ -0,0 +1,127 @@
+"""
+Content-hash result cache for resume extraction
+In-process LRU tier with size/TTL limits, plus an optional SQLite tier that
+survives restarts
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content: bytes) -> str:
+    """Hex SHA-256 of the uploaded bytes"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def make_cache_key(content: bytes, version: str, digest: Optional[str] = None) -> str:
+    """SHA-256 of the uploaded bytes (or a precomputed digest) combined with the extractor version"""
+    return f"{digest or content_hash(content)}:{version}"
+
+
+class ResultCache:
+    """
+    Two-tier cache of extraction results.
+
+    Memory tier: LRU bounded by max_entries, entries expire after ttl_seconds.
+    Disk tier (optional): SQLite table keyed the same way, same TTL.
+    Entries keep their JSON encoding next to the value, so hits are served
+    without encoding again.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600,
+                 db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expired': 0,
+        }
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"✅ Result cache disk tier at {db_path}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self.get_encoded(key)
+        return entry[0] if entry is not None else None
+
+    def get_encoded(self, key: str) -> Optional[Tuple[Dict, bytes]]:
+        """(value, its JSON encoding) or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, value, body = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return value, body
+                del self._entries[key]
+                self._counters['expired'] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM result_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if now - row[1] <= self.ttl_seconds:
+                        body = row[0].encode('utf-8')
+                        value = loads(body)
+                        self._store_memory(key, value, body, row[1])
+                        self._counters['disk_hits'] += 1
+                        return value, body
+                    self._db.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._counters['expired'] += 1
+
+            self._counters['misses'] += 1
+            return None
+
+    def put(self, key: str, value: Dict, body: Optional[bytes] = None):
+        """Cache value; body is its JSON encoding when the caller already has it"""
+        now = time.time()
+        body = body if body is not None else dumps(value)
+        with self._lock:
+            self._store_memory(key, value, body, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO result_cache (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, body.decode('utf-8'), now)
+                )
+                self._db.commit()
+
+    def _store_memory(self, key: str, value: Dict, body: bytes, created_at: float):
+        self._entries[key] = (created_at, value, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['hits'] = stats['memory_hits'] + stats['disk_hits']
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+            stats['memory_entries'] = len(self._entries)
+            stats['disk_enabled'] = self._db is not None
+            return stats
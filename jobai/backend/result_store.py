@@ -0,0 +1,565 @@
+"""
+Append-only store for extraction results
+Replaces the per-request resume_data_*.json dumps: records are queued by the
+API and written in batches by a background task, to SQLite (WAL) or to
+gzip-compressed NDJSON segments, with retention and lookups by content hash
+or user. Cache hits are stored as reference rows: who uploaded what and
+when, with the data left to the stored extraction they repeat.
+
+Run with:
+    python result_store.py import resume_data_*.json
+    python result_store.py query --hash <sha256> | --user <user_id>
+    python result_store.py prune
+"""
+import argparse
+import asyncio
+import glob
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from metrics import STAGE_SECONDS
+from serialization import dumps, dumps_with, loads
+
+logger = logging.getLogger(__name__)
+
+
+def make_record(content_hash: str, data: Dict, filename: Optional[str] = None,
+                user_id: Optional[str] = None, version: Optional[str] = None,
+                processed_at: Optional[str] = None, artifacts: Optional[Dict] = None,
+                data_json: Optional[bytes] = None, reference: bool = False) -> Dict:
+    """
+    One stored extraction. artifacts (page texts, sections and stage versions,
+    see resumeextraction.run_stages) are kept for re-indexing but left out of
+    lookups. data_json is data already encoded (the response body), written
+    as is instead of encoding data again.
+    
+    reference: a repeat of an extraction stored before (a cache hit). The
+    store writes it without data when it holds a full record of the same
+    content hash and version, and fills the data in from that on lookups.
+    """
+    record = {
+        'content_hash': content_hash,
+        'user_id': user_id,
+        'filename': filename,
+        'extractor_version': version,
+        'processed_at': processed_at or datetime.now().isoformat(),
+        'data': data,
+    }
+    if artifacts is not None:
+        record['artifacts'] = artifacts
+    if data_json is not None:
+        record['_data_json'] = data_json
+    if reference:
+        record['_reference'] = True
+    return record
+
+
+def as_reference(record: Dict) -> Dict:
+    """A record as a reference row: everything but its data"""
+    reference = {key: value for key, value in record.items()
+                 if key not in ('_data_json', '_reference', 'artifacts')}
+    reference['data'] = None
+    return reference
+
+
+def encode_record(record: Dict) -> bytes:
+    """A record as one JSON line, reusing its pre-encoded data when present"""
+    data_json = record.get('_data_json')
+    if data_json is None:
+        return dumps(record)
+    rest = {key: value for key, value in record.items() if key not in ('data', '_data_json', '_reference')}
+    return dumps_with(rest, 'data', data_json)
+
+
+class ResultStore(ABC):
+    """Interface shared by the storage backends"""
+
+    @abstractmethod
+    def append(self, records: List[Dict]):
+        """Write records (make_record) in one batch"""
+
+    @abstractmethod
+    def by_hash(self, content_hash: str, limit: int = 10) -> List[Dict]:
+        """Records of one upload, newest first, without artifacts"""
+
+    @abstractmethod
+    def by_user(self, user_id: str, limit: int = 50) -> List[Dict]:
+        """Records of one user, newest first, without artifacts"""
+
+    @abstractmethod
+    def iter_all(self) -> Iterator[Dict]:
+        """Every stored extraction (reference rows left out), oldest first"""
+
+    def iter_latest(self) -> Iterator[Dict]:
+        """
+        The newest record of every content hash, with artifacts: its own, or
+        those of the newest earlier record that has them (cache hits are
+        stored without artifacts)
+        """
+        latest, with_artifacts = {}, {}
+        for i, record in enumerate(self.iter_all()):
+            latest[record['content_hash']] = i
+            if record.get('artifacts'):
+                with_artifacts[record['content_hash']] = i
+        carried = {}
+        for i, record in enumerate(self.iter_all()):
+            digest = record['content_hash']
+            if with_artifacts.get(digest) == i and latest[digest] != i:
+                carried[digest] = record['artifacts']
+            elif latest[digest] == i:
+                if digest in carried:
+                    record['artifacts'] = carried.pop(digest)
+                yield record
+
+    def prune(self) -> int:
+        """Apply retention; returns how many records/segments were removed"""
+        return 0
+
+    def stats(self) -> Dict:
+        return {}
+
+    def close(self):
+        pass
+
+# ============================================================
+# SQLITE BACKEND
+# ============================================================
+
+class SQLiteResultStore(ResultStore):
+    """
+    Single SQLite file in WAL mode, so queries never block the writer.
+    Retention deletes records older than retention_days.
+    """
+
+    def __init__(self, path: str, retention_days: Optional[float] = None):
+        self.path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, content_hash TEXT NOT NULL, user_id TEXT, "
+            "filename TEXT, extractor_version TEXT, processed_at TEXT NOT NULL, "
+            "created_at REAL NOT NULL, data TEXT NOT NULL, artifacts TEXT)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(results)")}
+        if 'artifacts' not in columns:  # Databases created before artifacts were stored
+            self._db.execute("ALTER TABLE results ADD COLUMN artifacts TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_hash ON results (content_hash)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_user ON results (user_id, id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created_at)")
+        self._db.commit()
+
+    def _has_full(self, content_hash: str, version: Optional[str]) -> bool:
+        return self._db.execute(
+            "SELECT 1 FROM results WHERE content_hash = ? AND extractor_version IS ? AND data != 'null' LIMIT 1",
+            (content_hash, version)
+        ).fetchone() is not None
+
+    def append(self, records: List[Dict]):
+        now = time.time()
+        with self._lock:
+            full = set()  # Full records earlier in this batch
+            rows = []
+            for r in records:
+                key = (r['content_hash'], r.get('extractor_version'))
+                if r.get('_reference') and (key in full or self._has_full(*key)):
+                    data = 'null'
+                else:
+                    data = (r.get('_data_json') or dumps(r['data'])).decode('utf-8')
+                    full.add(key)
+                rows.append((
+                    r['content_hash'], r.get('user_id'), r.get('filename'), r.get('extractor_version'),
+                    r['processed_at'], now, data,
+                    dumps(r['artifacts']).decode('utf-8') if r.get('artifacts') else None
+                ))
+            self._db.executemany(
+                "INSERT INTO results (content_hash, user_id, filename, extractor_version, "
+                "processed_at, created_at, data, artifacts) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+
+    def _query(self, where: str, value: str, limit: int) -> List[Dict]:
+        # Reference rows take the data of the newest full record they repeat
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT r.content_hash, r.user_id, r.filename, r.extractor_version, r.processed_at, "
+                "CASE WHEN r.data != 'null' THEN r.data ELSE (SELECT f.data FROM results f "
+                "WHERE f.content_hash = r.content_hash AND f.extractor_version IS r.extractor_version "
+                "AND f.data != 'null' ORDER BY f.id DESC LIMIT 1) END "
+                f"FROM results r WHERE r.{where} = ? ORDER BY r.id DESC LIMIT ?", (value, limit)
+            ).fetchall()
+        return [
+            make_record(row[0], loads(row[5]), filename=row[2], user_id=row[1],
+                        version=row[3], processed_at=row[4])
+            for row in rows if row[5] is not None
+        ]
+
+    def by_hash(self, content_hash: str, limit: int = 10) -> List[Dict]:
+        return self._query("content_hash", content_hash, limit)
+
+    def iter_all(self) -> Iterator[Dict]:
+        # Separate read connection: WAL lets it stream while the writer appends
+        db = sqlite3.connect(self.path)
+        try:
+            rows = db.execute(
+                "SELECT content_hash, user_id, filename, extractor_version, processed_at, data "
+                "FROM results WHERE data != 'null' ORDER BY id"
+            )
+            for row in rows:
+                yield make_record(row[0], loads(row[5]), filename=row[2], user_id=row[1],
+                                  version=row[3], processed_at=row[4])
+        finally:
+            db.close()
+
+    def iter_latest(self) -> Iterator[Dict]:
+        db = sqlite3.connect(self.path)
+        try:
+            rows = db.execute(
+                "SELECT r.content_hash, r.user_id, r.filename, r.extractor_version, r.processed_at, r.data, "
+                "COALESCE(r.artifacts, (SELECT a.artifacts FROM results a WHERE a.content_hash = r.content_hash "
+                "AND a.artifacts IS NOT NULL ORDER BY a.id DESC LIMIT 1)) "
+                "FROM results r WHERE r.id IN (SELECT MAX(id) FROM results WHERE data != 'null' "
+                "GROUP BY content_hash) ORDER BY r.id"
+            )
+            for row in rows:
+                yield make_record(row[0], loads(row[5]), filename=row[2], user_id=row[1], version=row[3],
+                                  processed_at=row[4], artifacts=loads(row[6]) if row[6] else None)
+        finally:
+            db.close()
+
+    def by_user(self, user_id: str, limit: int = 50) -> List[Dict]:
+        return self._query("user_id", user_id, limit)
+
+    def prune(self) -> int:
+        if not self.retention_days:
+            return 0
+        cutoff = time.time() - self.retention_days * 86400
+        with self._lock:
+            # Expired full records still repeated by a kept reference row stay
+            # (the newest one of each content hash and version)
+            removed = self._db.execute(
+                "DELETE FROM results WHERE created_at < ? AND id NOT IN ("
+                "SELECT MAX(f.id) FROM results f WHERE f.data != 'null' AND EXISTS ("
+                "SELECT 1 FROM results r WHERE r.content_hash = f.content_hash "
+                "AND r.extractor_version IS f.extractor_version AND r.data = 'null' AND r.created_at >= ?) "
+                "GROUP BY f.content_hash, f.extractor_version)", (cutoff, cutoff)
+            ).rowcount
+            self._db.commit()
+            if removed:
+                self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {'backend': 'sqlite', 'path': self.path, 'records': count}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+# ============================================================
+# NDJSON SEGMENT BACKEND
+# ============================================================
+
+class NDJSONResultStore(ResultStore):
+    """
+    Gzip-compressed NDJSON segments in a directory (results-<timestamp>.ndjson.gz).
+
+    Each batch is appended as one gzip member. The active segment is rotated
+    once it exceeds max_segment_bytes or max_segment_seconds; retention drops
+    whole segments older than retention_days or beyond max_segments.
+    Lookups scan segments newest first, so this backend suits archiving and
+    shipping results elsewhere more than frequent queries.
+    """
+
+    def __init__(self, directory: str, max_segment_bytes: int = 64 * 1024 * 1024,
+                 max_segment_seconds: float = 86400, retention_days: Optional[float] = None,
+                 max_segments: Optional[int] = None):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.retention_days = retention_days
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+        self._active: Optional[str] = None
+        self._active_opened = 0.0
+        self._full = set()  # (content hash, version) of full records written by this process
+        os.makedirs(directory, exist_ok=True)
+
+    def segments(self) -> List[str]:
+        """Segment paths, oldest first (names sort by creation time)"""
+        return sorted(glob.glob(os.path.join(self.directory, "results-*.ndjson.gz")))
+
+    def _segment_for_write(self) -> str:
+        now = time.time()
+        if self._active is None:
+            existing = self.segments()
+            if existing:
+                self._active = existing[-1]
+                self._active_opened = os.path.getmtime(self._active)
+        if (self._active is None
+                or os.path.getsize(self._active) >= self.max_segment_bytes
+                or now - self._active_opened >= self.max_segment_seconds):
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            self._active = os.path.join(self.directory, f"results-{stamp}.ndjson.gz")
+            self._active_opened = now
+        return self._active
+
+    def append(self, records: List[Dict]):
+        lines = []
+        for r in records:
+            key = (r['content_hash'], r.get('extractor_version'))
+            if r.get('_reference') and key in self._full:
+                r = as_reference(r)
+            else:
+                self._full.add(key)
+            lines.append(encode_record(r) + b'\n')
+        payload = b''.join(lines)
+        with self._lock:
+            with open(self._segment_for_write(), 'ab') as f:
+                f.write(gzip.compress(payload))
+
+    def _scan(self, field: str, value: str, limit: int) -> List[Dict]:
+        found = []
+        for path in reversed(self.segments()):
+            with gzip.open(path, 'rb') as f:
+                matches = [record for record in map(loads, f) if record.get(field) == value]
+            for record in matches:
+                record.pop('artifacts', None)
+            found.extend(reversed(matches))
+            if len(found) >= limit:
+                break
+        return self._resolve(found[:limit])
+
+    def _resolve(self, records: List[Dict]) -> List[Dict]:
+        """Fill in the data of reference rows (dropping those whose full record expired)"""
+        known = {(r['content_hash'], r.get('extractor_version')): r['data']
+                 for r in reversed(records) if r['data'] is not None}
+        missing = {(r['content_hash'], r.get('extractor_version')) for r in records
+                   if r['data'] is None} - set(known)
+        if missing:
+            for path in reversed(self.segments()):
+                with gzip.open(path, 'rb') as f:
+                    for record in map(loads, f):
+                        key = (record['content_hash'], record.get('extractor_version'))
+                        if key in missing and record['data'] is not None:
+                            known[key] = record['data']
+                missing -= set(known)
+                if not missing:
+                    break
+        resolved = []
+        for record in records:
+            key = (record['content_hash'], record.get('extractor_version'))
+            if record['data'] is None and key in known:
+                record['data'] = known[key]
+            if record['data'] is not None:
+                resolved.append(record)
+        return resolved
+
+    def by_hash(self, content_hash: str, limit: int = 10) -> List[Dict]:
+        return self._scan('content_hash', content_hash, limit)
+
+    def iter_all(self) -> Iterator[Dict]:
+        for path in self.segments():
+            with gzip.open(path, 'rb') as f:
+                for record in map(loads, f):
+                    if record['data'] is not None:
+                        yield record
+
+    def by_user(self, user_id: str, limit: int = 50) -> List[Dict]:
+        return self._scan('user_id', user_id, limit)
+
+    def prune(self) -> int:
+        with self._lock:
+            segments = self.segments()
+            doomed = set()
+            if self.retention_days:
+                cutoff = time.time() - self.retention_days * 86400
+                doomed.update(p for p in segments if os.path.getmtime(p) < cutoff)
+            if self.max_segments and len(segments) > self.max_segments:
+                doomed.update(segments[:len(segments) - self.max_segments])
+            doomed.discard(self._active)
+            for path in doomed:
+                os.remove(path)
+        return len(doomed)
+
+    def stats(self) -> Dict:
+        segments = self.segments()
+        return {
+            'backend': 'ndjson',
+            'path': self.directory,
+            'segments': len(segments),
+            'bytes': sum(os.path.getsize(p) for p in segments),
+        }
+
+
+def store_from_env() -> Optional[ResultStore]:
+    """
+    Build the store from RESULT_STORE (sqlite | ndjson | none), RESULT_STORE_PATH,
+    RESULT_STORE_RETENTION_DAYS, RESULT_STORE_SEGMENT_MB and RESULT_STORE_MAX_SEGMENTS
+    """
+    backend = os.getenv("RESULT_STORE", "sqlite").lower()
+    retention = float(os.getenv("RESULT_STORE_RETENTION_DAYS", "90")) or None
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return SQLiteResultStore(os.getenv("RESULT_STORE_PATH", "results.db"), retention_days=retention)
+    if backend == "ndjson":
+        max_segments = os.getenv("RESULT_STORE_MAX_SEGMENTS")
+        return NDJSONResultStore(
+            os.getenv("RESULT_STORE_PATH", "results"),
+            max_segment_bytes=int(float(os.getenv("RESULT_STORE_SEGMENT_MB", "64")) * 1024 * 1024),
+            retention_days=retention,
+            max_segments=int(max_segments) if max_segments else None
+        )
+    raise ValueError(f"Unknown RESULT_STORE backend: {backend}")
+
+# ============================================================
+# BACKGROUND WRITER
+# ============================================================
+
+class ResultWriter:
+    """
+    Queues records from request handlers and writes them in batches off the
+    event loop. A batch is flushed at batch_size records or every
+    flush_interval seconds. When the queue is full, records are dropped (and
+    counted) rather than slowing requests down.
+    """
+
+    def __init__(self, store: ResultStore, batch_size: int = 50, flush_interval: float = 1.0,
+                 max_queue: int = 10000, prune_interval: float = 3600):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.prune_interval = prune_interval
+        self.max_queue = max_queue
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._last_prune = time.monotonic()
+        self._counters = {'written': 0, 'dropped': 0, 'batches': 0, 'failed': 0}
+
+    def submit(self, record: Dict) -> bool:
+        """Queue a record without blocking; False if it had to be dropped"""
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except asyncio.QueueFull:
+            self._counters['dropped'] += 1
+            return False
+
+    def start(self):
+        if self._task is None:
+            # Queues bind to the loop that first waits on them; start fresh on
+            # the current loop, carrying over anything submitted before start
+            queued, self._queue = self._queue, asyncio.Queue(maxsize=self.max_queue)
+            while not queued.empty():
+                self._queue.put_nowait(queued.get_nowait())
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic() if batch else None
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:  # Sentinel from stop()
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(record)
+            if batch:
+                await self._write(batch)
+
+            if time.monotonic() - self._last_prune >= self.prune_interval:
+                self._last_prune = time.monotonic()
+                removed = await asyncio.to_thread(self.store.prune)
+                if removed:
+                    logger.info(f"Result store retention removed {removed} entries")
+
+    async def _write(self, batch: List[Dict]):
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self.store.append, batch)
+            STAGE_SECONDS.observe(time.perf_counter() - started, stage='store_write')
+            self._counters['written'] += len(batch)
+            self._counters['batches'] += 1
+        except Exception as e:
+            self._counters['failed'] += len(batch)
+            logger.error(f"❌ Failed to write {len(batch)} results: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    async def stop(self):
+        """Write whatever is queued, then stop the background task"""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def stats(self) -> Dict:
+        return {'queued': self._queue.qsize(), **self._counters}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Result store tools (configured via RESULT_STORE_* env vars)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    importer = commands.add_parser('import', help="Import legacy resume_data_*.json files")
+    importer.add_argument('files', nargs='+')
+    query = commands.add_parser('query', help="Print stored results as NDJSON")
+    group = query.add_mutually_exclusive_group(required=True)
+    group.add_argument('--hash', help="Content SHA-256")
+    group.add_argument('--user', help="User id")
+    query.add_argument('--limit', type=int, default=10)
+    commands.add_parser('prune', help="Apply retention now")
+    args = parser.parse_args()
+
+    store = store_from_env()
+    if store is None:
+        print("RESULT_STORE is 'none'", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == 'import':
+        # Legacy dumps never recorded the upload bytes, so they are keyed by filename
+        records = []
+        for path in args.files:
+            with open(path, encoding='utf-8') as f:
+                legacy = json.load(f)
+            records.append(make_record(
+                f"legacy:{os.path.basename(path)}", legacy['data'],
+                filename=legacy.get('filename'), processed_at=legacy.get('processed_at')
+            ))
+        store.append(records)
+        print(f"Imported {len(records)} results", file=sys.stderr)
+    elif args.command == 'query':
+        results = store.by_hash(args.hash, args.limit) if args.hash else store.by_user(args.user, args.limit)
+        for record in results:
+            print(json.dumps(record, ensure_ascii=False))
+    elif args.command == 'prune':
+        print(f"Removed {store.prune()} entries", file=sys.stderr)
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
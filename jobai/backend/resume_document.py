@@ -0,0 +1,220 @@
+"""
+Shared resume document model
+Splits resume text into named sections in one linear pass over its lines, so
+extractors no longer re-lowercase and re-scan the whole text themselves
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Union
+
+from metrics import timed
+from patterns import register
+
+
+class Section(NamedTuple):
+    """A named section; start/end are offsets of its body in the document text"""
+    name: str
+    heading: str
+    start: int
+    end: int
+
+
+# Whole-line headings (lowercased, trailing colon removed) -> section name
+SECTION_HEADINGS = {
+    'experience': [
+        'experience', 'work experience', 'professional experience', 'relevant experience',
+        'employment', 'employment history', 'work history', 'internships',
+        'internship experience', 'career history'
+    ],
+    'education': [
+        'education', 'academic background', 'academics', 'educational qualifications',
+        'academic qualifications', 'qualifications', 'education and training'
+    ],
+    'projects': [
+        'projects', 'project', 'personal projects', 'academic projects', 'key projects',
+        'project experience', 'selected projects'
+    ],
+    'skills': [
+        'skills', 'technical skills', 'key skills', 'core skills', 'core competencies',
+        'skills and tools', 'tech stack', 'technologies'
+    ],
+    'certifications': [
+        'certifications', 'certification', 'certificates', 'licenses and certifications',
+        'courses', 'courses and certifications'
+    ],
+    'summary': [
+        'summary', 'professional summary', 'profile', 'objective', 'career objective',
+        'about me', 'about'
+    ],
+    'achievements': [
+        'achievements', 'awards', 'honors', 'honours', 'awards and achievements',
+        'leadership', 'positions of responsibility'
+    ],
+    'activities': [
+        'activities', 'extra-curricular activities', 'extracurricular activities',
+        'interests', 'hobbies', 'volunteering', 'volunteer experience'
+    ],
+    'other': ['publications', 'languages', 'references', 'declaration'],
+}
+
+# Keywords that mark a short title-cased line as a heading
+# ("Technical Skills & Core Competencies", "Leadership & Achievements")
+HEADING_KEYWORDS = {
+    'experience': 'experience', 'employment': 'experience', 'internships': 'experience',
+    'education': 'education',
+    'projects': 'projects',
+    'skills': 'skills', 'competencies': 'skills',
+    'certifications': 'certifications', 'certificates': 'certifications',
+    'achievements': 'achievements', 'awards': 'achievements', 'honors': 'achievements',
+    'activities': 'activities', 'interests': 'activities', 'hobbies': 'activities',
+    'publications': 'other',
+}
+
+_HEADING_LOOKUP = {
+    heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings
+}
+_SMALL_WORDS = {'and', 'of', 'the', 'in', 'for', '&', 'to', 'with'}
+_INLINE_HEADING = register('sections.inline_heading', r'([A-Za-z][A-Za-z &/-]{1,40}?)[ \t]*[:\-–][ \t]*(\S.*)')
+_SPACED_LETTERS = register('sections.spaced_letters', r'^(?:[A-Za-z] )+[A-Za-z]$')
+_NON_LETTERS = register('sections.non_letters', r'[^a-z]+')
+
+
+def _normalize_heading(line: str) -> str:
+    line = line.strip().rstrip(':').strip()
+    if _SPACED_LETTERS.match(line):
+        # "E X P E R I E N C E" as produced by letter-spaced PDF headings
+        line = line.replace(' ', '')
+    return ' '.join(line.lower().replace('&', 'and').split())
+
+
+def _keyword_heading(line: str) -> Optional[str]:
+    """Section name for short, title-cased lines containing a heading keyword"""
+    stripped = line.strip().rstrip(':')
+    words = stripped.split()
+    if not words or len(words) > 6 or len(stripped) > 60:
+        return None
+    if any(ch.isdigit() or ch in ':,|' for ch in stripped) or stripped.endswith('.'):
+        return None
+    if not stripped.isupper() and any(
+        word[0].isalpha() and word[0].islower() and word.lower() not in _SMALL_WORDS
+        for word in words
+    ):
+        return None
+    for word in _NON_LETTERS.split(stripped.lower()):
+        if word in HEADING_KEYWORDS:
+            return HEADING_KEYWORDS[word]
+    return None
+
+
+@timed('sections')
+def segment_sections(text: str) -> Dict[str, Section]:
+    """
+    Find section headings line by line and return the first section of each name.
+
+    A heading is a line that is exactly a known heading, a short title-cased
+    line containing a heading keyword, or "Heading: inline content" where the
+    part before the colon is a known heading. A section body runs until the
+    next heading.
+    """
+    headings: List[tuple] = []  # (name, heading text, body start, heading line start)
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        line_start, offset = offset, offset + len(line)
+        content = line.strip()
+        if not content or len(content) > 80:
+            continue
+
+        name = _HEADING_LOOKUP.get(_normalize_heading(content)) or _keyword_heading(content)
+        if name:
+            headings.append((name, content.rstrip(':'), offset, line_start))
+            continue
+
+        inline = _INLINE_HEADING.match(content)
+        if inline:
+            name = _HEADING_LOOKUP.get(_normalize_heading(inline.group(1)))
+            if name:
+                body_start = line_start + line.index(content) + inline.start(2)
+                headings.append((name, inline.group(1), body_start, line_start))
+
+    return _build_sections(headings, len(text))
+
+
+def _build_sections(headings: List[tuple], length: int) -> Dict[str, Section]:
+    """First section of each name from (name or None, heading, body start, heading start) in order"""
+    sections: Dict[str, Section] = {}
+    for i, (name, heading, start, _) in enumerate(headings):
+        end = headings[i + 1][3] if i + 1 < len(headings) else length
+        if name and name not in sections:
+            sections[name] = Section(name, heading, start, end)
+    return sections
+
+
+@timed('sections')
+def sections_from_headings(text: str, headings: List[tuple]) -> Dict[str, Section]:
+    """
+    Sections from font-tagged heading lines (pdf_layout), touching only those
+    lines. Known headings (or bold "Heading:" lead-ins) start a section;
+    unknown ones set in a larger font (level 1) still end the previous one. Falls back to segment_sections
+    when no known heading was tagged (e.g. a resume set in a single font).
+    """
+    found = []
+    for offset, heading, level in headings:
+        if level == 3:
+            inline = _INLINE_HEADING.match(heading)
+            name = inline and _HEADING_LOOKUP.get(_normalize_heading(inline.group(1)))
+            if name:
+                body_start = text.find(heading, offset) + inline.start(2)
+                found.append((name, inline.group(1), body_start, offset))
+            continue
+        name = _HEADING_LOOKUP.get(_normalize_heading(heading)) or _keyword_heading(heading)
+        if name or level == 1:
+            line_end = text.find('\n', offset)
+            found.append((name, heading.rstrip(':'), len(text) if line_end < 0 else line_end + 1, offset))
+    if not any(name for name, _, _, _ in found):
+        return segment_sections.__wrapped__(text)  # Already timed here
+    return _build_sections(found, len(text))
+
+
+class ResumeDocument:
+    """
+    Resume text plus derived views, built once per resume and shared by extractors.
+    headings: (offset, text, level) heading lines tagged by pdf_layout, if any
+    """
+
+    def __init__(self, text: str, sections: Optional[Dict[str, Section]] = None,
+                 headings: Optional[List[tuple]] = None):
+        self.text = text
+        self.headings = headings
+        self._lower: Optional[str] = None
+        self._sections = sections  # Precomputed (e.g. restored from stored artifacts)
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def sections(self) -> Dict[str, Section]:
+        if self._sections is None:
+            if self.headings is not None:
+                self._sections = sections_from_headings(self.text, self.headings)
+            else:
+                self._sections = segment_sections(self.text)
+        return self._sections
+
+    def section_text(self, name: str) -> Optional[str]:
+        """Original-case body of a section, or None if the resume has no such section"""
+        section = self.sections.get(name)
+        return self.text[section.start:section.end] if section else None
+
+
+def sections_to_json(sections: Dict[str, Section]) -> Dict[str, list]:
+    return {name: [section.heading, section.start, section.end] for name, section in sections.items()}
+
+
+def sections_from_json(data: Dict[str, list]) -> Dict[str, Section]:
+    return {name: Section(name, *values) for name, values in data.items()}
+
+
+def as_document(source: Union[str, ResumeDocument]) -> ResumeDocument:
+    return source if isinstance(source, ResumeDocument) else ResumeDocument(source)
@@ -2,47 +2,224 @@
 Resume data extraction for job search
 Extracts: contact info, skills, experience, education, projects, preferences
 """
+import hashlib
+import json
+import os
 import re
 import fitz
-import spacy
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 from datetime import datetime
 from dateutil.parser import parse as date_parse
 import logging
 
+from metrics import PDF_DOCUMENTS, PDF_PAGES, TEXT_CHARS, TEXT_SIZE, timed
+from near_duplicates import DuplicateCheck, signature_from_json, signature_to_json, text_signature
+from ocr import needs_ocr, ocr_available, ocr_pages
+from patterns import register
+from pdf_layout import document_headings, headings_to_json, layout_mode, page_text, pages_from_json, PageText
+from resume_document import ResumeDocument, as_document, sections_from_json, sections_to_json
+from skill_taxonomy import get_taxonomy
+
 logger = logging.getLogger(__name__)
 
-# Global NLP model
+# Global NLP model (loaded lazily, only when an NLP-backed extractor is enabled)
 nlp = None
+NLP_MODEL = os.getenv("NLP_MODEL", "en_core_web_sm")
+
+# NLP-backed extractors -> spaCy pipeline components they need.
+# None of the current extractors use spaCy, so nothing is loaded by default.
+NLP_EXTRACTOR_COMPONENTS: Dict[str, List[str]] = {}
+
+# Comma-separated names from NLP_EXTRACTOR_COMPONENTS to switch on
+ENABLED_NLP_EXTRACTORS = [
+    name.strip() for name in os.getenv("NLP_EXTRACTORS", "").split(",") if name.strip()
+]
+
+# Pipeline components shipped with the en_core_web_* models
+NLP_MODEL_COMPONENTS = ['tok2vec', 'tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'ner', 'senter']
+
+# Version of every pipeline stage: bump the stage whose logic changes. Cached
+# results are not reused, and reindex.py re-runs just that stage (plus those
+# whose input it changed) from the text and sections stored with each result
+STAGE_VERSIONS = {
+    'text': '1',              # PDF -> page texts (PDF_EXTRACTION_MODE appended)
+    'sections': '1',          # text -> section segmentation
+    'contact_info': '1',
+    'skills': '3',            # typo matches moved to possible_skills
+    'experience': '1',
+    'education': '1',
+    'projects': '1',
+    'job_preferences': '1',
+    'raw_text': '1',
+    'search_keywords': '3',   # extracted fields -> search keywords; multi-skill title rules count once
+}
+
+# Stages whose output also depends on the skill taxonomy
+TAXONOMY_STAGES = ('skills', 'search_keywords')
+
+def stage_versions() -> Dict[str, str]:
+    """Current version of every stage, taxonomy included where it matters"""
+    taxonomy = get_taxonomy().version
+    versions = {
+        stage: f"{version}-{taxonomy}" if stage in TAXONOMY_STAGES else version
+        for stage, version in STAGE_VERSIONS.items()
+    }
+    if layout_mode():
+        versions['text'] += '-layout'
+    return versions
+
+@lru_cache(maxsize=8)
+def _versions_digest(taxonomy_version: str) -> str:
+    return hashlib.sha1(json.dumps(stage_versions(), sort_keys=True).encode()).hexdigest()[:12]
+
+def extraction_version() -> str:
+    """Version of the extraction output: all stage versions + skill taxonomy"""
+    return _versions_digest(get_taxonomy().version)
+
+def nlp_required() -> bool:
+    """True when at least one enabled extractor needs the spaCy model"""
+    return any(name in NLP_EXTRACTOR_COMPONENTS for name in ENABLED_NLP_EXTRACTORS)
 
 def load_nlp_model():
-    """Load spaCy NLP model"""
+    """Load spaCy NLP model, with only the components enabled extractors need"""
     global nlp
+    if nlp is not None or not nlp_required():
+        return nlp
+    
+    needed = {
+        component
+        for name in ENABLED_NLP_EXTRACTORS
+        for component in NLP_EXTRACTOR_COMPONENTS.get(name, [])
+    }
     try:
-        nlp = spacy.load("en_core_web_sm")
-        logger.info("✅ SpaCy model loaded")
-    except OSError:
-        logger.error("❌ SpaCy model not found. Install with: python -m spacy download en_core_web_sm")
+        import spacy  # Deferred: importing spaCy alone costs seconds and memory
+        nlp = spacy.load(
+            NLP_MODEL,
+            exclude=[c for c in NLP_MODEL_COMPONENTS if c not in needed]
+        )
+        logger.info(f"✅ SpaCy model loaded with components: {nlp.pipe_names}")
+    except (ImportError, OSError):
+        logger.error(f"❌ SpaCy model not found. Install with: python -m spacy download {NLP_MODEL}")
         nlp = None
+    return nlp
+
+def get_nlp():
+    """Model for NLP-backed extractors; loads it on first use"""
+    return nlp if nlp is not None else load_nlp_model()
 
 # ============================================================
 # PDF EXTRACTION
 # ============================================================
 
-def extract_text_from_pdf(pdf_content: bytes) -> str:
-    """Extract text from PDF bytes"""
+# Hard budget for any single upload, whatever the extractors ask for
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "20"))
+MAX_TEXT_CHARS = int(os.getenv("MAX_TEXT_CHARS", "100000"))
+
+# Documents declaring more pages than this are refused outright (no resume is
+# this long; uploads are checked by upload_guard.check_pdf before reaching a
+# pool); only the first MAX_PDF_PAGES are ever read from the rest
+MAX_UPLOAD_PAGES = int(os.getenv("MAX_UPLOAD_PAGES", "100"))
+
+# Readers accept the header anywhere in the first 1024 bytes
+PDF_MAGIC = b"%PDF-"
+
+def has_pdf_header(head: bytes) -> bool:
+    return PDF_MAGIC in head[:1024]
+
+def iter_pdf_pages(pdf_content: bytes, scanned: Optional[List[int]] = None) -> Iterator[str]:
+    """
+    Yield page texts lazily; pages after the consumer stops are never parsed.
+    Indexes of pages without a text layer (see ocr.needs_ocr) are appended to scanned.
+    """
+    if not has_pdf_header(pdf_content):
+        raise Exception("PDF extraction failed: not a PDF file")
     try:
+        # Takes the bytes as is (no copy); only the xref is read here
         doc = fitz.open(stream=pdf_content, filetype="pdf")
-        text = "".join([page.get_text() + "\n" for page in doc])
-        doc.close()
-        
-        if not text.strip():
-            raise Exception("PDF appears to be empty or contains only images")
-        
-        return text
     except Exception as e:
         logger.error(f"PDF extraction error: {e}")
         raise Exception(f"PDF extraction failed: {str(e)}")
+    
+    try:
+        if doc.needs_pass:
+            raise Exception("PDF extraction failed: PDF is password protected")
+        if doc.page_count > MAX_UPLOAD_PAGES:
+            raise Exception(f"PDF extraction failed: {doc.page_count} pages, at most {MAX_UPLOAD_PAGES} accepted")
+        for page in doc:
+            text = page_text(page)
+            if scanned is not None and needs_ocr(page, text):
+                scanned.append(page.number)
+            yield text
+    finally:
+        doc.close()
+
+@timed('pdf_text')
+def read_pdf_pages(pdf_content: bytes, needs: Iterable[tuple] = ((None, None),),
+                   max_pages: Optional[int] = None, max_chars: Optional[int] = None,
+                   scanned: Optional[List[int]] = None) -> List[str]:
+    """
+    Read page texts until every need is satisfied or the budget is hit
+    
+    Args:
+        needs: (pages, chars) per consumer; a consumer is satisfied once either
+               limit is reached, (None, None) means the whole document
+        max_pages / max_chars: overall budget (defaults: MAX_PDF_PAGES / MAX_TEXT_CHARS)
+        scanned: when given, collects the indexes of pages that need OCR, and
+                 a document with no text layer at all is left to the caller
+        
+    Returns:
+        List of page texts read so far
+    """
+    needs = list(needs)
+    max_pages = max_pages or MAX_PDF_PAGES
+    max_chars = max_chars or MAX_TEXT_CHARS
+    
+    def satisfied(pages_read: int, chars_read: int) -> bool:
+        return all(
+            (pages is not None and pages_read >= pages) or
+            (chars is not None and chars_read >= chars)
+            for pages, chars in needs
+        )
+    
+    pages = []
+    chars_read = 0
+    for page_text in iter_pdf_pages(pdf_content, scanned):
+        pages.append(page_text)
+        chars_read += len(page_text) + 1
+        if satisfied(len(pages), chars_read):
+            break
+        if len(pages) >= max_pages or chars_read >= max_chars:
+            logger.warning(f"PDF text budget reached after {len(pages)} pages / {chars_read} chars")
+            break
+    
+    PDF_DOCUMENTS.inc()
+    PDF_PAGES.inc(len(pages))
+    TEXT_CHARS.inc(chars_read)
+    TEXT_SIZE.observe(chars_read)
+    
+    if not any(page.strip() for page in pages) and not scanned:
+        logger.error("PDF extraction error: no text layer")
+        raise Exception("PDF extraction failed: PDF appears to be empty or contains only images")
+    
+    return pages
+
+def join_pages(pages: List[str]) -> str:
+    return "".join(page + "\n" for page in pages)
+
+def pages_document(pages: List[str]) -> ResumeDocument:
+    """
+    Document over the joined page texts (bounded by MAX_TEXT_CHARS), carrying
+    the font-tagged headings when the pages were read in layout mode
+    """
+    text = join_pages(pages)[:MAX_TEXT_CHARS]
+    return ResumeDocument(text, headings=document_headings(pages, len(text)))
+
+def extract_text_from_pdf(pdf_content: bytes, max_pages: Optional[int] = None,
+                          max_chars: Optional[int] = None) -> str:
+    """Extract text from PDF bytes, bounded by the page/character budget"""
+    text = join_pages(read_pdf_pages(pdf_content, max_pages=max_pages, max_chars=max_chars))
+    return text[:max_chars or MAX_TEXT_CHARS]
 
 def validate_pdf(content: bytes, filename: str, max_size_bytes: int = 20 * 1024 * 1024) -> tuple:
     """Validate PDF file"""
@@ -53,15 +230,41 @@ def validate_pdf(content: bytes, filename: str, max_size_bytes: int = 20 * 1024
         max_mb = max_size_bytes / (1024 * 1024)
         return False, f"File size exceeds {max_mb}MB limit"
     
+    if not has_pdf_header(content):
+        return False, "File is not a valid PDF"
+    
     return True, "Valid"
 
 # ============================================================
 # CONTACT INFORMATION EXTRACTION
 # ============================================================
 
-def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
+# Local part anchored at the start of its run, so a long run without "@"
+# is scanned once instead of once per position
+EMAIL_PATTERN = register('contact.email', r'(?<![A-Za-z0-9._%+-])[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+
+# Indian and international formats, tried in order
+PHONE_PATTERNS = [
+    register('contact.phone.international', r'\+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'),
+    register('contact.phone.india', r'\+91[-.\s]?\d{10}'),
+    register('contact.phone.digits', r'\d{10}'),
+]
+
+NAME_REJECT_PATTERN = register('contact.name_reject', r'[@\d]')
+LINKEDIN_PATTERN = register('contact.linkedin', r'(?:linkedin\.com/in/|linkedin\.com/pub/)([A-Za-z0-9_-]+)', re.IGNORECASE)
+GITHUB_PATTERN = register('contact.github', r'(?:github\.com/)([A-Za-z0-9_-]+)', re.IGNORECASE)
+LOCATION_PATTERN = register(
+    'contact.location',
+    r'\b(?:Mumbai|Delhi|Bangalore|Bengaluru|Hyderabad|Chennai|Kolkata|Pune|Ahmedabad|Jaipur|Chandigarh|Noida|Gurgaon|India)\b',
+    re.IGNORECASE
+)
+
+@timed('contact_info')
+def extract_contact_info(text: Union[str, ResumeDocument]) -> Dict[str, Optional[str]]:
     """Extract name, email, phone, location, LinkedIn, GitHub"""
     
+    text = as_document(text).text
+    
     contact_info = {
         'name': None,
         'email': None,
@@ -72,21 +275,15 @@ def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
     }
     
     # Extract email
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(email_pattern, text)
-    if emails:
-        contact_info['email'] = emails[0]
+    email_match = EMAIL_PATTERN.search(text)
+    if email_match:
+        contact_info['email'] = email_match.group(0)
     
     # Extract phone (Indian and international formats)
-    phone_patterns = [
-        r'\+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',
-        r'\+91[-.\s]?\d{10}',
-        r'\d{10}'
-    ]
-    for pattern in phone_patterns:
-        phones = re.findall(pattern, text)
-        if phones:
-            contact_info['phone'] = phones[0]
+    for pattern in PHONE_PATTERNS:
+        phone_match = pattern.search(text)
+        if phone_match:
+            contact_info['phone'] = phone_match.group(0)
             break
     
     # Extract name (first few lines, typically name is at top)
@@ -94,24 +291,21 @@ def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
     if lines:
         # Name is usually the first line or second line
         potential_name = lines[0]
-        if len(potential_name.split()) <= 5 and not re.search(r'[@\d]', potential_name):
+        if len(potential_name.split()) <= 5 and not NAME_REJECT_PATTERN.search(potential_name):
             contact_info['name'] = potential_name
     
     # Extract LinkedIn
-    linkedin_pattern = r'(?:linkedin\.com/in/|linkedin\.com/pub/)([A-Za-z0-9_-]+)'
-    linkedin_match = re.search(linkedin_pattern, text, re.IGNORECASE)
+    linkedin_match = LINKEDIN_PATTERN.search(text)
     if linkedin_match:
         contact_info['linkedin'] = f"https://linkedin.com/in/{linkedin_match.group(1)}"
     
     # Extract GitHub
-    github_pattern = r'(?:github\.com/)([A-Za-z0-9_-]+)'
-    github_match = re.search(github_pattern, text, re.IGNORECASE)
+    github_match = GITHUB_PATTERN.search(text)
     if github_match:
         contact_info['github'] = f"https://github.com/{github_match.group(1)}"
     
     # Extract location (cities/states)
-    location_pattern = r'\b(?:Mumbai|Delhi|Bangalore|Bengaluru|Hyderabad|Chennai|Kolkata|Pune|Ahmedabad|Jaipur|Chandigarh|Noida|Gurgaon|India)\b'
-    location_match = re.search(location_pattern, text, re.IGNORECASE)
+    location_match = LOCATION_PATTERN.search(text)
     if location_match:
         contact_info['location'] = location_match.group(0)
     
@@ -121,128 +315,68 @@ def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
 # SKILLS EXTRACTION
 # ============================================================
 
-def extract_skills(text: str) -> Dict[str, List[str]]:
+@timed('skills')
+def extract_skills(text: Union[str, ResumeDocument]) -> Dict[str, List[str]]:
     """Extract categorized skills"""
-    
-    skills_categories = {
-        'programming_languages': {
-            'Python', 'Java', 'JavaScript', 'TypeScript', 'C++', 'C#', 'C',
-            'Ruby', 'PHP', 'Swift', 'Kotlin', 'Go', 'Rust', 'Scala', 'R',
-            'Dart', 'Objective-C', 'Perl', 'Shell', 'Bash'
-        },
-        'web_technologies': {
-            'React', 'Angular', 'Vue.js', 'Next.js', 'Node.js', 'Express',
-            'Django', 'Flask', 'FastAPI', 'Spring Boot', 'ASP.NET',
-            'HTML', 'CSS', 'SASS', 'Bootstrap', 'Tailwind', 'jQuery',
-            'GraphQL', 'REST API', 'WebSocket', 'Redux', 'MobX'
-        },
-        'mobile_development': {
-            'Flutter', 'React Native', 'Android', 'iOS', 'Kotlin', 'Swift',
-            'Xamarin', 'Ionic', 'Cordova'
-        },
-        'databases': {
-            'MongoDB', 'PostgreSQL', 'MySQL', 'Redis', 'Cassandra',
-            'DynamoDB', 'Firebase', 'SQLite', 'Oracle', 'SQL Server',
-            'Elasticsearch', 'Neo4j'
-        },
-        'cloud_devops': {
-            'AWS', 'Azure', 'GCP', 'Google Cloud', 'Docker', 'Kubernetes',
-            'Jenkins', 'CI/CD', 'Git', 'GitHub', 'GitLab', 'Terraform',
-            'Ansible', 'Chef', 'Puppet', 'Linux', 'Nginx', 'Apache'
-        },
-        'data_science_ai': {
-            'Machine Learning', 'Deep Learning', 'Data Science', 'TensorFlow',
-            'PyTorch', 'Keras', 'Scikit-learn', 'Pandas', 'NumPy',
-            'Matplotlib', 'Seaborn', 'NLP', 'Computer Vision', 'MLOps',
-            'OpenCV', 'NLTK', 'SpaCy', 'Hugging Face'
-        },
-        'other_tools': {
-            'Agile', 'Scrum', 'Jira', 'Postman', 'VS Code', 'IntelliJ',
-            'Figma', 'Adobe XD', 'Photoshop', 'Microservices', 'Grafana',
-            'Prometheus', 'Kafka', 'RabbitMQ', 'gRPC', 'OAuth', 'JWT'
-        }
-    }
-    
-    text_lower = text.lower()
-    detected_skills = {
-        'programming_languages': [],
-        'web_technologies': [],
-        'mobile_development': [],
-        'databases': [],
-        'cloud_devops': [],
-        'data_science_ai': [],
-        'other_tools': [],
-        'all_skills': []
-    }
-    
-    for category, skills_set in skills_categories.items():
-        for skill in skills_set:
-            pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-            if re.search(pattern, text_lower):
-                detected_skills[category].append(skill)
-                if skill not in detected_skills['all_skills']:
-                    detected_skills['all_skills'].append(skill)
-    
-    return detected_skills
+    return get_taxonomy().matcher.categorize(as_document(text).text)
 
 # ============================================================
 # EXPERIENCE EXTRACTION
 # ============================================================
 
-def extract_experience(text: str) -> Dict:
+# Direct years mention; numbers anchored so digit runs are not rescanned
+YEARS_PATTERNS = [
+    register('experience.years_before', r'(?<![\d.])(\d+(?:\.\d+)?)\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:work\s+)?experience'),
+    register('experience.years_after', r'(?:work\s+)?experience[:\s]+(\d+(?:\.\d+)?)\+?\s*(?:years?|yrs?)'),
+]
+
+# Job titles and company names inside the experience section
+POSITION_PATTERNS = [
+    register('experience.title', r'([A-Z][a-z ]+(?:Engineer|Developer|Manager|Lead|Architect|Analyst|Designer|Consultant))'),
+    register('experience.company', r'(?:at|@)[ \t]+([A-Z][A-Za-z &.,]+(?:Ltd|Inc|Corp|Pvt|LLC)?)'),
+]
+
+DATE_RANGE_PATTERN = register(
+    'experience.date_range',
+    r'\b((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{4})\s*[-–—to]\s*((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{4}|present|current)',
+    re.IGNORECASE
+)
+
+@timed('experience')
+def extract_experience(text: Union[str, ResumeDocument]) -> Dict:
     """Extract work experience details"""
     
+    doc = as_document(text)
+    
     experience_data = {
         'total_years': 0.0,
         'positions': []
     }
     
-    text_lower = text.lower()
-    current_year = datetime.now().year
+    text_lower = doc.lower
     
     # Direct years mention
-    direct_patterns = [
-        r'(\d+\.?\d*)\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:work\s+)?experience',
-        r'(?:work\s+)?experience[:\s]+(\d+\.?\d*)\+?\s*(?:years?|yrs?)',
-    ]
-    
-    for pattern in direct_patterns:
-        matches = re.findall(pattern, text_lower)
+    for pattern in YEARS_PATTERNS:
+        matches = pattern.findall(text_lower)
         if matches:
             years = [float(m) for m in matches if 0 < float(m) <= 50]
             if years:
                 experience_data['total_years'] = float(max(years))
                 break
     
-    # Extract experience section
-    exp_section_match = re.search(
-        r'(?:professional\s+)?(?:work\s+)?experience[:\s]*\n(.*?)(?=\n\s*(?:education|projects|skills|certifications?|$))',
-        text_lower,
-        re.DOTALL | re.IGNORECASE
-    )
-    
-    if exp_section_match:
-        exp_text = exp_section_match.group(1)
-        
-        # Extract job positions (company names and titles)
-        position_patterns = [
-            r'([A-Z][a-z\s]+(?:Engineer|Developer|Manager|Lead|Architect|Analyst|Designer|Consultant))',
-            r'(?:at|@)\s+([A-Z][A-Za-z\s&.,]+(?:Ltd|Inc|Corp|Pvt|LLC)?)'
-        ]
-        
-        for pattern in position_patterns:
-            positions = re.findall(pattern, text[:5000])  # First 5000 chars
+    # Extract job positions (company names and titles) from the experience section
+    exp_text = doc.section_text('experience')
+    if exp_text:
+        for pattern in POSITION_PATTERNS:
+            positions = pattern.findall(exp_text)
             for pos in positions[:5]:  # Max 5 positions
+                pos = pos.strip()
                 if pos not in experience_data['positions']:
-                    experience_data['positions'].append(pos.strip())
+                    experience_data['positions'].append(pos)
     
     # Calculate from date ranges if total_years not found
     if experience_data['total_years'] == 0:
-        date_ranges = re.findall(
-            r'((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{4})\s*[-–—to]\s*((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{4}|present|current)',
-            text_lower,
-            re.IGNORECASE
-        )
+        date_ranges = DATE_RANGE_PATTERN.findall(text_lower)
         
         total_months = 0
         for start_str, end_str in date_ranges:
@@ -265,42 +399,38 @@ def extract_experience(text: str) -> Dict:
 # EDUCATION EXTRACTION
 # ============================================================
 
-def extract_education(text: str) -> List[Dict]:
+# Degree patterns (bounded so "bs" in "jobs" is not a degree)
+DEGREE_PATTERNS = [
+    register('education.bachelor', r'(?<![A-Za-z])(B\.?Tech|Bachelor(?:\'?s)?|B\.?E\.?|B\.?S\.?|B\.?Sc)(?![A-Za-z])', re.IGNORECASE),
+    register('education.master', r'(?<![A-Za-z])(M\.?Tech|Master(?:\'?s)?|M\.?E\.?|M\.?S\.?|M\.?Sc|MBA)(?![A-Za-z])', re.IGNORECASE),
+    register('education.doctorate', r'(?<![A-Za-z])(Ph\.?D|Doctorate)(?![A-Za-z])', re.IGNORECASE),
+]
+YEAR_PATTERN = register('education.year', r'\b(19|20)\d{2}\b')
+CGPA_PATTERN = register('education.cgpa', r'(?<![\d.])(\d+(?:\.\d+)?)\s*(?:CGPA|GPA|%)', re.IGNORECASE)
+
+@timed('education')
+def extract_education(text: Union[str, ResumeDocument]) -> List[Dict]:
     """Extract education details"""
     
     education_list = []
     
     # Find education section
-    edu_section_match = re.search(
-        r'education[:\s]*\n(.*?)(?=\n\s*(?:experience|projects|skills|certifications?|$))',
-        text.lower(),
-        re.DOTALL | re.IGNORECASE
-    )
-    
-    if not edu_section_match:
+    edu_text = as_document(text).section_text('education')
+    if not edu_text:
         return education_list
     
-    edu_text = edu_section_match.group(1)
-    
-    # Degree patterns
-    degree_patterns = [
-        r'(B\.?Tech|Bachelor|B\.?E\.?|B\.?S\.?|B\.?Sc)',
-        r'(M\.?Tech|Master|M\.?E\.?|M\.?S\.?|M\.?Sc|MBA)',
-        r'(Ph\.?D|Doctorate)'
-    ]
-    
-    for pattern in degree_patterns:
-        matches = re.finditer(pattern, edu_text, re.IGNORECASE)
+    for pattern in DEGREE_PATTERNS:
+        matches = pattern.finditer(edu_text)
         for match in matches:
             degree = match.group(0)
             
             # Try to find associated year
             context = edu_text[max(0, match.start()-50):match.end()+100]
-            year_match = re.search(r'\b(19|20)\d{2}\b', context)
+            year_match = YEAR_PATTERN.search(context)
             year = year_match.group(0) if year_match else None
             
             # Try to find CGPA/percentage
-            cgpa_match = re.search(r'(\d+\.?\d*)\s*(?:CGPA|GPA|%)', context, re.IGNORECASE)
+            cgpa_match = CGPA_PATTERN.search(context)
             cgpa = cgpa_match.group(1) if cgpa_match else None
             
             education_list.append({
@@ -315,25 +445,21 @@ def extract_education(text: str) -> List[Dict]:
 # PROJECTS EXTRACTION
 # ============================================================
 
-def extract_projects(text: str) -> List[str]:
+PROJECT_SPLIT_PATTERN = register('projects.split', r'\n\s*[•\-\*]\s*|\n{2,}')
+
+@timed('projects')
+def extract_projects(text: Union[str, ResumeDocument]) -> List[str]:
     """Extract project names and descriptions"""
     
     projects = []
     
     # Find projects section
-    proj_section_match = re.search(
-        r'projects?[:\s]*\n(.*?)(?=\n\s*(?:experience|education|skills|certifications?|$))',
-        text.lower(),
-        re.DOTALL | re.IGNORECASE
-    )
-    
-    if not proj_section_match:
+    proj_text = as_document(text).section_text('projects')
+    if not proj_text:
         return projects
     
-    proj_text = proj_section_match.group(1)
-    
     # Split by bullet points or line breaks
-    project_lines = re.split(r'\n\s*[•\-\*]\s*|\n{2,}', proj_text)
+    project_lines = PROJECT_SPLIT_PATTERN.split(proj_text)
     
     for line in project_lines:
         line = line.strip()
@@ -346,7 +472,29 @@ def extract_projects(text: str) -> List[str]:
 # JOB PREFERENCES EXTRACTION
 # ============================================================
 
-def extract_job_preferences(text: str) -> Dict:
+JOB_TYPE_PATTERNS = [
+    ('Full-time', register('preferences.full_time', r'\bfull[- ]?time\b')),
+    ('Part-time', register('preferences.part_time', r'\bpart[- ]?time\b')),
+    ('Contract', register('preferences.contract', r'\bcontract\b')),
+    ('Internship', register('preferences.internship', r'\binternship\b')),
+]
+REMOTE_PATTERN = register('preferences.remote', r'\b(remote|work from home|wfh)\b')
+
+# Salary expectation (LPA for India, or general numbers), tried in order
+SALARY_PATTERNS = [
+    register('preferences.salary_range', r'(?<!\d)(\d+)\s*(?:-|to)\s*(\d+)\s*(?:lpa|lakhs?)'),
+    register('preferences.salary_label', r'(?:salary|compensation|ctc)[:\s]*(?:(?:₹|rs\.?|inr)\s*)?(\d+)'),
+    register('preferences.salary_expected', r'(?<!\d)(\d+)\s*(?:lpa|lakhs?)\s*(?:expected|desired|seeking)'),
+]
+
+PREFERRED_LOCATIONS = ['bangalore', 'bengaluru', 'mumbai', 'delhi', 'hyderabad',
+                       'chennai', 'pune', 'kolkata', 'remote', 'anywhere']
+PREFERRED_LOCATION_PATTERN = register(
+    'preferences.locations', r'\b(' + '|'.join(PREFERRED_LOCATIONS) + r')\b'
+)
+
+@timed('job_preferences')
+def extract_job_preferences(text: Union[str, ResumeDocument]) -> Dict:
     """Extract job type preferences, location preferences, salary expectations"""
     
     preferences = {
@@ -356,41 +504,28 @@ def extract_job_preferences(text: str) -> Dict:
         'remote_preference': False
     }
     
-    text_lower = text.lower()
+    text_lower = as_document(text).lower
     
     # Job type preferences
-    if re.search(r'\bfull[- ]?time\b', text_lower):
-        preferences['job_types'].append('Full-time')
-    if re.search(r'\bpart[- ]?time\b', text_lower):
-        preferences['job_types'].append('Part-time')
-    if re.search(r'\bcontract\b', text_lower):
-        preferences['job_types'].append('Contract')
-    if re.search(r'\binternship\b', text_lower):
-        preferences['job_types'].append('Internship')
+    for job_type, pattern in JOB_TYPE_PATTERNS:
+        if pattern.search(text_lower):
+            preferences['job_types'].append(job_type)
     
     # Remote preference
-    if re.search(r'\b(remote|work from home|wfh)\b', text_lower):
+    if REMOTE_PATTERN.search(text_lower):
         preferences['remote_preference'] = True
     
-    # Salary expectation (LPA for India, or general numbers)
-    salary_patterns = [
-        r'(\d+)\s*(?:-|to)\s*(\d+)\s*(?:lpa|lakhs?)',
-        r'(?:salary|compensation|ctc)[:\s]*(?:₹|rs\.?|inr)?\s*(\d+)',
-        r'(\d+)\s*(?:lpa|lakhs?)\s*(?:expected|desired|seeking)'
-    ]
-    
-    for pattern in salary_patterns:
-        match = re.search(pattern, text_lower)
+    # Salary expectation
+    for pattern in SALARY_PATTERNS:
+        match = pattern.search(text_lower)
         if match:
             preferences['salary_expectation'] = match.group(0)
             break
     
-    # Preferred locations
-    location_keywords = ['bangalore', 'bengaluru', 'mumbai', 'delhi', 'hyderabad', 
-                        'chennai', 'pune', 'kolkata', 'remote', 'anywhere']
-    
-    for loc in location_keywords:
-        if re.search(r'\b' + loc + r'\b', text_lower):
+    # Preferred locations (one scan, reported in PREFERRED_LOCATIONS order)
+    found = set(PREFERRED_LOCATION_PATTERN.findall(text_lower))
+    for loc in PREFERRED_LOCATIONS:
+        if loc in found:
             preferences['preferred_locations'].append(loc.title())
     
     return preferences
@@ -399,36 +534,61 @@ def extract_job_preferences(text: str) -> Dict:
 # MAIN EXTRACTION FUNCTION
 # ============================================================
 
-def extract_resume_data(pdf_content: bytes) -> Dict:
+# Text each field needs, as (leading pages, leading chars); a field is
+# satisfied once either is reached. (None, None) = whole document.
+# Only contact_info and raw_text stop early: skills, experience and the rest
+# can appear on any page, so a full extraction (/api/extract-resume) reads
+# until MAX_PDF_PAGES / MAX_TEXT_CHARS. Early termination pays off for
+# callers that pass a subset of fields.
+TEXT_REQUIREMENTS = {
+    'contact_info': (1, None),
+    'skills': (None, None),
+    'experience': (None, None),
+    'education': (None, None),
+    'projects': (None, None),
+    'job_preferences': (None, None),
+    'raw_text': (None, 1000),
+}
+
+EXTRACTORS = {
+    'contact_info': lambda text: extract_contact_info(text),
+    'skills': lambda text: extract_skills(text),
+    'experience': lambda text: extract_experience(text),
+    'education': lambda text: extract_education(text),
+    'projects': lambda text: extract_projects(text),
+    'job_preferences': lambda text: extract_job_preferences(text),
+    'raw_text': lambda doc: doc.text[:1000],  # First 1000 chars for reference
+}
+
+def extract_resume_data(pdf_content: bytes, fields: Optional[Iterable[str]] = None) -> Dict:
     """
     Main function to extract all resume data
     
     Args:
         pdf_content: PDF file content as bytes
+        fields: subset of EXTRACTORS to run (default: all). PDF parsing stops
+                as soon as the selected fields have all the text they need.
         
     Returns:
         Dictionary with all extracted resume data
     """
     
-    if not nlp:
-        load_nlp_model()
+    fields = list(fields or EXTRACTORS)
     
-    # Extract text from PDF
-    text = extract_text_from_pdf(pdf_content)
+    # Extract text from PDF, page by page, only as far as needed
+    pages = read_pdf_pages(pdf_content, [TEXT_REQUIREMENTS[field] for field in fields])
     
-    if len(text.strip()) < 100:
+    # Segment once; every whole-document extractor shares this object
+    document = pages_document(pages)
+    if len(document.text.strip()) < 100:
         raise Exception("Resume text too short")
     
-    # Extract all components
-    resume_data = {
-        'contact_info': extract_contact_info(text),
-        'skills': extract_skills(text),
-        'experience': extract_experience(text),
-        'education': extract_education(text),
-        'projects': extract_projects(text),
-        'job_preferences': extract_job_preferences(text),
-        'raw_text': text[:1000]  # First 1000 chars for reference
-    }
+    # Extract all components, each on the text it declared
+    resume_data = {}
+    for field in fields:
+        max_pages, _ = TEXT_REQUIREMENTS[field]
+        source = document if max_pages is None else pages_document(pages[:max_pages])
+        resume_data[field] = EXTRACTORS[field](source)
     
     return resume_data
 
@@ -441,7 +601,8 @@ Enhanced keyword generation for job search
 Generates MORE job titles based on skills
 """
 
-def generate_search_keywords(resume_data: Dict) -> Dict[str, List[str]]:
+@timed('search_keywords')
+def generate_search_keywords(resume_data: Dict) -> Dict:
     """
     Generate keywords for job search based on resume data
     
@@ -468,157 +629,213 @@ def generate_search_keywords(resume_data: Dict) -> Dict[str, List[str]]:
     else:
         search_keywords['experience_level'] = 'Senior'
     
-    # Generate job titles based on skills
+    # Job titles from the compiled rule table, ranked by score
     skills = resume_data['skills']
-    job_titles = set()  # Use set to avoid duplicates
-    
-    # Programming Languages
-    if skills['programming_languages']:
-        for lang in skills['programming_languages'][:3]:
-            job_titles.add(f'{lang} Developer')
-            if years >= 3:
-                job_titles.add(f'Senior {lang} Developer')
-        
-        if 'Python' in skills['all_skills']:
-            job_titles.update(['Python Developer', 'Backend Developer', 'Python Engineer'])
-        if 'Java' in skills['all_skills']:
-            job_titles.update(['Java Developer', 'Java Engineer', 'Backend Engineer'])
-        if 'JavaScript' in skills['all_skills']:
-            job_titles.update(['JavaScript Developer', 'Frontend Developer'])
-    
-    # Web Development
-    if skills['web_technologies']:
-        if 'React' in skills['all_skills']:
-            job_titles.update([
-                'React Developer', 'Frontend Developer', 'React.js Developer',
-                'UI Developer', 'Frontend Engineer'
-            ])
-        if 'Angular' in skills['all_skills']:
-            job_titles.update(['Angular Developer', 'Frontend Developer', 'UI Developer'])
-        if 'Vue.js' in skills['all_skills']:
-            job_titles.update(['Vue Developer', 'Frontend Developer', 'Vue.js Developer'])
-        
-        if 'Node.js' in skills['all_skills']:
-            job_titles.update([
-                'Node.js Developer', 'Backend Developer', 'Node Developer',
-                'Backend Engineer', 'API Developer'
-            ])
-        if 'Express' in skills['all_skills']:
-            job_titles.update(['Backend Developer', 'Node.js Developer'])
-        
-        # Full Stack
-        if len(skills['web_technologies']) > 3:
-            job_titles.update([
-                'Full Stack Developer', 'Full Stack Engineer', 
-                'Software Engineer', 'Web Developer'
-            ])
-        
-        # Frameworks
-        if 'Django' in skills['all_skills']:
-            job_titles.update(['Django Developer', 'Python Developer', 'Backend Developer'])
-        if 'Flask' in skills['all_skills']:
-            job_titles.update(['Flask Developer', 'Python Developer'])
-        if 'FastAPI' in skills['all_skills']:
-            job_titles.update(['FastAPI Developer', 'Python Developer', 'API Developer'])
-        if 'Spring Boot' in skills['all_skills']:
-            job_titles.update(['Spring Boot Developer', 'Java Developer'])
-        if 'Next.js' in skills['all_skills']:
-            job_titles.update(['Next.js Developer', 'React Developer', 'Full Stack Developer'])
-    
-    # Mobile Development
-    if skills['mobile_development']:
-        job_titles.update(['Mobile Developer', 'Mobile Engineer', 'App Developer'])
-        
-        if 'Flutter' in skills['all_skills']:
-            job_titles.update([
-                'Flutter Developer', 'Flutter Engineer', 'Mobile App Developer',
-                'Cross-Platform Developer', 'Dart Developer'
-            ])
-        if 'React Native' in skills['all_skills']:
-            job_titles.update([
-                'React Native Developer', 'Mobile Developer', 
-                'Cross-Platform Developer', 'Mobile Engineer'
-            ])
-        if 'Android' in skills['all_skills']:
-            job_titles.update(['Android Developer', 'Android Engineer', 'Mobile Developer'])
-        if 'iOS' in skills['all_skills']:
-            job_titles.update(['iOS Developer', 'iOS Engineer', 'Mobile Developer'])
-        if 'Kotlin' in skills['all_skills']:
-            job_titles.update(['Kotlin Developer', 'Android Developer'])
-        if 'Swift' in skills['all_skills']:
-            job_titles.update(['Swift Developer', 'iOS Developer'])
-    
-    # Data Science & AI
-    if skills['data_science_ai']:
-        if 'Machine Learning' in skills['all_skills']:
-            job_titles.update([
-                'Machine Learning Engineer', 'ML Engineer', 'AI Engineer',
-                'Data Scientist', 'ML Developer'
-            ])
-        if 'Deep Learning' in skills['all_skills']:
-            job_titles.update(['Deep Learning Engineer', 'AI Engineer', 'ML Engineer'])
-        if 'Data Science' in skills['all_skills']:
-            job_titles.update([
-                'Data Scientist', 'Data Analyst', 'Data Engineer',
-                'ML Engineer', 'Analytics Engineer'
-            ])
-        if 'TensorFlow' in skills['all_skills'] or 'PyTorch' in skills['all_skills']:
-            job_titles.update(['ML Engineer', 'AI Developer', 'Deep Learning Engineer'])
-        if 'NLP' in skills['all_skills']:
-            job_titles.update(['NLP Engineer', 'ML Engineer', 'AI Developer'])
-        if 'Computer Vision' in skills['all_skills']:
-            job_titles.update(['Computer Vision Engineer', 'AI Engineer'])
-        if 'MLOps' in skills['all_skills']:
-            job_titles.update(['MLOps Engineer', 'ML Engineer', 'DevOps Engineer'])
-    
-    # Cloud & DevOps
-    if skills['cloud_devops']:
-        if 'AWS' in skills['all_skills']:
-            job_titles.update([
-                'AWS Developer', 'Cloud Engineer', 'DevOps Engineer',
-                'Cloud Architect', 'Solutions Architect'
-            ])
-        if 'Azure' in skills['all_skills']:
-            job_titles.update(['Azure Developer', 'Cloud Engineer', 'DevOps Engineer'])
-        if 'GCP' in skills['all_skills'] or 'Google Cloud' in skills['all_skills']:
-            job_titles.update(['GCP Developer', 'Cloud Engineer', 'DevOps Engineer'])
-        
-        if 'Docker' in skills['all_skills'] or 'Kubernetes' in skills['all_skills']:
-            job_titles.update([
-                'DevOps Engineer', 'Site Reliability Engineer', 'SRE',
-                'Platform Engineer', 'Infrastructure Engineer'
-            ])
-        if 'CI/CD' in skills['all_skills']:
-            job_titles.update(['DevOps Engineer', 'Build Engineer', 'Release Engineer'])
-        if 'Terraform' in skills['all_skills']:
-            job_titles.update(['DevOps Engineer', 'Infrastructure Engineer', 'Cloud Engineer'])
-    
-    # Database
-    if skills['databases']:
-        if 'MongoDB' in skills['all_skills']:
-            job_titles.update(['Backend Developer', 'Database Developer'])
-        if 'PostgreSQL' in skills['all_skills'] or 'MySQL' in skills['all_skills']:
-            job_titles.update(['Backend Developer', 'Database Developer', 'Database Engineer'])
-    
-    # General Software Engineering (if no specific match)
-    if not job_titles:
-        job_titles.update([
-            'Software Developer', 'Software Engineer', 'Application Developer',
-            'Programmer', 'Software Development Engineer'
-        ])
-    
-    # Add experience prefix for senior positions
-    if years >= 5:
-        senior_titles = set()
-        for title in list(job_titles)[:10]:  # Add Senior to top 10
-            if not title.startswith('Senior'):
-                senior_titles.add(f'Senior {title}')
-        job_titles.update(senior_titles)
-    
-    # Convert to list and limit
-    search_keywords['job_titles'] = list(job_titles)[:20]  # Limit to 20 titles
+    ranked = get_taxonomy().title_rules.rank(skills, years, limit=20)
+    search_keywords['job_titles'] = [title for title, _ in ranked]
+    search_keywords['job_title_scores'] = dict(ranked)
     
     # Technologies for search
     search_keywords['technologies'] = skills['all_skills'][:15]
     
-    return search_keywords
\ No newline at end of file
+    return search_keywords
+
+# ============================================================
+# PIPELINE ENTRY POINTS (used by worker pools)
+# ============================================================
+
+def init_worker():
+    """
+    Preload models in a freshly started pool worker
+    
+    Forked workers inherit a model already loaded by the parent
+    (copy-on-write), in which case this is a no-op for spaCy.
+    """
+    load_nlp_model()
+    get_taxonomy()
+
+def process_resume(pdf_content: bytes) -> Dict:
+    """
+    Full pipeline for one PDF: extraction + search keywords
+    
+    Returns:
+        Dictionary shaped like the /api/extract-resume response
+    """
+    staged = process_resume_staged(pdf_content)
+    if 'needs_ocr' in staged:
+        staged = ocr_resume_staged(pdf_content, staged['pages'], staged['needs_ocr'])
+    return staged['data']
+
+def read_resume(pdf_content: bytes) -> Dict:
+    """
+    First half of process_resume_staged: the page texts and their MinHash
+    signature, so a near-duplicate can be recognized before any stage runs
+    
+    Returns:
+        {'pages', 'signature'}, or {'pages', 'needs_ocr': [page indexes]}
+        when scanned pages must go through ocr_resume_staged first
+    """
+    scanned = [] if ocr_available() else None
+    pages = read_pdf_pages(pdf_content, [TEXT_REQUIREMENTS[field] for field in EXTRACTORS], scanned=scanned)
+    if scanned:
+        # Left to the OCR pool: {'pages', 'needs_ocr'} instead of a result
+        return {'pages': pages, 'needs_ocr': scanned}
+    return {'pages': pages, 'signature': text_signature(join_pages(pages)[:MAX_TEXT_CHARS])}
+
+def process_resume_staged(pdf_content: bytes, duplicates: Optional[DuplicateCheck] = None) -> Dict:
+    """
+    Full pipeline for one PDF, also returning the artifacts needed to re-run
+    later stages without the PDF
+    
+    Args:
+        duplicates: near-duplicate lookup, done as soon as the text is read
+    
+    Returns:
+        {'data': response dict, 'artifacts': {...}, 'recomputed': [stages]},
+        plus 'near_duplicate' when a stored resume is similar; only
+        {'near_duplicate', 'signature'} when it is similar enough to reuse;
+        or {'pages', 'needs_ocr': [page indexes]} when scanned pages must go
+        through ocr_resume_staged first
+    """
+    read = read_resume(pdf_content)
+    if 'needs_ocr' in read:
+        return read
+    return stages_unless_duplicate(read['pages'], read['signature'], duplicates)
+
+def apply_ocr(pdf_content: bytes, pages: List[str], scanned: List[int]) -> List[str]:
+    """Page texts with each scanned page replaced by its OCR text (when that found more)"""
+    pages = list(pages)
+    for number, text in ocr_pages(pdf_content, scanned).items():
+        if len(text.strip()) > len(pages[number].strip()):
+            pages[number] = text
+    return pages
+
+def ocr_resume_staged(pdf_content: bytes, pages: List[str], scanned: List[int],
+                      duplicates: Optional[DuplicateCheck] = None) -> Dict:
+    """
+    process_resume_staged for a document with scanned pages: OCR them, then
+    run the pipeline over text layer and OCR text together
+    """
+    pages = apply_ocr(pdf_content, pages, scanned)
+    if not any(page.strip() for page in pages):
+        raise Exception("PDF extraction failed: no text found, even with OCR")
+    return stages_unless_duplicate(pages, text_signature(join_pages(pages)[:MAX_TEXT_CHARS]), duplicates)
+
+def stages_unless_duplicate(pages: List[str], signature, duplicates: Optional[DuplicateCheck]) -> Dict:
+    """run_stages, skipped when duplicates finds a stored resume close enough to reuse"""
+    near = duplicates.match(signature) if duplicates is not None else None
+    if duplicates is not None and duplicates.reusable(near):
+        return {'near_duplicate': near, 'signature': signature}
+    staged = run_stages(pages, signature=signature)
+    if near:
+        staged['near_duplicate'] = near
+    return staged
+
+# ============================================================
+# STAGED RE-EXTRACTION
+# ============================================================
+
+# Stages each stage reads. Extractors also segment sub-documents themselves
+# (contact info reads page one only), so a segmentation version bump re-runs
+# them even if the whole-document sections come out the same.
+STAGE_INPUTS = {
+    'sections': ('text',),
+    **{field: ('text', 'sections') for field in EXTRACTORS},
+    'raw_text': ('text',),
+    'search_keywords': ('skills', 'experience', 'job_preferences'),
+}
+
+# Response key holding each extractor's output
+RESPONSE_KEYS = {**{field: field for field in EXTRACTORS}, 'raw_text': 'raw_text_preview'}
+
+def stale_stages(artifacts: Optional[Dict]) -> List[str]:
+    """Stages whose stored version differs from the current one (all of them without artifacts)"""
+    stored = (artifacts or {}).get('versions', {})
+    return [stage for stage, version in stage_versions().items() if stored.get(stage) != version]
+
+def run_stages(pages: List[str], previous: Optional[Dict] = None, signature=None) -> Dict:
+    """
+    Run the pipeline over page texts, reusing a previous run's outputs
+    
+    Args:
+        pages: page texts (stage 'text')
+        previous: {'data', 'artifacts'} of an earlier run of the same file. A
+                  stage is re-run only if its version changed or one of its
+                  inputs was re-run with a different result.
+        signature: the text's MinHash signature when already computed
+    
+    Returns:
+        {'data': response dict, 'artifacts': {...}, 'recomputed': [stages]}
+    """
+    versions = stage_versions()
+    old_artifacts = (previous or {}).get('artifacts') or {}
+    old_versions = old_artifacts.get('versions', {})
+    old_data = (previous or {}).get('data') or {}
+    if pages == old_artifacts.get('pages') and not any(isinstance(page, PageText) for page in pages):
+        # Stored page texts: reattach the headings stored with them
+        pages = pages_from_json(pages, old_artifacts.get('headings'))
+    
+    fresh_document = pages_document(pages)
+    text = fresh_document.text
+    if len(text.strip()) < 100:
+        raise Exception("Resume text too short")
+    
+    changed = set()
+    recomputed = []
+    if pages != old_artifacts.get('pages'):
+        changed.add('text')
+    
+    def needs_run(stage: str, has_output: bool) -> bool:
+        return (not has_output or old_versions.get(stage) != versions[stage]
+                or any(source in changed for source in STAGE_INPUTS[stage]))
+    
+    # Segmentation
+    sections = old_artifacts.get('sections')
+    if needs_run('sections', sections is not None):
+        document = fresh_document
+        fresh = sections_to_json(document.sections)
+        recomputed.append('sections')
+        if fresh != sections or old_versions.get('sections') != versions['sections']:
+            changed.add('sections')
+        sections = fresh
+    else:
+        document = ResumeDocument(text, sections_from_json(sections), fresh_document.headings)
+    
+    # Extractors, each on the text it declared
+    resume_data = {}
+    for field in EXTRACTORS:
+        key = RESPONSE_KEYS[field]
+        if needs_run(field, key in old_data):
+            max_pages, _ = TEXT_REQUIREMENTS[field]
+            source = document if max_pages is None else pages_document(pages[:max_pages])
+            resume_data[field] = EXTRACTORS[field](source)
+            recomputed.append(field)
+            if resume_data[field] != old_data.get(key):
+                changed.add(field)
+        else:
+            resume_data[field] = old_data[key]
+    
+    if needs_run('search_keywords', 'search_keywords' in old_data):
+        search_keywords = generate_search_keywords(resume_data)
+        recomputed.append('search_keywords')
+    else:
+        search_keywords = old_data['search_keywords']
+    
+    data = {RESPONSE_KEYS[field]: resume_data[field] for field in EXTRACTORS if field != 'raw_text'}
+    data['search_keywords'] = search_keywords
+    data['raw_text_preview'] = resume_data['raw_text']
+    artifacts = {'versions': versions, 'pages': pages, 'sections': sections}
+    headings = headings_to_json(pages)
+    if headings is not None:
+        artifacts['headings'] = headings
+    minhash = old_artifacts.get('minhash')
+    if signature is not None:
+        minhash = signature_to_json(signature)
+    elif 'text' in changed or signature_from_json(minhash) is None:
+        minhash = signature_to_json(text_signature(text))
+    artifacts['minhash'] = minhash
+    return {
+        'data': data,
+        'artifacts': artifacts,
+        'recomputed': recomputed,
+    }
@@ -0,0 +1,108 @@
+"""
+Fast response and storage serialization
+One JSON encode per result (orjson when installed), reused for the HTTP body,
+the result cache and the result store; responses negotiated per request as
+JSON or MessagePack (msgpack, optional) and compressed with brotli (optional)
+or gzip when the client accepts it
+"""
+import asyncio
+import gzip
+import json
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:  # Standard library fallback, same output minus the speed
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_TYPE = "application/json"
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Bodies smaller than this are sent uncompressed: not worth the CPU or header
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 5
+
+# Bodies at least this large are compressed in a worker thread, so a big
+# batch or search result does not stall the event loop for milliseconds
+THREAD_COMPRESS_SIZE = 64 * 1024
+
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data):
+    """JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_with(obj: Dict, key: str, encoded: bytes) -> bytes:
+    """dumps({**obj, key: value}) for a value already encoded as JSON, spliced in without re-encoding it"""
+    head = dumps(obj)
+    separator = b',' if len(head) > 2 else b''
+    return head[:-1] + separator + dumps(key) + b':' + encoded + b'}'
+
+
+def _accepts(header: str, token: str) -> bool:
+    """Whether an Accept / Accept-Encoding header lists token without q=0"""
+    for part in header.lower().split(','):
+        name, _, params = part.strip().partition(';')
+        if name.strip() == token:
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+async def encode_response(request: Request, data, body: Optional[bytes] = None,
+                          status_code: int = 200, headers: Optional[Dict] = None) -> Response:
+    """
+    Response for already-validated data, skipping response_model re-validation.
+
+    body: data's JSON encoding when the caller already has it (cached or
+    about to be stored), so it is not encoded a second time.
+    """
+    accept = request.headers.get('accept', '')
+    if msgpack is not None and any(_accepts(accept, t) for t in MSGPACK_TYPES):
+        content, media_type = msgpack.packb(data, use_bin_type=True), MSGPACK_TYPES[0]
+    else:
+        content, media_type = body if body is not None else dumps(data), JSON_TYPE
+
+    headers = dict(headers or {})
+    headers['Vary'] = 'Accept, Accept-Encoding'
+    if len(content) >= MIN_COMPRESS_SIZE:
+        encodings = request.headers.get('accept-encoding', '')
+        encoding = None
+        if brotli is not None and _accepts(encodings, 'br'):
+            encoding = 'br'
+        elif _accepts(encodings, 'gzip'):
+            encoding = 'gzip'
+        if encoding:
+            if len(content) >= THREAD_COMPRESS_SIZE:
+                content = await asyncio.to_thread(compress, content, encoding)
+            else:
+                content = compress(content, encoding)
+            headers['Content-Encoding'] = encoding
+    return Response(content, status_code=status_code, media_type=media_type, headers=headers)
@@ -0,0 +1,180 @@
+"""
+Vectorized skill-set similarity
+Resumes and job postings reduced to skill-id sets are scored as sparse
+matrices in batched NumPy operations: weighted overlap, Jaccard or TF-IDF
+cosine for one resume against N jobs or M resumes against N jobs in one call
+"""
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+METHODS = ('overlap', 'weighted', 'jaccard', 'cosine')
+
+# Upper bound on the M x N score block built per batch of queries
+CHUNK_BYTES = 64 * 1024 * 1024
+
+
+class SkillMatrix:
+    """
+    Binary rows x skills matrix, kept both row-wise (CSR: each row's skill
+    ids) and column-wise (CSC: each skill's rows, i.e. postings lists)
+    """
+
+    def __init__(self, indptr, indices, n_cols: int, col_indptr=None, col_rows=None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.n_cols = n_cols
+        if col_indptr is None:
+            # A stable sort keeps each column's rows ascending
+            order = np.argsort(self.indices, kind='stable')
+            col_rows = self.row_of_entry()[order]
+            col_indptr = np.concatenate(([0], np.cumsum(np.bincount(self.indices, minlength=n_cols))))
+        self.col_indptr = np.asarray(col_indptr, dtype=np.int64)
+        self.col_rows = np.asarray(col_rows, dtype=np.int64)
+        self._norms: Tuple[Optional[np.ndarray], Optional[np.ndarray]] = (None, None)
+
+    @classmethod
+    def from_sets(cls, rows: Iterable[Iterable[int]], n_cols: int) -> 'SkillMatrix':
+        indptr = [0]
+        indices = []
+        for row in rows:
+            indices.extend(sorted(set(row)))
+            indptr.append(len(indices))
+        return cls(indptr, indices, n_cols)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def row_lengths(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def row_of_entry(self) -> np.ndarray:
+        return np.repeat(np.arange(self.n_rows), self.row_lengths())
+
+    def row_sums(self, column_values: np.ndarray) -> np.ndarray:
+        """Per row, the sum of column_values over the row's skills"""
+        return np.bincount(self.row_of_entry(), weights=column_values[self.indices], minlength=self.n_rows)
+
+    def norms(self, idf: np.ndarray) -> np.ndarray:
+        """TF-IDF vector length of every row (cached for the last idf used)"""
+        if self._norms[0] is not idf:
+            self._norms = (idf, np.sqrt(self.row_sums(idf ** 2)))
+        return self._norms[1]
+
+    def rows(self, start: int, end: int) -> 'SkillMatrix':
+        lo, hi = self.indptr[start], self.indptr[end]
+        return SkillMatrix(self.indptr[start:end + 1] - lo, self.indices[lo:hi], self.n_cols)
+
+
+def smoothed_idf(n_rows: int, df: np.ndarray) -> np.ndarray:
+    """log((n + 1) / (df + 1)) + 1 for each column's document frequency df"""
+    return np.log((n_rows + 1) / (np.asarray(df) + 1)) + 1
+
+
+def idf_weights(jobs: SkillMatrix) -> np.ndarray:
+    """Smoothed inverse document frequency of every skill column"""
+    return smoothed_idf(jobs.n_rows, np.diff(jobs.col_indptr))
+
+
+def shared_weight(queries: SkillMatrix, jobs: SkillMatrix,
+                  column_weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    M x N sum of column_weights (1 when None) over the skills each query row
+    shares with each job row. This is Q @ J.T computed as one bincount over
+    the postings of every query skill, so the cost follows the postings
+    touched rather than M x N x skills.
+    """
+    m, n = queries.n_rows, jobs.n_rows
+    terms = queries.indices
+    starts = jobs.col_indptr[terms]
+    counts = jobs.col_indptr[terms + 1] - starts
+    total = int(counts.sum())
+    if not total:
+        return np.zeros((m, n))
+
+    # Concatenated postings of every query skill, gathered without a Python loop
+    shifts = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+    docs = jobs.col_rows[shifts + np.arange(total)]
+    owners = np.repeat(queries.row_of_entry(), counts)
+    weights = None if column_weights is None else np.repeat(column_weights[terms], counts)
+    shared = np.bincount(owners * n + docs, weights=weights, minlength=m * n)
+    return shared.reshape(m, n).astype(np.float64, copy=False)
+
+
+def similarity(queries: SkillMatrix, jobs: SkillMatrix, method: str = 'weighted',
+               idf: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    M x N similarity of every query row against every job row
+
+    overlap:  shared skill count
+    weighted: sum of idf over shared skills
+    jaccard:  shared / (|query| + |job| - shared)
+    cosine:   TF-IDF cosine with binary term frequencies
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown similarity method: {method}")
+    if idf is None and method in ('weighted', 'cosine'):
+        idf = idf_weights(jobs)
+
+    if method == 'overlap':
+        return shared_weight(queries, jobs)
+    if method == 'weighted':
+        return shared_weight(queries, jobs, idf)
+    if method == 'jaccard':
+        shared = shared_weight(queries, jobs)
+        union = queries.row_lengths()[:, None] + jobs.row_lengths()[None, :] - shared
+        return np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+
+    shared = shared_weight(queries, jobs, idf ** 2)
+    norms = queries.norms(idf)[:, None] * jobs.norms(idf)[None, :]
+    return np.divide(shared, norms, out=np.zeros_like(shared), where=norms > 0)
+
+
+def top_matches(queries: SkillMatrix, jobs: SkillMatrix, k: int = 20, method: str = 'weighted',
+                idf: Optional[np.ndarray] = None, exclude: Optional[np.ndarray] = None,
+                tiebreak: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Best k jobs per query row, scoring queries in batches whose M x N score
+    block stays under CHUNK_BYTES
+
+    exclude: optional boolean mask of job rows never to return
+    tiebreak: optional per-job key; among equal scores lower keys rank first,
+    then newer (higher) rows
+
+    Returns (job rows, scores), each M x k and best first; query rows with
+    fewer than k positive scores are padded with -1 / 0.
+    """
+    if idf is None and method in ('weighted', 'cosine'):
+        idf = idf_weights(jobs)
+    n = jobs.n_rows
+    k = max(1, min(k, n)) if n else 1
+    ids = np.full((queries.n_rows, k), -1, dtype=np.int64)
+    best = np.zeros((queries.n_rows, k))
+    if not n:
+        return ids, best
+    tiebreak = np.zeros(n) if tiebreak is None else tiebreak
+
+    step = max(1, CHUNK_BYTES // (8 * n))
+    for start in range(0, queries.n_rows, step):
+        end = min(queries.n_rows, start + step)
+        scores = similarity(queries.rows(start, end), jobs, method, idf)
+        if exclude is not None:
+            scores[:, exclude] = 0.0
+        # Keep everything tied with the k-th best score so tie-breaks are exact
+        kth = np.partition(scores, n - k, axis=1)[:, n - k] - 1e-9
+        for row in range(end - start):
+            candidates = np.flatnonzero(scores[row] >= np.maximum(kth[row], 1e-9))
+            rounded = np.round(scores[row, candidates], 9)
+            order = candidates[np.lexsort((-candidates, tiebreak[candidates], -rounded))][:k]
+            ids[start + row, :len(order)] = order
+            best[start + row, :len(order)] = scores[row, order]
+    return ids, best
+
+
+def query_matrix(skill_lists: Sequence[Iterable[str]], vocabulary: Dict[str, int]) -> SkillMatrix:
+    """Resume skill lists -> query rows over a job index's skill vocabulary (unknown skills dropped)"""
+    return SkillMatrix.from_sets(
+        ([vocabulary[s] for s in skills if s in vocabulary] for skills in skill_lists),
+        len(vocabulary)
+    )
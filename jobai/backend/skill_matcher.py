@@ -0,0 +1,309 @@
+"""
+Single-pass skill matcher
+Compiles a skills taxonomy into one trie-shaped regex that scans the text once,
+then, when asked to (fuzzy=True), catches what exact matching misses
+("Tensorflow2", "node-js", "Kubernetis") in one pass over the remaining
+tokens: hashed lookups of normalized tokens and token runs, plus bounded edit
+distance through a SymSpell-style deletion index. Both passes cost time
+linear in the text, whatever the taxonomy size.
+
+Edit-distance matches are typo guesses: ordinary words sit a letter away
+from skill names ("clutter", "postmen"), so categorize reports them apart
+from the detected skills, and job postings are matched exactly.
+"""
+import logging
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from patterns import register
+
+logger = logging.getLogger(__name__)
+
+
+class SkillMatch(NamedTuple):
+    """One skill occurrence in the scanned text (confidence 1.0 for exact matches)"""
+    skill: str
+    categories: Tuple[str, ...]
+    start: int
+    end: int
+    confidence: float = 1.0
+    typo: bool = False  # Found by edit distance
+
+
+_WORD_CHAR = re.compile(r'\w')
+
+# Confidence of token-level matches; edit-distance matches score
+# 1 - distance / length and are kept from MIN_FUZZY_CONFIDENCE up, which
+# allows one edit from 8 characters and two from 16 (at 7, plain words
+# such as "puppets" and "dockers" pass for skills)
+NORMALIZED_CONFIDENCE = 0.95   # Same term, other spacing or punctuation ("node-js")
+VERSION_CONFIDENCE = 0.9       # Term plus a version number ("Tensorflow2")
+MIN_FUZZY_CONFIDENCE = 0.875
+MAX_EDIT_DISTANCE = 2
+MAX_FUZZY_TOKEN = 30           # Longer tokens are not typos of a skill
+TOKEN_CACHE_SIZE = 50000       # Token lookups remembered across texts (resumes share most words)
+
+_TOKEN = re.compile(r'[A-Za-z0-9][A-Za-z0-9+#]*')
+_TOKEN_GAP = re.compile(r'[ \t./-]{1,2}')  # Joins the tokens of one term
+_VERSION_SUFFIX = re.compile(r'^(.{3,}?)v?\d+$')
+_NON_KEY = re.compile(r'[^a-z0-9+#]')
+
+
+def normalize_term(term: str) -> str:
+    """Lookup key of a term: lowercase letters, digits, + and # only"""
+    return _NON_KEY.sub('', term.lower())
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """word and every string made by deleting up to distance characters from it"""
+    results = frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        results = results | frontier
+    return results
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent swaps count once), or limit + 1 once above limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def _allowed_distance(length: int) -> int:
+    return min(MAX_EDIT_DISTANCE, int(length * (1 - MIN_FUZZY_CONFIDENCE) + 1e-9))
+
+
+def _build_trie(terms: Iterable[str]) -> Dict:
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[''] = True
+    return trie
+
+
+def _trie_to_pattern(node: Dict) -> str:
+    """Turn a character trie into a regex that prefers the longest branch"""
+    branches = [re.escape(ch) + _trie_to_pattern(child)
+                for ch, child in sorted(node.items()) if ch != '']
+    if not branches:
+        return ''
+
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        # Shorter term ends here: try the longer branches first, then stop
+        if len(branches) == 1 and len(body) > 1:
+            body = '(?:' + body + ')'
+        body += '?'
+    return body
+
+
+class SkillMatcher:
+    """
+    Matches every skill of a taxonomy in one scan of the text.
+
+    Skills match case-insensitively on word boundaries, where a boundary is
+    any non-word character. This lets tokens such as "C++", "C#", "CI/CD"
+    and "Node.js" match even when followed by punctuation or whitespace.
+    Aliases ("k8s", "ReactJS") are reported under their canonical skill.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]],
+                 aliases: Optional[Dict[str, Iterable[str]]] = None,
+                 name: str = 'skills.taxonomy'):
+        self.categories: Dict[str, List[str]] = {
+            category: list(skills) for category, skills in categories.items()
+        }
+
+        # Canonical skill -> categories, in taxonomy order
+        self.skill_categories: Dict[str, Tuple[str, ...]] = {}
+        for category, skills in self.categories.items():
+            for skill in skills:
+                existing = self.skill_categories.get(skill, ())
+                if category not in existing:
+                    self.skill_categories[skill] = existing + (category,)
+
+        # Taxonomy order, so output order never depends on set iteration
+        self._rank: Dict[str, Dict[str, int]] = {
+            category: {skill: i for i, skill in enumerate(skills)}
+            for category, skills in self.categories.items()
+        }
+        self._global_rank: Dict[str, int] = {
+            skill: i for i, skill in enumerate(self.skill_categories)
+        }
+
+        # Lowercased surface form -> canonical skill
+        self.surface_forms: Dict[str, str] = {
+            skill.lower(): skill for skill in self.skill_categories
+        }
+        for skill, skill_aliases in (aliases or {}).items():
+            if skill not in self.skill_categories:
+                logger.warning(f"Aliases given for unknown skill: {skill}")
+                continue
+            for alias in skill_aliases:
+                existing = self.surface_forms.setdefault(alias.lower(), skill)
+                if existing != skill:
+                    logger.warning(f"Alias '{alias}' of {skill} already maps to {existing}")
+
+        # A shorter term that is a prefix of a longer one, followed by a
+        # non-word character, matches wherever the longer one matches.
+        self._implied: Dict[str, List[str]] = {}
+        for term in self.surface_forms:
+            self._implied[term] = [
+                term[:i] for i in range(1, len(term))
+                if term[:i] in self.surface_forms and not _WORD_CHAR.match(term[i])
+            ]
+
+        # Normalized key -> canonical skill, and the longest term in tokens
+        self.keys: Dict[str, str] = {}
+        self._max_tokens = 1
+        for surface, skill in self.surface_forms.items():
+            key = normalize_term(surface)
+            if key and self.keys.setdefault(key, skill) != skill:
+                logger.warning(f"'{surface}' of {skill} normalizes like a term of {self.keys[key]}")
+            self._max_tokens = max(self._max_tokens, len(_TOKEN.findall(surface)))
+        # Where joining the next token can still lead to a key
+        self._key_prefixes = {key[:i] for key in self.keys for i in range(1, len(key))}
+        self._token_cache: Dict[str, Optional[Tuple[str, float, bool]]] = {}
+
+        # Deletion index: every key with up to MAX_EDIT_DISTANCE characters
+        # deleted -> keys. A token's own deletions meet its close keys here.
+        self._deletions: Dict[str, List[str]] = {}
+        for key in self.keys:
+            if _allowed_distance(len(key) + MAX_EDIT_DISTANCE):
+                for variant in _deletes(key, MAX_EDIT_DISTANCE):
+                    self._deletions.setdefault(variant, []).append(key)
+
+        trie_pattern = _trie_to_pattern(_build_trie(self.surface_forms))
+        # Zero-width lookahead so that overlapping skills at different
+        # offsets are all reported ("Google Cloud" and "Cloud").
+        self._pattern = register(
+            name,
+            r'(?<!\w)(?=(' + trie_pattern + r')(?!\w))',
+            re.IGNORECASE
+        ) if self.surface_forms else None
+
+    def find_all(self, text: str, fuzzy: bool = False) -> List[SkillMatch]:
+        """
+        Return every skill occurrence in text, ordered by offset: exact
+        matches, plus with fuzzy token-level matches where no exact one was found
+        """
+        if self._pattern is None:
+            return []
+
+        matches = []
+        for match in self._pattern.finditer(text):
+            start, end = match.span(1)
+            term = match.group(1).lower()
+            for hit in [term] + self._implied[term]:
+                skill = self.surface_forms[hit]
+                matches.append(SkillMatch(
+                    skill, self.skill_categories[skill], start, start + len(hit)
+                ))
+        if fuzzy:
+            matches.extend(self._find_tokens(text, matches))
+        matches.sort(key=lambda m: (m.start, m.end))
+        return matches
+
+    def _find_tokens(self, text: str, exact: List[SkillMatch]) -> List[SkillMatch]:
+        """Token-level matches where exact matching found nothing"""
+        covered = bytearray(len(text) + 1)
+        for match in exact:
+            covered[match.start:match.end] = b'\x01' * (match.end - match.start)
+
+        tokens = [(m.start(), m.end(), m.group().lower()) for m in _TOKEN.finditer(text)]
+        matches = []
+        i = 0
+        while i < len(tokens):
+            start, end, token = tokens[i]
+            hit, n = None, 1
+
+            # Longest run of adjacent tokens joining into a term ("node-js", "Java Script")
+            key, j = token, i + 1
+            while (key in self._key_prefixes and j < len(tokens) and j - i < self._max_tokens
+                   and _TOKEN_GAP.fullmatch(text, tokens[j - 1][1], tokens[j][0])):
+                key += tokens[j][2]
+                j += 1
+                if len(key) >= 4 and key in self.keys:
+                    hit, n = (self.keys[key], NORMALIZED_CONFIDENCE, False), j - i
+            if hit is not None:
+                end = tokens[i + n - 1][1]
+                if all(covered[start:end]):
+                    hit = None
+            elif not covered[start]:
+                if token in self.keys:
+                    hit = self.keys[token], NORMALIZED_CONFIDENCE, False
+                else:
+                    if token not in self._token_cache:
+                        if len(self._token_cache) >= TOKEN_CACHE_SIZE:
+                            self._token_cache.clear()
+                        self._token_cache[token] = self._lookup_token(token)
+                    hit = self._token_cache[token]
+
+            if hit is not None:
+                skill, confidence, typo = hit
+                matches.append(SkillMatch(skill, self.skill_categories[skill], start, end, confidence, typo))
+            i += n
+        return matches
+
+    def _lookup_token(self, token: str) -> Optional[Tuple[str, float, bool]]:
+        """(skill, confidence, typo) of one token with a version suffix or a typo, or None"""
+        version = _VERSION_SUFFIX.match(token)
+        if version and version.group(1) in self.keys:
+            return self.keys[version.group(1)], VERSION_CONFIDENCE, False
+
+        distance = _allowed_distance(len(token))
+        if not distance or len(token) > MAX_FUZZY_TOKEN or not token.isalpha():
+            return None
+        best = None
+        for variant in _deletes(token, distance):
+            for key in self._deletions.get(variant, ()):
+                found = edit_distance(token, key, distance)
+                if found > distance:
+                    continue
+                confidence = round(1 - found / max(len(token), len(key)), 4)
+                candidate = (-confidence, self._global_rank[self.keys[key]], key)
+                if confidence >= MIN_FUZZY_CONFIDENCE and (best is None or candidate < best):
+                    best = candidate
+        return (self.keys[best[2]], -best[0], True) if best else None
+
+    def categorize(self, text: str) -> Dict:
+        """
+        Group detected skills by category, plus a deduplicated all_skills list
+        and skill_confidence (each skill's best match confidence). Typo
+        matches only ever appear under possible_skills (skill -> confidence),
+        never as detected skills.
+        """
+        found: Dict[str, float] = {}
+        possible: Dict[str, float] = {}
+        for match in self.find_all(text, fuzzy=True):
+            if match.typo:
+                possible[match.skill] = max(possible.get(match.skill, 0.0), match.confidence)
+            else:
+                found[match.skill] = max(found.get(match.skill, 0.0), match.confidence)
+
+        detected: Dict = {category: [] for category in self.categories}
+        for skill in found:
+            for category in self.skill_categories[skill]:
+                detected[category].append(skill)
+        for category in self.categories:
+            detected[category].sort(key=self._rank[category].__getitem__)
+        detected['all_skills'] = sorted(found, key=self._global_rank.__getitem__)
+        detected['skill_confidence'] = {skill: found[skill] for skill in detected['all_skills']}
+        detected['possible_skills'] = {
+            skill: possible[skill]
+            for skill in sorted(possible, key=self._global_rank.__getitem__) if skill not in found
+        }
+        return detected
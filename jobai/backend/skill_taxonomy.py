@@ -0,0 +1,86 @@
+"""
+Skill taxonomy loading
+Loads skills, aliases and job-title rules from a JSON file, compiles them
+into an in-memory index and reloads them when the file changes
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from skill_matcher import SkillMatcher
+from title_rules import TitleRules
+
+logger = logging.getLogger(__name__)
+
+TAXONOMY_PATH = os.getenv(
+    "SKILL_TAXONOMY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json")
+)
+
+# Seconds between file change checks
+RELOAD_CHECK_INTERVAL = float(os.getenv("SKILL_TAXONOMY_RELOAD_INTERVAL", "2"))
+
+
+class SkillTaxonomy:
+    """Compiled taxonomy: skill matcher plus indexed title rules"""
+
+    def __init__(self, data: Dict, version: str):
+        self.version = version
+        self.categories: Dict[str, List[str]] = data['categories']
+        self.matcher = SkillMatcher(self.categories, data.get('aliases', {}))
+
+        # Skill -> weighted title ids, so rule evaluation costs one lookup per detected skill
+        self.title_rules = TitleRules(data.get('title_rules', {}), self.matcher.skill_categories)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'SkillTaxonomy':
+        with open(path, 'rb') as f:
+            raw = f.read()
+        version = hashlib.sha256(raw).hexdigest()[:12]
+        return cls(json.loads(raw), version)
+
+
+_taxonomy: Optional[SkillTaxonomy] = None
+_taxonomy_mtime: float = 0.0
+_last_check: float = 0.0
+_lock = threading.Lock()
+
+
+def load_taxonomy(path: Optional[str] = None) -> SkillTaxonomy:
+    """(Re)load the taxonomy file and make it the active one"""
+    global _taxonomy, _taxonomy_mtime
+    path = path or TAXONOMY_PATH
+    mtime = os.path.getmtime(path)
+    taxonomy = SkillTaxonomy.from_file(path)
+    with _lock:
+        _taxonomy, _taxonomy_mtime = taxonomy, mtime
+    logger.info(f"✅ Skill taxonomy loaded: {len(taxonomy.matcher.skill_categories)} skills "
+                f"(version {taxonomy.version})")
+    return taxonomy
+
+
+def get_taxonomy() -> SkillTaxonomy:
+    """Return the active taxonomy, reloading it if the file has changed"""
+    global _last_check, _taxonomy_mtime
+    if _taxonomy is None:
+        return load_taxonomy()
+
+    now = time.monotonic()
+    if now - _last_check < RELOAD_CHECK_INTERVAL:
+        return _taxonomy
+    _last_check = now
+
+    mtime = _taxonomy_mtime
+    try:
+        mtime = os.path.getmtime(TAXONOMY_PATH)
+        if mtime != _taxonomy_mtime:
+            return load_taxonomy()
+    except Exception as e:
+        # Keep serving the last good taxonomy until the file changes again
+        logger.error(f"❌ Skill taxonomy reload failed: {e}")
+        _taxonomy_mtime = mtime
+    return _taxonomy
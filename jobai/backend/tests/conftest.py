@@ -0,0 +1,59 @@
+"""
+Shared test setup: the backend modules are flat, so tests import them from
+the parent directory. Servers under test run their extraction pools in
+threads and keep no result store; anything else they write goes to a
+temporary directory.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("RESULT_STORE", "none")
+os.environ.setdefault("EXTRACTION_POOL_MODE", "thread")
+os.environ.setdefault("OCR_POOL_MODE", "thread")
+TEST_DIR = tempfile.mkdtemp(prefix="jobai-tests-")
+atexit.register(shutil.rmtree, TEST_DIR, True)
+os.environ.setdefault("JOB_INDEX_PATH", os.path.join(TEST_DIR, "jobs.ndjson.gz"))
+
+import fitz
+import pytest
+
+RESUME_TEXT = """Jane Doe
+jane.doe@example.com | +1 555 010 0199 | Pune, India
+
+SKILLS
+Python, Django, PostgreSQL, Docker, AWS
+
+EXPERIENCE
+Backend Developer, Acme Corp (2019 - 2023)
+Built REST APIs in Django and deployed them on AWS with Docker.
+
+EDUCATION
+B.Tech in Computer Science, 2019, CGPA 8.5
+"""
+
+
+def make_pdf(text: str = RESUME_TEXT) -> bytes:
+    """One-page PDF with text as its text layer"""
+    document = fitz.open()
+    page = document.new_page()
+    page.insert_text((50, 60), text, fontsize=9)
+    content = document.tobytes()
+    document.close()
+    return content
+
+
+@pytest.fixture(scope="module")
+def client():
+    """TestClient of the API app, started and shut down once per test module"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
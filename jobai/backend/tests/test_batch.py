@@ -0,0 +1,57 @@
+import io
+import json
+import zipfile
+
+import main
+from conftest import RESUME_TEXT, make_pdf
+
+
+def post_batch(client, files):
+    response = client.post("/api/extract-resumes/batch", files=[("resumes", f) for f in files])
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return lines[:-1], lines[-1]['summary']
+
+
+def zipped(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in entries.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def test_batch_reads_pdfs_and_zip_entries(client):
+    archive = zipped({
+        "a.pdf": make_pdf(RESUME_TEXT + "\nFirst archived resume"),
+        "b.pdf": make_pdf(RESUME_TEXT + "\nSecond archived resume"),
+        "notes.txt": b"skipped",
+    })
+    records, summary = post_batch(client, [
+        ("one.pdf", make_pdf(), "application/pdf"),
+        ("bundle.zip", archive, "application/zip"),
+        ("fake.pdf", b"not a pdf", "application/pdf"),
+    ])
+    by_name = {record['filename']: record for record in records}
+    assert set(by_name) == {"one.pdf", "bundle.zip/a.pdf", "bundle.zip/b.pdf", "fake.pdf"}
+    for name in ("one.pdf", "bundle.zip/a.pdf", "bundle.zip/b.pdf"):
+        assert by_name[name]['status'] == 'ok'
+        assert "Python" in by_name[name]['data']['skills']['all_skills']
+    assert by_name["fake.pdf"]['status'] == 'error'
+    assert "not a valid PDF" in by_name["fake.pdf"]['error']
+
+
+def test_batch_waits_for_slots_instead_of_failing(client, monkeypatch):
+    monkeypatch.setattr(main, "BATCH_CONCURRENCY", 2)
+    files = [(f"r{i}.pdf", make_pdf(RESUME_TEXT + f"\nBatch resume number {i}"), "application/pdf")
+             for i in range(12)]
+    records, _ = post_batch(client, files)
+    assert len(records) == 12
+    assert all(record['status'] == 'ok' for record in records)
+    assert main.extraction_pool.stats()['pending'] == 0
+
+
+def test_invalid_zip_is_reported(client):
+    records, _ = post_batch(client, [("broken.zip", b"PK\x03\x04 truncated", "application/zip")])
+    assert records == [{'filename': "broken.zip", 'size_bytes': 0, 'status': 'error',
+                        'error': "ValueError: Invalid zip archive", 'elapsed_ms': records[0]['elapsed_ms']}]
@@ -0,0 +1,101 @@
+from candidate_store import CandidateIndex, ids_to_mask, mask_to_ids, profile_summary
+
+
+def resume(name, skills, years, level, titles, location):
+    return {
+        'contact_info': {'name': name, 'email': f"{name.lower()}@example.com", 'location': location},
+        'skills': {'all_skills': skills},
+        'experience': {'total_years': years},
+        'job_preferences': {'preferred_locations': []},
+        'search_keywords': {'experience_level': level, 'job_titles': titles, 'locations': []},
+    }
+
+
+PROFILES = {
+    'a': resume("Asha", ["Python", "Django", "AWS"], 2, "Junior", ["Backend Developer"], "Pune, Maharashtra"),
+    'b': resume("Bilal", ["Python", "React"], 5, "Mid-level", ["Full Stack Developer"], "Mumbai"),
+    'c': resume("Chen", ["Java", "AWS"], 9, "Senior", ["Backend Developer"], "Pune"),
+    'd': resume("Dana", ["Python", "AWS", "Docker"], 6, "Mid-level", ["DevOps Engineer"], "Remote"),
+}
+
+
+def build():
+    index = CandidateIndex()
+    for digest, data in PROFILES.items():
+        index.add(digest, data)
+    return index
+
+
+def names(result):
+    return [profile['name'] for profile in result['results']]
+
+
+def test_skills_are_anded_newest_first():
+    index = build()
+    assert names(index.search(skills=["python", "AWS"])) == ["Dana", "Asha"]
+    assert index.search(skills=["Python", "Kotlin"])['total'] == 0
+
+
+def test_other_filters():
+    index = build()
+    assert names(index.search(locations=["pune"])) == ["Chen", "Asha"]
+    assert names(index.search(levels=["Senior", "Junior"])) == ["Chen", "Asha"]
+    assert names(index.search(titles=["backend developer"], min_years=5)) == ["Chen"]
+    assert names(index.search(min_years=5, max_years=6)) == ["Dana", "Bilal"]
+
+
+def test_paging():
+    index = build()
+    first = index.search(limit=2)
+    second = index.search(limit=2, offset=2)
+    assert first['total'] == second['total'] == 4
+    assert names(first) + names(second) == ["Dana", "Chen", "Bilal", "Asha"]
+
+
+def test_facets_count_within_the_result():
+    index = build()
+    facets = index.search(skills=["AWS"], facets=True)['facets']
+    assert facets['skills'] == {"AWS": 3, "Python": 2, "Django": 1, "Java": 1, "Docker": 1}
+    assert facets['experience_level'] == {"Junior": 1, "Senior": 1, "Mid-level": 1}
+    assert facets['locations']["Pune"] == 2
+
+
+def test_facets_over_everything():
+    facets = build().search(facets=True, facet_size=2)['facets']
+    assert facets['skills'] == {"Python": 3, "AWS": 3}
+
+
+def test_unchanged_profile_keeps_its_id():
+    index = build()
+    masks_before = index._all_mask
+    for _ in range(100):
+        index.add('a', PROFILES['a'])
+    assert index._all_mask == masks_before
+    assert index._next_id == len(PROFILES)
+    assert names(index.search(skills=["Django"])) == ["Asha"]
+
+
+def test_changed_profile_is_reindexed():
+    index = build()
+    index.add('a', resume("Asha", ["Go"], 3, "Mid-level", ["Backend Developer"], "Pune"))
+    assert index.search(skills=["Django"])['total'] == 0
+    assert names(index.search(skills=["Go"])) == ["Asha"]
+    assert names(index.search())[0] == "Asha"
+    assert len(index) == 4
+
+
+def test_remove_and_bulk_load():
+    index = CandidateIndex()
+    records = [{'content_hash': digest, 'data': data} for digest, data in PROFILES.items()]
+    assert index.add_many(records + records[:1]) == 5
+    assert len(index) == 4
+    assert index.remove('b')
+    assert not index.remove('b')
+    assert index.search(skills=["React"])['total'] == 0
+    assert index.get('c')['name'] == "Chen"
+
+
+def test_bitmap_helpers():
+    assert mask_to_ids(ids_to_mask([1, 9, 64])) == [64, 9, 1]
+    assert mask_to_ids(ids_to_mask([1, 9, 64]), limit=2) == [64, 9]
+    assert profile_summary(PROFILES['a'])['locations'] == ["Pune", "Maharashtra"]
@@ -0,0 +1,175 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from extraction_pool import ExtractionPool, PoolSaturated, map_bounded
+
+
+def blocking(event: threading.Event, value):
+    event.wait(5)
+    return value
+
+
+def sleepy(seconds: float):
+    time.sleep(seconds)
+    return seconds
+
+
+def crash():
+    os._exit(1)
+
+
+def square(value):
+    return value * value
+
+
+@pytest.fixture
+def pool():
+    pool = ExtractionPool(mode="thread", workers=2, max_pending=2, timeout=1.0)
+    yield pool
+    pool.shutdown()
+
+
+def test_rejects_when_saturated(pool):
+    async def scenario():
+        release = threading.Event()
+        running = [asyncio.ensure_future(pool.run(blocking, release, i)) for i in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(PoolSaturated):
+            await pool.run(square, 3)
+        release.set()
+        return await asyncio.gather(*running)
+
+    assert asyncio.run(scenario()) == [0, 1]
+    assert pool.stats()['rejected'] == 1
+    assert pool.stats()['pending'] == 0
+
+
+def test_waiters_get_slots_in_order(pool):
+    async def scenario():
+        release = threading.Event()
+        running = [asyncio.ensure_future(pool.run(blocking, release, i)) for i in range(2)]
+        await asyncio.sleep(0.05)
+        waiting = [asyncio.ensure_future(pool.run(square, i, wait=True)) for i in range(5)]
+        await asyncio.sleep(0.05)
+        assert pool.stats()['waiting'] == 5
+        release.set()
+        return await asyncio.gather(*running, *waiting)
+
+    assert asyncio.run(scenario()) == [0, 1, 0, 1, 4, 9, 16]
+    assert pool.stats()['completed'] == 7
+
+
+def test_timeout_covers_the_job_not_the_wait():
+    pool = ExtractionPool(mode="thread", workers=1, max_pending=1, timeout=0.5)
+
+    async def scenario():
+        # Each job takes 0.3s, so the last one waits ~1.2s for its slot
+        return await asyncio.gather(*(pool.run(sleepy, 0.3, wait=True) for _ in range(5)))
+
+    try:
+        assert asyncio.run(scenario()) == [0.3] * 5
+        assert pool.stats()['timeouts'] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_timeout_frees_slot_when_job_finishes():
+    pool = ExtractionPool(mode="thread", workers=1, max_pending=1, timeout=0.1)
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(sleepy, 0.3)
+        # The timed-out job still runs and holds its slot
+        with pytest.raises(PoolSaturated):
+            await pool.run(square, 2)
+        return await pool.run(square, 2, wait=True)
+
+    try:
+        assert asyncio.run(scenario()) == 4
+        assert pool.stats()['timeouts'] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_restarts_after_worker_crash():
+    pool = ExtractionPool(mode="process", workers=1, max_pending=2, timeout=10, start_method="fork")
+
+    async def scenario():
+        with pytest.raises(Exception):
+            await pool.run(crash)
+        return await pool.run(square, 7)
+
+    try:
+        assert asyncio.run(scenario()) == 49
+        assert pool.stats()['pending'] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_map_bounded_limits_calls_in_flight():
+    active = peak = 0
+
+    async def work(item):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01 * (item % 3))
+        active -= 1
+        return item
+
+    drawn = []
+
+    def items():
+        for i in range(10):
+            drawn.append(i)
+            yield i
+
+    async def scenario():
+        results = []
+        async for result in map_bounded(work, items(), 3):
+            if not results:
+                # Inputs are drawn only as calls finish
+                assert len(drawn) < 10
+            results.append(result)
+        return results
+
+    assert sorted(asyncio.run(scenario())) == list(range(10))
+    assert peak == 3
+
+
+def test_map_bounded_cancels_rest_on_error():
+    cancelled = []
+
+    async def work(item):
+        if item == 0:
+            raise ValueError("bad item")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+
+    async def scenario():
+        async for _ in map_bounded(work, range(5), 3):
+            pass
+
+    with pytest.raises(ValueError):
+        asyncio.run(scenario())
+    assert sorted(cancelled) == [1, 2]
+
+
+def test_from_env_overrides_keyword_defaults(monkeypatch):
+    monkeypatch.setenv("OCR_POOL_MODE", "thread")
+    monkeypatch.setenv("OCR_WORKERS", "3")
+    monkeypatch.setenv("OCR_MAX_PENDING", "7")
+    pool = ExtractionPool.from_env("OCR", workers=1, max_pending=2, timeout=120)
+    assert (pool.workers, pool.max_pending, pool.timeout) == (3, 7, 120)
+
+    monkeypatch.delenv("OCR_WORKERS")
+    monkeypatch.delenv("OCR_MAX_PENDING")
+    pool = ExtractionPool.from_env("OCR", workers=1, max_pending=2, timeout=120)
+    assert (pool.workers, pool.max_pending) == (1, 2)
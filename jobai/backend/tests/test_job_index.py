@@ -0,0 +1,38 @@
+import pytest
+
+from job_index import JobIndex
+from similarity import METHODS
+
+
+def posting(job_id, skills, title="Engineer"):
+    return {'job_id': job_id, 'title': title, 'company': "Acme", 'location': "Pune", 'skills': skills}
+
+
+def scores(index, skills, method):
+    return {result['job_id']: result['score'] for result in index.match(skills, top_k=10, method=method)}
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_replaced_postings_do_not_count_for_idf(method):
+    live = [posting('a', ["Python"]), posting('b', ["Go", "SQL"]), posting('c', ["Python", "SQL"])]
+    replaced = JobIndex()
+    replaced.add_many([posting('b', ["Python", "Go"]), posting('c', ["Python"]), posting('b', ["Python"])])
+    replaced.add_many(live)
+    fresh = JobIndex()
+    fresh.add_many(live)
+
+    assert len(replaced) == len(fresh) == 3
+    for skill in ("Python", "SQL", "Go"):
+        assert replaced.idf(replaced._skill_ids[skill]) == pytest.approx(fresh.idf(fresh._skill_ids[skill]))
+    query = ["Python", "SQL"]
+    assert scores(replaced, query, method) == pytest.approx(scores(fresh, query, method))
+    batch, = replaced.match_many([query], top_k=10, method=method)
+    assert {result['job_id']: result['score'] for result in batch} == pytest.approx(scores(fresh, query, method))
+
+
+def test_skill_ids_past_16_bits():
+    index = JobIndex()
+    index.add(posting('wide', [f"Skill{i}" for i in range(70_000)]))
+    index.add(posting('last', ["Skill69999"]))
+    assert [result['job_id'] for result in index.match(["Skill69999"])] == ['last', 'wide']
+    assert index.job_skill_ids(1).tolist() == [69_999]
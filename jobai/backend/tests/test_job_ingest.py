@@ -0,0 +1,28 @@
+import json
+
+import main
+
+
+def postings(count):
+    return [{'job_id': f"job-{i}", 'job_title': f"Python Developer {i}",
+             'job_description': "Django and PostgreSQL on AWS" if i % 2 else "React and TypeScript"}
+            for i in range(count)]
+
+
+def test_ingest_runs_every_chunk_in_order(client, monkeypatch):
+    monkeypatch.setattr(main, "JOB_INGEST_CHUNK", 10)
+    monkeypatch.setattr(main, "BATCH_CONCURRENCY", 2)
+    before = len(main.job_index)
+    response = client.post("/api/jobs/ingest",
+                           files={"jobs": ("jobs.json", json.dumps(postings(55)), "application/json")})
+    assert response.status_code == 200
+    assert response.json()['ingested'] == 55
+    assert len(main.job_index) == before + 55
+    jobs = [main.job_index.job(doc)['job_id'] for doc in range(before, before + 55)]
+    assert jobs == [f"job-{i}" for i in range(55)]
+    assert main.extraction_pool.stats()['pending'] == 0
+
+
+def test_ingest_rejects_unparseable_upload(client):
+    response = client.post("/api/jobs/ingest", files={"jobs": ("jobs.json", b"{not json", "application/json")})
+    assert response.status_code == 400
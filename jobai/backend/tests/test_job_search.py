@@ -0,0 +1,42 @@
+import asyncio
+
+import httpx
+
+import mock_jsearch
+from job_search import JobSearchClient
+
+
+def provider(request):
+    query = request.url.params['query']
+    if query == 'broken':
+        return httpx.Response(200, text="<html>Service unavailable</html>")
+    if query == 'listed':
+        return httpx.Response(200, json=[{'job_id': 'x'}])
+    return httpx.Response(200, json={'data': [{'job_id': query, 'job_title': query}]})
+
+
+def search_many(queries, transport):
+    async def scenario():
+        client = JobSearchClient(base_url="http://provider", retries=0, transport=transport)
+        try:
+            return await client.search_many(queries), client.stats()
+        finally:
+            await client.close()
+    return asyncio.run(scenario())
+
+
+def test_invalid_body_fails_only_its_query():
+    result, stats = search_many(["Python Developer", "broken", "listed"], httpx.MockTransport(provider))
+    assert [job['job_id'] for job in result['jobs']] == ["Python Developer"]
+    assert [error['query'] for error in result['errors']] == ["broken", "listed"]
+    assert stats['errors'] == 2
+
+
+def test_merges_duplicates_across_queries():
+    result, stats = search_many(["Data Engineer", "Data Engineer in Austin"],
+                                httpx.ASGITransport(app=mock_jsearch.app))
+    ids = [job['job_id'] for job in result['jobs']]
+    assert len(ids) == len(set(ids))
+    shared = [job for job in result['jobs'] if len(job['matched_queries']) == 2]
+    assert len(shared) == mock_jsearch.SHARED_JOBS
+    assert stats['upstream_calls'] == 2
@@ -0,0 +1,60 @@
+import pytest
+
+import metrics
+from metrics import Counter, Gauge, Histogram, Metric
+
+
+@pytest.fixture
+def registered():
+    names = []
+
+    def register(metric):
+        names.append(metric.name)
+        return metric
+
+    yield register
+    for name in names:
+        metrics._metrics.pop(name, None)
+
+
+def test_metric_is_abstract():
+    with pytest.raises(TypeError):
+        Metric('test_abstract', "Has no render")
+
+
+def test_counter_render_and_merge(registered):
+    counter = registered(Counter('test_requests_total', "Requests", ['result']))
+    counter.inc(result="hit")
+    counter.inc(2, result="miss")
+    counter.merge({("hit",): 3})
+    assert counter.render() == ['test_requests_total{result="hit"} 4', 'test_requests_total{result="miss"} 2']
+
+
+def test_histogram_buckets_are_cumulative(registered):
+    histogram = registered(Histogram('test_seconds', "Latency", buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value)
+    assert histogram.render() == [
+        'test_seconds_bucket{le="0.1"} 1',
+        'test_seconds_bucket{le="1"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        'test_seconds_sum 4.25',
+        'test_seconds_count 4',
+    ]
+
+
+def test_worker_deltas_merge_into_parent(registered):
+    counter = registered(Counter('test_worker_total', "Counted in a worker"))
+    counter.inc(5)
+    delta = metrics.drain()
+    assert counter.render() == []
+    metrics.merge(delta)
+    assert counter.render() == ['test_worker_total 5']
+
+
+def test_gauge_reads_at_scrape_time(registered):
+    value = {'now': 1}
+    gauge = registered(Gauge('test_depth', "Queue depth", lambda: value['now']))
+    value['now'] = 7
+    assert gauge.render() == ['test_depth 7']
+    assert '# TYPE test_depth gauge\ntest_depth 7' in metrics.render()
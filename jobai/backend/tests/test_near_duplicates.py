@@ -0,0 +1,108 @@
+import pickle
+
+import pytest
+
+import main
+import near_duplicates
+import resumeextraction
+from conftest import RESUME_TEXT, make_pdf
+from near_duplicates import NearDuplicateIndex, duplicate_groups, signature_to_json, text_signature
+
+OTHER_TEXT = """John Roe
+Java developer building payment systems with Spring and Kafka at Globex.
+Led the migration of the ledger service to Kubernetes on Azure.
+"""
+
+
+def test_similar_texts_match_and_different_ones_do_not():
+    index = NearDuplicateIndex()
+    index.add("original", text_signature(RESUME_TEXT))
+    assert index.query(text_signature(RESUME_TEXT + "\nUpdated October 2026"), 0.85) != []
+    assert index.query(text_signature(OTHER_TEXT), 0.5) == []
+
+
+def test_duplicate_groups_keep_newest():
+    records = [
+        {'content_hash': "a", 'processed_at': "2025-01-01", 'artifacts': {'minhash': signature_to_json(text_signature(RESUME_TEXT))}},
+        {'content_hash': "b", 'processed_at': "2025-02-01", 'artifacts': {'minhash': signature_to_json(text_signature(RESUME_TEXT + " v2"))}},
+        {'content_hash': "c", 'processed_at': "2025-03-01", 'artifacts': {'minhash': signature_to_json(text_signature(OTHER_TEXT))}},
+    ]
+    group, = duplicate_groups(records, 0.8)
+    assert group['keep']['content_hash'] == "b"
+    assert [duplicate['content_hash'] for duplicate in group['duplicates']] == ["a"]
+
+
+def test_worker_copy_replays_segments_and_delta(monkeypatch):
+    monkeypatch.setattr(near_duplicates, "SEGMENT_SIZE", 2)
+    monkeypatch.setattr(near_duplicates, "_worker_copy", None)
+    index = NearDuplicateIndex()
+    try:
+        texts = [f"{OTHER_TEXT} filler {i} " * 3 for i in range(4)] + [RESUME_TEXT]
+        for i, text in enumerate(texts):
+            index.add(f"resume-{i}", text_signature(text))
+        # As a worker process receives it: no index, only files and the delta
+        check = pickle.loads(pickle.dumps(index.check(0.85, 0.95, shared=True)))
+        assert check.index is None
+        assert check.segments == 1 and len(check.delta) == 0
+        assert check.match(text_signature(RESUME_TEXT))['content_hash'] == "resume-4"
+
+        index.add("newest", text_signature(RESUME_TEXT + " plus a trailing line"))
+        check = pickle.loads(pickle.dumps(index.check(0.85, 0.95, shared=True)))
+        assert [key for key, _ in check.delta] == ["newest"]
+        assert check.match(text_signature(RESUME_TEXT + " plus a trailing line"))['similarity'] == 1.0
+    finally:
+        index.close()
+
+
+def test_reuse_threshold():
+    index = NearDuplicateIndex()
+    check = index.check(0.85, 0.95)
+    assert check.reusable({'content_hash': "a", 'similarity': 0.96})
+    assert not check.reusable({'content_hash': "a", 'similarity': 0.9})
+    assert not index.check(0.85, None).reusable({'content_hash': "a", 'similarity': 1.0})
+
+
+def test_job_skips_stages_for_reusable_duplicate(monkeypatch):
+    index = NearDuplicateIndex()
+    index.add("stored", text_signature(resumeextraction.join_pages(
+        resumeextraction.read_resume(make_pdf())['pages'])))
+    ran = []
+    monkeypatch.setattr(resumeextraction, "run_stages", lambda *args, **kwargs: ran.append(args))
+    staged = resumeextraction.process_resume_staged(make_pdf(), index.check(0.85, 0.95))
+    assert staged['near_duplicate'] == {'content_hash': "stored", 'similarity': 1.0}
+    assert 'data' not in staged and ran == []
+
+
+def test_ocr_documents_are_checked_too(monkeypatch):
+    index = NearDuplicateIndex()
+    index.add("stored", text_signature(RESUME_TEXT))
+    monkeypatch.setattr(resumeextraction, "ocr_pages", lambda content, scanned: {0: RESUME_TEXT})
+    staged = resumeextraction.ocr_resume_staged(b"%PDF-scanned", [""], [0], index.check(0.85, 0.95))
+    assert staged['near_duplicate']['content_hash'] == "stored"
+    assert 'data' not in staged
+
+
+def extract(client, content, name="resume.pdf"):
+    response = client.post("/api/extract-resume", files={"resume": (name, content, "application/pdf")})
+    assert response.status_code == 200
+    return response
+
+
+def test_endpoint_reuses_near_duplicate(client):
+    original = make_pdf(RESUME_TEXT + "\nReuse test original")
+    extract(client, original)
+    edited = extract(client, make_pdf(RESUME_TEXT + "\nReuse test original "), "edited.pdf")
+    assert edited.headers['X-Near-Duplicate-Reused'] == "1"
+    assert edited.headers['X-Near-Duplicate-Of'] == main.content_hash(original)
+
+
+def test_endpoint_extracts_when_stored_result_is_gone(client, monkeypatch):
+    extract(client, make_pdf(RESUME_TEXT + "\nGone test original"))
+
+    async def no_prior(digest):
+        return None
+
+    monkeypatch.setattr(main, "prior_extraction", no_prior)
+    edited = extract(client, make_pdf(RESUME_TEXT + "\nGone test original "), "edited.pdf")
+    assert edited.headers['X-Near-Duplicate-Reused'] == "0"
+    assert edited.json()['skills']['all_skills']
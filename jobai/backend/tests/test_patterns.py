@@ -0,0 +1,18 @@
+import os
+
+import patterns
+import resumeextraction
+
+
+def test_no_catastrophic_backtracking():
+    # FUZZ_MAX_SIZE=20000000 runs the full 20MB check (around 15 minutes)
+    max_size = int(os.getenv("FUZZ_MAX_SIZE") or patterns.FUZZ_MAX_SIZE)
+    resumeextraction.get_taxonomy()
+    assert patterns.check_backtracking(sizes=patterns.fuzz_sizes(max_size)) == []
+
+
+def test_flags_super_linear_pattern():
+    registry = patterns.PatternRegistry()
+    registry.register('nested', r'(a+)+b')
+    failures = patterns.check_backtracking(sizes=(10, 20, 24), registry=registry)
+    assert {failure['pattern'] for failure in failures} == {'nested'}
@@ -0,0 +1,94 @@
+import fitz
+import pytest
+
+from pdf_layout import PageText, page_layout
+from resumeextraction import pages_document
+
+BODY = 10
+
+
+def layout_pages(*pages):
+    """
+    Page texts read in layout mode from a PDF built from (text, fontsize,
+    bold) lines, or (text, fontsize, bold, (x, y)) to place one
+    """
+    document = fitz.open()
+    for lines in pages:
+        page = document.new_page()
+        y = 60
+        for text, size, bold, *point in lines:
+            y += size * 1.6
+            page.insert_text(point[0] if point else (50, y), text, fontsize=size,
+                             fontname="hebo" if bold else "helv")
+    content = document.tobytes()
+    document.close()
+    with fitz.open(stream=content, filetype="pdf") as document:
+        return [page_layout(page) for page in document]
+
+
+def body(text):
+    return (text, BODY, False)
+
+
+RESUME = [
+    ("Jane Doe", 16, True),
+    body("jane.doe@example.com"),
+    ("Experience", 13, False),                # Larger font
+    body("Backend Developer at Acme Corp, 2019 - 2023."),
+    body("Projects"),                          # Body text that reads like a heading
+    body("Built REST APIs in Django."),
+    ("EDUCATION", BODY, True),                 # Bold at body size
+    body("B.Tech in Computer Science, 2019."),
+    ("Where I Volunteer", 13, False),          # Unknown, but set large: ends Education
+    body("Food bank, weekends."),
+]
+
+
+@pytest.fixture(scope="module")
+def document():
+    return pages_document(layout_pages(RESUME))
+
+
+def test_headings_tagged_by_font(document):
+    page, = layout_pages(RESUME)
+    assert isinstance(page, PageText)
+    levels = {text: level for _, text, level in page.headings}
+    assert levels == {"Jane Doe": 1, "Experience": 1, "EDUCATION": 2, "Where I Volunteer": 1}
+
+
+def test_tagged_headings_are_section_boundaries(document):
+    assert set(document.sections) == {'experience', 'education'}
+    # "Projects" in body text is not a heading, so it stays inside Experience
+    assert document.section_text('experience') == (
+        "Backend Developer at Acme Corp, 2019 - 2023.\nProjects\nBuilt REST APIs in Django.\n")
+    assert document.section_text('education') == "B.Tech in Computer Science, 2019.\n"
+
+
+def test_bold_lead_in_starts_a_section():
+    document = fitz.open()
+    page = document.new_page()
+    page.insert_text((50, 80), "Jane Doe", fontsize=BODY, fontname="helv")
+    writer = fitz.TextWriter(page.rect)  # Bold "Skills:" and regular text on one line
+    writer.append((50, 100), "Skills:", font=fitz.Font("hebo"), fontsize=BODY)
+    writer.append(writer.last_point, " Python, SQL", font=fitz.Font("helv"), fontsize=BODY)
+    writer.write_text(page)
+    page = page_layout(page)
+    document.close()
+    assert [(text, level) for _, text, level in page.headings] == [("Skills: Python, SQL", 3)]
+    assert pages_document([page]).section_text('skills').strip() == "Python, SQL"
+
+
+def test_single_font_falls_back_to_text_headings():
+    document = pages_document(layout_pages([body("Jane Doe"), body("Education"), body("B.Tech, 2019")]))
+    assert document.section_text('education').strip() == "B.Tech, 2019"
+
+
+def test_two_columns_read_one_at_a_time():
+    page, = layout_pages([
+        ("Jane Doe | Backend Developer, ten years of Python, Django and PostgreSQL in production", BODY, False),
+        ("Skills", BODY, True, (50, 110)), ("Python", BODY, False, (50, 126)),
+        ("Django", BODY, False, (50, 142)),
+        ("Experience", BODY, True, (320, 110)), ("Acme Corp", BODY, False, (320, 126)),
+        ("Globex", BODY, False, (320, 142)),
+    ])
+    assert page.splitlines()[1:] == ["Skills", "Python", "Django", "Experience", "Acme Corp", "Globex"]
@@ -0,0 +1,30 @@
+import fitz
+
+from conftest import RESUME_TEXT
+from resumeextraction import EXTRACTORS, TEXT_REQUIREMENTS, read_pdf_pages
+
+
+def pdf(pages):
+    document = fitz.open()
+    for number in range(pages):
+        document.new_page().insert_text((72, 72), f"Page {number + 1}\n{RESUME_TEXT}", fontsize=9)
+    content = document.tobytes()
+    document.close()
+    return content
+
+
+def needs(fields):
+    return [TEXT_REQUIREMENTS[field] for field in fields]
+
+
+def test_leading_text_fields_stop_early():
+    content = pdf(6)
+    assert len(read_pdf_pages(content, needs(['contact_info']))) == 1
+    # raw_text wants 1000 chars: four of these ~290-char pages
+    assert len(read_pdf_pages(content, needs(['contact_info', 'raw_text']))) == 4
+
+
+def test_full_extraction_stops_at_budget():
+    content = pdf(8)
+    assert len(read_pdf_pages(content, needs(EXTRACTORS))) == 8
+    assert len(read_pdf_pages(content, needs(EXTRACTORS), max_pages=3)) == 3
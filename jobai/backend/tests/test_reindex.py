@@ -0,0 +1,83 @@
+import pytest
+
+import resumeextraction
+from conftest import make_pdf
+from reindex import reindex_record
+from result_cache import content_hash
+from result_store import make_record
+from skill_taxonomy import get_taxonomy
+
+
+@pytest.fixture
+def stored():
+    """A stored record as the API writes it, with its stage artifacts"""
+    content = make_pdf()
+    staged = resumeextraction.process_resume_staged(content)
+    record = make_record(content_hash(content), staged['data'], filename="resume.pdf",
+                         version=resumeextraction.extraction_version(), artifacts=staged['artifacts'])
+    return content, record
+
+
+@pytest.fixture
+def bump(monkeypatch):
+    """Change one stage version the way a code change would"""
+    def bump(stage):
+        monkeypatch.setitem(resumeextraction.STAGE_VERSIONS, stage, "test")
+        resumeextraction._versions_digest.cache_clear()
+    yield bump
+    resumeextraction._versions_digest.cache_clear()
+
+
+def test_current_record_is_left_alone(stored):
+    outcome = reindex_record(stored[1])
+    assert (outcome['status'], outcome['recomputed'], outcome['record']) == ('current', [], None)
+
+
+def test_stage_bump_reruns_only_that_stage(stored, bump, monkeypatch):
+    content, record = stored
+    bump('education')
+    monkeypatch.setattr(resumeextraction, 'extract_education', lambda text: [{'degree': "refreshed"}])
+
+    outcome = reindex_record(record)
+    assert outcome['status'] == 'updated'
+    assert outcome['recomputed'] == ['education']
+    refreshed = outcome['record']
+    assert refreshed['data']['education'] == [{'degree': "refreshed"}]
+    assert refreshed['data']['skills'] == record['data']['skills']
+    assert refreshed['artifacts']['versions']['education'] == "test"
+    assert refreshed['extractor_version'] == resumeextraction.extraction_version() != record['extractor_version']
+
+
+def test_taxonomy_change_reruns_skill_stages(stored, monkeypatch):
+    monkeypatch.setattr(get_taxonomy(), 'version', "changed")
+    resumeextraction._versions_digest.cache_clear()
+    try:
+        outcome = reindex_record(stored[1])
+    finally:
+        resumeextraction._versions_digest.cache_clear()
+    assert outcome['status'] == 'updated'
+    assert outcome['recomputed'] == ['skills', 'search_keywords']
+
+
+def test_text_bump_needs_the_pdf(stored, bump, tmp_path):
+    content, record = stored
+    bump('text')
+    assert reindex_record(record)['status'] == 'needs_pdf'
+
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(content)
+    outcome = reindex_record(record, str(path))
+    assert outcome['status'] == 'updated'
+    assert outcome['recomputed'] == ['text']  # Same text again: nothing after it re-runs
+    assert outcome['record']['data'] == record['data']
+
+
+def test_extractor_error_is_reported(stored, bump, monkeypatch):
+    bump('projects')
+
+    def broken(text):
+        raise ValueError("boom")
+    monkeypatch.setattr(resumeextraction, 'extract_projects', broken)
+    outcome = reindex_record(stored[1])
+    assert outcome['status'] == 'failed'
+    assert outcome['error'] == "ValueError: boom"
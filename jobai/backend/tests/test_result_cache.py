@@ -0,0 +1,55 @@
+import result_cache
+from result_cache import ResultCache, content_hash, make_cache_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_key_follows_content_and_version():
+    key = make_cache_key(b"resume", "v1")
+    assert key == make_cache_key(b"resume", "v1")
+    assert key != make_cache_key(b"resume!", "v1")
+    assert key != make_cache_key(b"resume", "v2")
+    assert make_cache_key(b"", "v1", digest=content_hash(b"resume")) == key
+
+
+def test_lru_evicts_oldest():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', {'n': 1})
+    cache.put('b', {'n': 2})
+    cache.get('a')
+    cache.put('c', {'n': 3})
+    assert cache.get('b') is None
+    assert cache.get('a') == {'n': 1} and cache.get('c') == {'n': 3}
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_cache.time, 'time', clock)
+    cache = ResultCache(ttl_seconds=60)
+    cache.put('key', {'n': 1})
+    clock.now += 60
+    assert cache.get('key') == {'n': 1}
+    clock.now += 1
+    assert cache.get('key') is None
+    assert cache.stats()['expired'] == 1
+
+
+def test_disk_tier_survives_restart_and_expires(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_cache.time, 'time', clock)
+    path = str(tmp_path / "cache.db")
+    ResultCache(db_path=path, ttl_seconds=60).put('key', {'n': 1})
+
+    restarted = ResultCache(db_path=path, ttl_seconds=60)
+    assert restarted.get_encoded('key') == ({'n': 1}, b'{"n":1}')
+    assert restarted.stats()['disk_hits'] == 1
+
+    clock.now += 61
+    assert ResultCache(db_path=path, ttl_seconds=60).get('key') is None
@@ -0,0 +1,117 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BACKEND_DIR
+from result_store import NDJSONResultStore, ResultStore, ResultWriter, SQLiteResultStore, make_record
+
+
+def extraction(name):
+    return {'contact_info': {'name': name}, 'skills': {'all_skills': ["Python"]}}
+
+
+@pytest.fixture(params=["sqlite", "ndjson"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        store = SQLiteResultStore(str(tmp_path / "results.db"))
+    else:
+        store = NDJSONResultStore(str(tmp_path / "results"))
+    yield store
+    store.close()
+
+
+def test_lookups_newest_first(store):
+    store.append([
+        make_record("h1", extraction("First"), user_id="u1", version="v1", artifacts={'pages': ["p"]}),
+        make_record("h2", extraction("Other"), user_id="u2", version="v1"),
+        make_record("h1", extraction("Second"), user_id="u1", version="v1"),
+    ])
+    assert [r['data']['contact_info']['name'] for r in store.by_hash("h1")] == ["Second", "First"]
+    assert [r['content_hash'] for r in store.by_user("u1", limit=1)] == ["h1"]
+    assert all('artifacts' not in r for r in store.by_hash("h1"))
+
+
+def test_iter_latest_carries_artifacts(store):
+    store.append([
+        make_record("h1", extraction("First"), version="v1", artifacts={'pages': ["p"]}),
+        make_record("h1", extraction("Second"), version="v1"),
+    ])
+    latest, = store.iter_latest()
+    assert latest['data']['contact_info']['name'] == "Second"
+    assert latest['artifacts'] == {'pages': ["p"]}
+
+
+def test_writer_flushes_on_stop(store):
+    async def scenario():
+        writer = ResultWriter(store, batch_size=10, flush_interval=5)
+        writer.start()
+        for i in range(3):
+            assert writer.submit(make_record(f"h{i}", extraction("Queued"), version="v1"))
+        await writer.stop()
+        return writer.stats()
+
+    assert asyncio.run(scenario())['written'] == 3
+    assert len(list(store.iter_all())) == 3
+
+
+def test_importing_the_app_creates_no_files(tmp_path):
+    env = {**os.environ, 'RESULT_STORE': "sqlite", 'PYTHONPATH': BACKEND_DIR}
+    subprocess.run([sys.executable, "-c", "import main"], cwd=tmp_path, env=env, check=True)
+    assert os.listdir(tmp_path) == []
+
+
+def test_cache_hits_are_stored_as_references(store):
+    full = make_record("h1", extraction("Stored"), user_id="u1", version="v1", artifacts={'pages': ["p"]})
+    hits = [make_record("h1", extraction("Stored"), user_id=user, version="v1", reference=True)
+            for user in ("u2", "u3")]
+    store.append([full, hits[0]])
+    store.append([hits[1]])
+    assert [r['user_id'] for r in store.by_hash("h1")] == ["u3", "u2", "u1"]
+    assert store.by_user("u3")[0]['data'] == extraction("Stored")
+    # Only the full record counts as an extraction
+    assert [r['user_id'] for r in store.iter_all()] == ["u1"]
+    latest, = store.iter_latest()
+    assert latest['artifacts'] == {'pages': ["p"]}
+
+
+def test_reference_rows_hold_no_data(tmp_path):
+    store = SQLiteResultStore(str(tmp_path / "results.db"))
+    store.append([make_record("h1", extraction("Stored"), version="v1"),
+                  make_record("h1", extraction("Stored"), version="v1", reference=True)])
+    rows = store._db.execute("SELECT data FROM results ORDER BY id").fetchall()
+    store.close()
+    assert rows[1] == ('null',)
+
+
+def test_hit_without_stored_extraction_is_stored_in_full(store):
+    # A version the store has no full record of (e.g. cached before a restart)
+    store.append([make_record("h1", extraction("Cached"), user_id="u1", version="v2", reference=True)])
+    assert store.by_user("u1")[0]['data'] == extraction("Cached")
+    assert len(list(store.iter_all())) == 1
+
+
+def test_retention_keeps_extractions_that_references_need(tmp_path):
+    store = SQLiteResultStore(str(tmp_path / "results.db"), retention_days=1)
+    store.append([make_record("h1", extraction("Old"), user_id="u1", version="v1"),
+                  make_record("h2", extraction("Expired"), user_id="u1", version="v1")])
+    store._db.execute("UPDATE results SET created_at = created_at - 2 * 86400")
+    store.append([make_record("h1", extraction("Old"), user_id="u2", version="v1", reference=True)])
+    assert store.prune() == 1
+    assert store.by_user("u2")[0]['data'] == extraction("Old")
+    assert store.by_hash("h2") == []
+    store.close()
+
+
+def test_backends_implement_the_interface():
+    with pytest.raises(TypeError):
+        ResultStore()
+
+    class Partial(ResultStore):
+        def append(self, records):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
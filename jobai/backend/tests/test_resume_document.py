@@ -0,0 +1,63 @@
+from resume_document import ResumeDocument, as_document, sections_from_json, sections_to_json, segment_sections
+
+TEXT = """Jane Doe
+jane.doe@example.com
+Backend developer who likes databases.
+
+TECHNICAL SKILLS
+Python, Django
+Work Experience:
+Backend Developer, Acme Corp
+E D U C A T I O N
+B.Tech, 2019
+Projects: Job board, resume parser
+"""
+
+
+def test_heading_forms():
+    sections = segment_sections(TEXT)
+    assert {name: section.heading for name, section in sections.items()} == {
+        'skills': "TECHNICAL SKILLS",         # Known heading, any case
+        'experience': "Work Experience",      # Trailing colon dropped
+        'education': "E D U C A T I O N",     # Letter-spaced
+        'projects': "Projects",               # Inline "Heading: content"
+    }
+
+
+def test_section_bodies_run_to_the_next_heading():
+    document = ResumeDocument(TEXT)
+    assert document.section_text('skills') == "Python, Django\n"
+    assert document.section_text('experience') == "Backend Developer, Acme Corp\n"
+    assert document.section_text('projects') == "Job board, resume parser\n"
+
+
+def test_missing_section_is_none():
+    document = ResumeDocument(TEXT)
+    assert 'certifications' not in document.sections
+    assert document.section_text('certifications') is None
+
+
+def test_text_before_the_first_heading_belongs_to_no_section():
+    document = ResumeDocument(TEXT)
+    first = min(section.start for section in document.sections.values())
+    assert "jane.doe@example.com" in TEXT[:first]
+    assert not any("jane.doe" in document.section_text(name) for name in document.sections)
+    assert ResumeDocument("Jane Doe\nBackend developer\n").sections == {}
+
+
+def test_sentences_and_long_lines_are_not_headings():
+    text = "Summary\nI love education and projects.\nSkills in leadership, teamwork\nPython\n"
+    assert set(segment_sections(text)) == {'summary'}
+
+
+def test_first_section_of_a_name_wins():
+    text = "Experience\nAcme\nEducation\nB.Tech\nInternships\nGlobex\n"
+    document = ResumeDocument(text)
+    assert document.section_text('experience') == "Acme\n"
+
+
+def test_sections_round_trip_through_json():
+    document = ResumeDocument(TEXT)
+    restored = ResumeDocument(TEXT, sections_from_json(sections_to_json(document.sections)))
+    assert restored.sections == document.sections
+    assert as_document(document) is document and as_document(TEXT).text == TEXT
@@ -0,0 +1,78 @@
+import json
+import threading
+
+import pytest
+
+import serialization
+from conftest import make_pdf
+from serialization import dumps, dumps_with
+
+
+def extract(client, **headers):
+    return client.post("/api/extract-resume", headers=headers,
+                       files={"resume": ("resume.pdf", make_pdf(), "application/pdf")})
+
+
+@pytest.fixture(scope="module")
+def plain(client):
+    """The uncompressed JSON result; also puts the resume in the cache"""
+    response = extract(client, **{"Accept-Encoding": "identity"})
+    assert response.status_code == 200 and "content-encoding" not in response.headers
+    return response.json()
+
+
+@pytest.mark.parametrize("encoding, expected", [
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("br;q=1.0, gzip;q=0.5", "br" if serialization.brotli else "gzip"),
+    ("deflate", None),
+])
+def test_accept_encoding(client, plain, encoding, expected):
+    # Cache hits: the stored JSON body is what gets compressed
+    response = extract(client, **{"Accept-Encoding": encoding})
+    assert response.headers.get("content-encoding") == expected
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+    assert response.json() == plain  # httpx undoes the content encoding
+
+
+def test_msgpack(client, plain):
+    msgpack = pytest.importorskip("msgpack")
+    response = extract(client, **{"Accept": "application/x-msgpack", "Accept-Encoding": "gzip"})
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content, raw=False) == plain
+
+
+def test_msgpack_refused_or_unavailable_falls_back_to_json(client, plain, monkeypatch):
+    response = extract(client, **{"Accept": "application/msgpack;q=0, application/json"})
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == plain
+
+    monkeypatch.setattr(serialization, "msgpack", None)
+    response = extract(client, **{"Accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == plain
+
+
+def test_large_bodies_compress_off_the_event_loop(client, plain, monkeypatch):
+    threads = []
+    compress = serialization.compress
+
+    def recording(content, encoding):
+        threads.append(threading.current_thread())
+        return compress(content, encoding)
+
+    monkeypatch.setattr(serialization, "compress", recording)
+    extract(client, **{"Accept-Encoding": "gzip"})
+    monkeypatch.setattr(serialization, "THREAD_COMPRESS_SIZE", 0)
+    response = extract(client, **{"Accept-Encoding": "gzip"})
+    assert response.json() == plain
+    loop_thread, worker_thread = threads
+    assert worker_thread is not loop_thread
+
+
+def test_dumps_with_splices_encoded_value():
+    encoded = dumps({"skills": ["C++", "é"], "n": 1})
+    for obj in ({}, {"filename": "a.pdf", "user_id": None}):
+        spliced = dumps_with(obj, "data", encoded)
+        assert json.loads(spliced) == {**obj, "data": {"skills": ["C++", "é"], "n": 1}}
@@ -0,0 +1,101 @@
+import math
+
+import numpy as np
+import pytest
+
+import similarity
+from similarity import SkillMatrix, idf_weights, query_matrix, top_matches
+
+N_SKILLS = 12
+
+
+def random_sets(rng, rows):
+    return [set(rng.choice(N_SKILLS, size=rng.integers(0, 6), replace=False).tolist()) for _ in range(rows)]
+
+
+def brute_force(query, job, method, idf):
+    shared = query & job
+    if method == 'overlap':
+        return float(len(shared))
+    if method == 'weighted':
+        return sum(idf[s] for s in shared)
+    if method == 'jaccard':
+        union = len(query | job)
+        return len(shared) / union if union else 0.0
+    norm = math.sqrt(sum(idf[s] ** 2 for s in query)) * math.sqrt(sum(idf[s] ** 2 for s in job))
+    return sum(idf[s] ** 2 for s in shared) / norm if norm else 0.0
+
+
+def brute_idf(jobs):
+    return [math.log((len(jobs) + 1) / (sum(s in job for job in jobs) + 1)) + 1 for s in range(N_SKILLS)]
+
+
+@pytest.fixture
+def sets():
+    rng = np.random.default_rng(7)
+    return random_sets(rng, 9), random_sets(rng, 25)
+
+
+@pytest.mark.parametrize("method", similarity.METHODS)
+def test_scores_match_per_pair_computation(sets, method):
+    query_sets, job_sets = sets
+    jobs = SkillMatrix.from_sets(job_sets, N_SKILLS)
+    idf = brute_idf(job_sets)
+    assert np.allclose(idf_weights(jobs), idf)
+
+    scores = similarity.similarity(SkillMatrix.from_sets(query_sets, N_SKILLS), jobs, method)
+    expected = [[brute_force(q, j, method, idf) for j in job_sets] for q in query_sets]
+    assert np.allclose(scores, expected)
+
+
+def brute_top(query, job_sets, k, method, idf, exclude=(), tiebreak=None):
+    """Positive scores, best first; ties by lower tiebreak key, then newer row"""
+    tiebreak = tiebreak if tiebreak is not None else [0] * len(job_sets)
+    scored = [(round(brute_force(query, job, method, idf), 9), row) for row, job in enumerate(job_sets)
+              if row not in exclude]
+    scored = [(score, row) for score, row in scored if score > 0]
+    scored.sort(key=lambda item: (-item[0], tiebreak[item[1]], -item[1]))
+    return [row for _, row in scored[:k]]
+
+
+@pytest.mark.parametrize("method", similarity.METHODS)
+def test_top_matches_ties_exclude_and_chunks(sets, method, monkeypatch):
+    query_sets, job_sets = sets
+    job_sets = job_sets + [set(job_sets[0]), set(job_sets[0])]  # Exact ties with row 0
+    jobs = SkillMatrix.from_sets(job_sets, N_SKILLS)
+    idf = brute_idf(job_sets)
+    exclude = np.zeros(len(job_sets), dtype=bool)
+    exclude[[3, 5]] = True
+    tiebreak = np.array([row % 3 for row in range(len(job_sets))], dtype=float)
+    queries = SkillMatrix.from_sets(query_sets, N_SKILLS)
+
+    # Score blocks of 4 query rows, so the 9 queries cross two chunk boundaries
+    monkeypatch.setattr(similarity, 'CHUNK_BYTES', 8 * len(job_sets) * 4)
+    for kwargs, brute_kwargs in (({}, {}),
+                                 ({'exclude': exclude, 'tiebreak': tiebreak},
+                                  {'exclude': {3, 5}, 'tiebreak': tiebreak})):
+        ids, best = top_matches(queries, jobs, k=5, method=method, **kwargs)
+        for row, query in enumerate(query_sets):
+            expected = brute_top(query, job_sets, 5, method, idf, **brute_kwargs)
+            assert ids[row, :len(expected)].tolist() == expected
+            assert (ids[row, len(expected):] == -1).all() and (best[row, len(expected):] == 0).all()
+            assert np.allclose(best[row, :len(expected)],
+                               [brute_force(query, job_sets[j], method, idf) for j in expected])
+
+
+def test_newer_rows_win_plain_ties():
+    jobs = SkillMatrix.from_sets([{1}, {1}, {1}, {2}], 4)
+    ids, best = top_matches(SkillMatrix.from_sets([{1}], 4), jobs, k=2, method='overlap')
+    assert ids.tolist() == [[2, 1]] and best.tolist() == [[1.0, 1.0]]
+
+
+def test_query_matrix_drops_unknown_skills():
+    queries = query_matrix([["Python", "Cobol"], []], {'Python': 0, 'SQL': 1})
+    assert queries.indices.tolist() == [0] and queries.indptr.tolist() == [0, 1, 1]
+
+
+def test_empty_inputs():
+    ids, best = top_matches(SkillMatrix.from_sets([{0}], 2), SkillMatrix.from_sets([], 2), k=3)
+    assert ids.tolist() == [[-1]] and best.tolist() == [[0.0]]
+    scores = similarity.similarity(SkillMatrix.from_sets([set()], 2), SkillMatrix.from_sets([{1}], 2), 'cosine')
+    assert scores.tolist() == [[0.0]]
@@ -0,0 +1,68 @@
+from skill_matcher import SkillMatcher
+from skill_taxonomy import get_taxonomy
+
+
+def skills(text, **kwargs):
+    return [match.skill for match in get_taxonomy().matcher.find_all(text, **kwargs)]
+
+
+def test_symbol_terms_match_before_punctuation():
+    found = skills("Python, C++, C#, CI/CD and Node.js.")
+    for skill in ("Python", "C++", "C#", "CI/CD", "Node.js"):
+        assert skill in found
+
+
+def test_word_boundaries():
+    assert skills("javascript") == ["JavaScript"]
+    assert "Java" not in skills("javascript")
+    assert skills("pythonic") == []
+
+
+def test_aliases_report_canonical_skill():
+    assert skills("k8s and ReactJS") == ["Kubernetes", "React"]
+
+
+def test_offsets_point_at_the_match():
+    text = "Built APIs in Django"
+    match, = get_taxonomy().matcher.find_all(text)
+    assert (match.skill, text[match.start:match.end]) == ("Django", "Django")
+
+
+def test_categorize_keeps_skills_shape():
+    result = get_taxonomy().matcher.categorize("Python and PostgreSQL on AWS")
+    assert set(get_taxonomy().categories) < set(result)
+    assert result['programming_languages'] == ["Python"]
+    assert result['databases'] == ["PostgreSQL"]
+    assert result['all_skills'] == ["Python", "PostgreSQL", "AWS"]
+
+
+def test_output_follows_taxonomy_order():
+    matcher = SkillMatcher({'tools': ["Zeta", "Alpha"]})
+    assert matcher.categorize("alpha then zeta")['tools'] == ["Zeta", "Alpha"]
+
+
+def test_plain_words_are_not_typos():
+    for text in ("clutter", "postmen", "puppets", "dockers"):
+        assert skills(text, fuzzy=True) == []
+        result = get_taxonomy().matcher.categorize(f"Keep the desk free of {text}")
+        assert result['all_skills'] == [] and result['possible_skills'] == {}
+
+
+def test_fuzzy_matching_is_opt_in():
+    assert skills("Kubernetis") == []
+    match, = get_taxonomy().matcher.find_all("Kubernetis", fuzzy=True)
+    assert (match.skill, match.typo) == ("Kubernetes", True)
+
+
+def test_typos_reported_separately():
+    result = get_taxonomy().matcher.categorize("Kubernetis and python3")
+    assert result['all_skills'] == ["Python"]
+    assert set(result['possible_skills']) == {"Kubernetes"}
+    assert "Kubernetes" not in result['cloud_devops']
+
+
+def test_postings_use_exact_matches_only():
+    from job_index import prepare_job
+    job = prepare_job({'job_id': '1', 'job_title': "Engineer",
+                       'job_description': "Python and Kubernetis, no clutter"})
+    assert job['skills'] == ["Python"]
@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import skill_taxonomy
+from conftest import BACKEND_DIR
+
+
+def write_taxonomy(path, categories, aliases=None, mtime=None):
+    path.write_text(json.dumps({'categories': categories, 'aliases': aliases or {}}))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def found(text):
+    return [match.skill for match in skill_taxonomy.get_taxonomy().matcher.find_all(text)]
+
+
+@pytest.fixture
+def taxonomy_file(tmp_path, monkeypatch):
+    """A taxonomy in tmp_path made the active one; the shipped one is restored afterwards"""
+    path = tmp_path / "taxonomy.json"
+    write_taxonomy(path, {'tools': ["Alpha"]}, mtime=1_000_000)
+    monkeypatch.setattr(skill_taxonomy, 'TAXONOMY_PATH', str(path))
+    monkeypatch.setattr(skill_taxonomy, 'RELOAD_CHECK_INTERVAL', 0)
+    monkeypatch.setattr(skill_taxonomy, '_taxonomy', None)
+    monkeypatch.setattr(skill_taxonomy, '_taxonomy_mtime', 0.0)
+    monkeypatch.setattr(skill_taxonomy, '_last_check', 0.0)
+    return path
+
+
+def test_reloads_when_the_file_changes(taxonomy_file):
+    assert found("alpha and beta, b3ta") == ["Alpha"]
+    version = skill_taxonomy.get_taxonomy().version
+
+    write_taxonomy(taxonomy_file, {'tools': ["Alpha", "Beta"]}, {'Beta': ["b3ta"]}, mtime=1_000_100)
+    assert found("alpha and beta, b3ta") == ["Alpha", "Beta", "Beta"]
+    assert skill_taxonomy.get_taxonomy().version != version
+
+
+def test_keeps_last_good_taxonomy_on_a_broken_file(taxonomy_file):
+    taxonomy = skill_taxonomy.get_taxonomy()
+    taxonomy_file.write_text("{not json")
+    os.utime(taxonomy_file, (1_000_200, 1_000_200))
+    assert skill_taxonomy.get_taxonomy() is taxonomy
+    # Not retried until the file changes again
+    assert skill_taxonomy._taxonomy_mtime == 1_000_200
+
+
+def test_aliases_resolve_to_their_skill(taxonomy_file):
+    write_taxonomy(taxonomy_file, {'tools': ["Kubernetes"]}, {'Kubernetes': ["k8s", "kube"]},
+                   mtime=1_000_300)
+    matches = skill_taxonomy.get_taxonomy().matcher.find_all("k8s and kube")
+    assert [(match.skill, match.start) for match in matches] == [("Kubernetes", 0), ("Kubernetes", 8)]
+
+
+def test_large_taxonomy(taxonomy_file):
+    skills = [f"Skill{i}" for i in range(5000)]
+    aliases = {f"Skill{i}": [f"s{i}x"] for i in range(0, 5000, 2)}
+    write_taxonomy(taxonomy_file, {'tools': skills}, aliases, mtime=1_000_400)
+    assert found("Skill4999, s10x and Skill7") == ["Skill4999", "Skill10", "Skill7"]
+
+
+def test_path_from_environment(tmp_path):
+    path = tmp_path / "custom.json"
+    write_taxonomy(path, {'tools': ["Gamma"]})
+    script = ("import skill_taxonomy as t; "
+              "print(t.TAXONOMY_PATH == %r, [m.skill for m in t.get_taxonomy().matcher.find_all('gamma')])"
+              % str(path))
+    output = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True,
+                            env={**os.environ, 'SKILL_TAXONOMY_PATH': str(path)}, check=True).stdout
+    assert output.strip() == "True ['Gamma']"
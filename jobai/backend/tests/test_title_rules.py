@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+import skill_taxonomy
+from skill_taxonomy import get_taxonomy
+from title_rules import TitleRules, _position_factor
+
+
+def reference_rank(rules, skills, years):
+    """
+    The rules evaluated one by one, the way the hand-written chain did: a rule
+    fires once if any of its skills is present. Ties keep first-mention order.
+    """
+    order, scores = {}, {}
+
+    def mention(titles):
+        for title in titles:
+            order.setdefault(title, len(order))
+
+    def add(titles, weight=1.0):
+        for i, title in enumerate(titles):
+            scores[title] = scores.get(title, 0.0) + weight * _position_factor(i)
+
+    language = rules['language_titles']
+    for rule in rules['skill_rules'] + rules['category_rules']:
+        mention(rule['titles'])
+
+    for i, skill in enumerate(skills.get(language['category'], [])[:language['limit']]):
+        titles = [language['template'].format(skill=skill)]
+        if years >= language['senior_min_years']:
+            titles.append(language['senior_template'].format(skill=skill))
+        mention(titles)
+        for title in titles:
+            scores[title] = scores.get(title, 0.0) + _position_factor(i)
+    for rule in rules['category_rules']:
+        if len(skills.get(rule['category'], [])) >= rule['min_count']:
+            add(rule['titles'])
+    for rule in rules['skill_rules']:
+        if any(skill in skills.get('all_skills', []) for skill in rule['skills']):
+            add(rule['titles'])
+    if not scores:
+        mention(rules['fallback_titles'])
+        add(rules['fallback_titles'])
+    ranked = sorted(scores, key=lambda title: (-round(scores[title], 9), order[title]))
+    return [(title, round(scores[title], 4)) for title in ranked]
+
+
+RESUMES = [
+    {'programming_languages': ["Python"], 'all_skills': ["Python", "TensorFlow", "PyTorch", "Docker", "Kubernetes"]},
+    {'programming_languages': ["Java", "Kotlin"], 'mobile_development': ["Android"],
+     'all_skills': ["Java", "Kotlin", "Android", "Spring Boot", "PostgreSQL", "MySQL"]},
+    {'web_technologies': ["React", "Node.js", "Express", "Next.js"], 'programming_languages': ["JavaScript"],
+     'all_skills': ["JavaScript", "React", "Node.js", "Express", "Next.js", "MongoDB"]},
+    {'all_skills': ["Excel"]},
+]
+
+
+@pytest.mark.parametrize("skills", RESUMES)
+@pytest.mark.parametrize("years", [0, 3])
+def test_rank_matches_rule_by_rule_evaluation(skills, years):
+    with open(skill_taxonomy.TAXONOMY_PATH, encoding='utf-8') as f:
+        rules = json.load(f)['title_rules']
+    assert get_taxonomy().title_rules.rank(skills, years, limit=100) == reference_rank(rules, skills, years)
+
+
+def test_multi_skill_rule_counts_once():
+    rules = get_taxonomy().title_rules
+    both = dict(rules.rank({'all_skills': ["TensorFlow", "PyTorch"]}, 0))
+    one = dict(rules.rank({'all_skills': ["PyTorch"]}, 0))
+    assert both == one
+    assert both["ML Engineer"] == 1.0
+
+
+def test_ties_keep_rule_order_and_seniors_lead():
+    ranked = get_taxonomy().title_rules.rank(
+        {'programming_languages': ["Go"], 'all_skills': ["Go", "Docker", "Kubernetes"]}, 6, limit=8)
+    assert ranked == [
+        ("Senior DevOps Engineer", 1.0), ("DevOps Engineer", 1.0),
+        ("Go Developer", 1.0), ("Senior Go Developer", 1.0),
+        ("Senior Site Reliability Engineer", 0.9), ("Site Reliability Engineer", 0.9),
+        ("Senior SRE", 0.8), ("SRE", 0.8),
+    ]
+
+
+def test_rule_weights_and_unknown_skills():
+    rules = TitleRules({'skill_rules': [
+        {'skills': ["A"], 'titles': ["Alpha Dev", "Shared Dev"]},
+        {'skills': ["B", "Nope"], 'titles': ["Shared Dev"], 'weight': 2.0},
+    ]}, {'A': ('tools',), 'B': ('tools',)})
+    assert rules.rank({'all_skills': ["A", "B"]}, 0) == [("Shared Dev", 2.9), ("Alpha Dev", 1.0)]
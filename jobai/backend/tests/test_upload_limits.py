@@ -0,0 +1,110 @@
+import asyncio
+import io
+import json
+
+import fitz
+import pytest
+from starlette.datastructures import UploadFile
+
+import main
+from conftest import make_pdf
+from resumeextraction import MAX_UPLOAD_PAGES
+from upload_guard import UploadRejected, check_pdf, read_upload
+
+ORIGIN = {"Origin": "https://app.example.com"}
+
+
+def upload(content):
+    return UploadFile(io.BytesIO(content), filename="resume.pdf")
+
+
+def test_read_upload_stops_at_the_limit():
+    with pytest.raises(UploadRejected) as rejected:
+        asyncio.run(read_upload(upload(b"%PDF-" + b"x" * 3000), 2048))
+    assert rejected.value.status_code == 413
+
+
+def test_read_upload_requires_pdf_header():
+    with pytest.raises(UploadRejected) as rejected:
+        asyncio.run(read_upload(upload(b"GIF89a" + b"x" * 100), 2048, require_pdf=True))
+    assert rejected.value.status_code == 400
+    assert asyncio.run(read_upload(upload(b"%PDF-1.7 body"), 2048, require_pdf=True)) == b"%PDF-1.7 body"
+
+
+def test_declared_oversize_body_is_refused_with_cors_headers(client):
+    response = client.post("/api/extract-resume", content=b"",
+                           headers={**ORIGIN, "Content-Length": str(main.MAX_UPLOAD_SIZE * 2),
+                                    "Content-Type": "multipart/form-data; boundary=x"})
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] in ("*", ORIGIN["Origin"])
+
+
+def test_streamed_oversize_body_is_cut_off(client):
+    limit = main.MAX_JSON_BODY_SIZE
+
+    def chunks():
+        for _ in range(limit // 65536 + 2):
+            yield b" " * 65536
+
+    response = client.post("/api/match", content=chunks(),
+                           headers={**ORIGIN, "Content-Type": "application/json"})
+    assert response.status_code == 413
+    assert "access-control-allow-origin" in response.headers
+
+
+def test_oversized_pdf_in_form_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(main, "MAX_UPLOAD_SIZE", 1024)
+    response = client.post("/api/extract-resume", headers=ORIGIN,
+                           files={"resume": ("big.pdf", make_pdf() + b"%" * 4096, "application/pdf")})
+    assert response.status_code == 413
+    assert "access-control-allow-origin" in response.headers
+
+
+def test_non_pdf_upload_is_rejected(client):
+    response = client.post("/api/extract-resume",
+                           files={"resume": ("resume.pdf", b"<html>not a pdf</html>", "application/pdf")})
+    assert response.status_code == 400
+
+
+def long_pdf(pages):
+    document = fitz.open()
+    for _ in range(pages):
+        document.new_page()
+    content = document.tobytes()
+    document.close()
+    return content
+
+
+def encrypted_pdf():
+    document = fitz.open(stream=make_pdf(), filetype="pdf")
+    content = document.tobytes(encryption=fitz.PDF_ENCRYPT_AES_256, user_pw="user", owner_pw="owner")
+    document.close()
+    return content
+
+
+def test_check_pdf_reads_page_count():
+    assert check_pdf(make_pdf()) == 1
+    with pytest.raises(UploadRejected) as rejected:
+        check_pdf(long_pdf(4), max_pages=3)
+    assert rejected.value.status_code == 413
+
+
+@pytest.mark.parametrize("content, status", [
+    (lambda: long_pdf(MAX_UPLOAD_PAGES + 1), 413),
+    (encrypted_pdf, 400),
+    (lambda: b"%PDF-1.7\n" + b"garbage" * 100, 400),
+])
+def test_unusable_pdfs_are_client_errors(client, content, status):
+    jobs = lambda stats: stats['completed'] + stats['failed']
+    before = jobs(main.extraction_pool.stats())
+    response = client.post("/api/extract-resume",
+                           files={"resume": ("resume.pdf", content(), "application/pdf")})
+    assert response.status_code == status
+    assert jobs(main.extraction_pool.stats()) == before  # Never reached the pool
+
+
+def test_batch_reports_unusable_pdfs(client):
+    response = client.post("/api/extract-resumes/batch",
+                           files=[("resumes", ("locked.pdf", encrypted_pdf(), "application/pdf"))])
+    record = json.loads(response.text.splitlines()[0])
+    assert record['status'] == 'error' and "password" in record['error']
@@ -0,0 +1,130 @@
+"""
+Compiled job-title rules
+Turns the taxonomy's title_rules into skill -> rule and rule -> (title id,
+weight) tables, so ranking a resume's titles costs one lookup per detected
+skill and the result is ordered by score, then by rule-file order: the same
+input gives the same titles in every process
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Each later title in a rule's list weighs this much less than the one
+# before it, down to MIN_POSITION_FACTOR
+POSITION_DECAY = 0.1
+MIN_POSITION_FACTOR = 0.5
+
+SENIOR_PREFIX = "Senior "
+SENIOR_MIN_YEARS = 5      # "Senior " variants of the top titles from here on
+SENIOR_TOP_TITLES = 10
+
+
+def _position_factor(i: int) -> float:
+    return max(MIN_POSITION_FACTOR, 1.0 - POSITION_DECAY * i)
+
+
+class TitleRules:
+    """
+    title_rules (see skill_taxonomy.json) compiled for one-pass evaluation.
+    Every rule may carry an optional "weight" (default 1.0).
+    """
+
+    def __init__(self, rules: Dict, skill_categories: Dict[str, Tuple[str, ...]]):
+        self.titles: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+        # Rule index -> [(title id, weight)], and skill -> indexes of the rules
+        # it fires. A rule listing several skills counts once per resume.
+        self.rule_weights: List[List[Tuple[int, float]]] = []
+        self.skill_rules: Dict[str, List[int]] = {}
+        for index, rule in enumerate(rules.get('skill_rules', [])):
+            self.rule_weights.append(self._weighted(rule['titles'], rule.get('weight', 1.0)))
+            for skill in rule['skills']:
+                if skill not in skill_categories:
+                    logger.warning(f"Title rule references unknown skill: {skill}")
+                self.skill_rules.setdefault(skill, []).append(index)
+
+        # Category -> (min_count, [(title id, weight)])
+        self.category_weights: List[Tuple[str, int, List[Tuple[int, float]]]] = [
+            (rule['category'], rule['min_count'], self._weighted(rule['titles'], rule.get('weight', 1.0)))
+            for rule in rules.get('category_rules', [])
+        ]
+
+        # Templated titles of every skill in the language category, made up front
+        self.language_category: Optional[str] = None
+        self.language_limit = 0
+        self.language_senior_years = float('inf')
+        self.language_titles: Dict[str, Tuple[int, int]] = {}
+        self.language_weight = 1.0
+        language_rule = rules.get('language_titles')
+        if language_rule:
+            self.language_category = language_rule['category']
+            self.language_limit = language_rule['limit']
+            self.language_senior_years = language_rule['senior_min_years']
+            self.language_weight = language_rule.get('weight', 1.0)
+            for skill, categories in skill_categories.items():
+                if self.language_category in categories:
+                    self.language_titles[skill] = (
+                        self._id(language_rule['template'].format(skill=skill)),
+                        self._id(language_rule['senior_template'].format(skill=skill))
+                    )
+
+        self.fallback_weights = self._weighted(rules.get('fallback_titles', []), 1.0)
+
+        # Title id -> id of its "Senior " variant (variants map to themselves)
+        base_titles = list(self.titles)
+        self.senior_ids: List[int] = [
+            self._id(title if title.startswith(SENIOR_PREFIX.strip()) else SENIOR_PREFIX + title)
+            for title in base_titles
+        ]
+        self.senior_ids.extend(range(len(self.senior_ids), len(self.titles)))
+
+    def _id(self, title: str) -> int:
+        title_id = self._ids.get(title)
+        if title_id is None:
+            title_id = self._ids[title] = len(self.titles)
+            self.titles.append(title)
+        return title_id
+
+    def _weighted(self, titles: List[str], weight: float) -> List[Tuple[int, float]]:
+        return [(self._id(title), weight * _position_factor(i)) for i, title in enumerate(titles)]
+
+    def rank(self, skills: Dict[str, List[str]], years: float, limit: int = 20) -> List[Tuple[str, float]]:
+        """
+        Titles for a resume's categorized skills, best first, as (title, score).
+        Ties keep rule-file order; "Senior " variants rank right before their base title.
+        """
+        scores: Dict[int, float] = {}
+
+        def add(weighted):
+            for title_id, weight in weighted:
+                scores[title_id] = scores.get(title_id, 0.0) + weight
+
+        if self.language_category:
+            for i, language in enumerate(skills.get(self.language_category, [])[:self.language_limit]):
+                ids = self.language_titles.get(language)
+                if ids:
+                    weight = self.language_weight * _position_factor(i)
+                    add([(ids[0], weight)] + ([(ids[1], weight)] if years >= self.language_senior_years else []))
+        for category, min_count, weighted in self.category_weights:
+            if len(skills.get(category, [])) >= min_count:
+                add(weighted)
+        fired = set()
+        for skill in skills.get('all_skills', []):
+            fired.update(self.skill_rules.get(skill, ()))
+        for index in sorted(fired):
+            add(self.rule_weights[index])
+        if not scores:
+            add(self.fallback_weights)
+
+        # (-score, base title id, 0 for a "Senior " variant of it, title id)
+        entries = sorted((-round(score, 9), title_id, 1, title_id) for title_id, score in scores.items())
+        if years >= SENIOR_MIN_YEARS:
+            for negative, base_id, _, _ in entries[:SENIOR_TOP_TITLES]:
+                senior_id = self.senior_ids[base_id]
+                if senior_id not in scores:
+                    scores[senior_id] = -negative
+                    entries.append((negative, base_id, 0, senior_id))
+            entries.sort()
+        return [(self.titles[title_id], round(-negative, 4)) for negative, _, _, title_id in entries[:limit]]
@@ -0,0 +1,139 @@
+"""
+Upload limits enforced while the body streams in
+Oversized requests are refused from their Content-Length, or cut off as soon
+as a streamed body passes the limit, before multipart parsing buffers them;
+uploaded files are then read in chunks that stop at the per-file limit and
+at a missing %PDF header, so a bogus or huge upload never costs more than
+one limit's worth of memory. check_pdf refuses unopenable, encrypted and
+overly long documents from their xref alone, before they take a pool slot.
+"""
+import io
+import json
+from typing import Dict, Optional
+
+import fitz
+from fastapi import HTTPException, UploadFile
+
+from resumeextraction import MAX_UPLOAD_PAGES, has_pdf_header
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Multipart boundaries, headers and small form fields on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadRejected(Exception):
+    """An upload refused while reading; status_code/detail map onto an HTTP error"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def size_limit_message(max_bytes: int) -> str:
+    return f"File size exceeds {max_bytes / (1024 * 1024):g}MB limit"
+
+
+async def read_upload(upload: UploadFile, max_bytes: int, require_pdf: bool = False) -> bytes:
+    """
+    Read an upload chunk by chunk, stopping as soon as it passes max_bytes
+    (413) or, with require_pdf, as soon as the first chunk lacks a PDF header
+    (400). Chunks are joined once, into the bytes object PyMuPDF opens as is.
+    """
+    chunks = []
+    size = 0
+    while True:
+        chunk = await upload.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        if require_pdf and not chunks and not has_pdf_header(chunk):
+            raise UploadRejected(400, "File is not a valid PDF")
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadRejected(413, size_limit_message(max_bytes))
+        chunks.append(chunk)
+    return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+
+def check_pdf(content: bytes, max_pages: int = MAX_UPLOAD_PAGES) -> int:
+    """
+    Page count of an uploaded PDF, read from its xref without parsing any page.
+    Refuses documents PyMuPDF cannot open or that need a password (400), and
+    ones with more than max_pages pages (413).
+    """
+    try:
+        doc = fitz.open(stream=content, filetype="pdf")
+    except Exception as e:
+        raise UploadRejected(400, f"PDF could not be opened: {e}")
+    try:
+        if doc.needs_pass:
+            raise UploadRejected(400, "PDF is password protected")
+        if doc.page_count > max_pages:
+            raise UploadRejected(413, f"PDF has {doc.page_count} pages, at most {max_pages} accepted")
+        return doc.page_count
+    finally:
+        doc.close()
+
+
+def detach_upload(upload: UploadFile) -> UploadFile:
+    """
+    Take over an upload's spooled file so it stays open after the request
+    handler returns (the form closes its files then), e.g. to read it from a
+    streaming response. The caller closes the returned upload.
+    """
+    detached = UploadFile(upload.file, size=upload.size, filename=upload.filename, headers=upload.headers)
+    upload.file = io.BytesIO()
+    return detached
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware capping request body size per path (default for the rest).
+
+    A declared Content-Length over the limit is answered with 413 without
+    reading the body. Bodies without one (chunked) are counted as they
+    arrive and abandoned with 413 once they pass the limit.
+    """
+
+    def __init__(self, app, limits: Dict[str, int], default: Optional[int] = None):
+        self.app = app
+        self.limits = limits
+        self.default = default
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] not in ('POST', 'PUT', 'PATCH'):
+            return await self.app(scope, receive, send)
+        limit = self.limits.get(scope['path'], self.default)
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope['headers'])
+        declared = headers.get(b'content-length')
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            return await self._reject(send, limit)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > limit:
+                    # Raised inside body parsing, so FastAPI turns it into the response
+                    raise HTTPException(status_code=413, detail=f"Request body exceeds {limit} bytes")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    async def _reject(send, limit: int):
+        body = json.dumps({'detail': f"Request body exceeds {limit} bytes"}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+                        (b'connection', b'close')],
+        })
+        await send({'type': 'http.response.body', 'body': body})